@@ -12,8 +12,11 @@ import (
 	"os"
 	"path/filepath"
 	"regexp"
+	"sort"
 	"strconv"
 	"strings"
+	"unicode"
+	"unicode/utf8"
 )
 
 //go:embed templates/*
@@ -36,10 +39,28 @@ func (b Book) GetChapterRange() []int {
 	return chapters
 }
 
-// ParagraphBreak represents where a new paragraph starts
-type ParagraphBreak struct {
-	Chapter int `json:"chapter"`
-	Verse   int `json:"verse"`
+// ParallelParagraphs is the part of the parallel verse store the server reads:
+// one bitmap per chapter ("matthew 5") with bit v-1 set when verse v starts a paragraph
+type ParallelParagraphs struct {
+	Paragraphs map[string][]uint64 `json:"paragraphs"`
+}
+
+// ParallelCommentary is the precomputed join of gospel verses to the commentary
+// on their canon parallels (scripts/build_canon_commentary.py): per book and
+// "chapter:verse", the verse's canon range and one column of unit numbers per
+// entry of Commentaries
+type ParallelCommentary struct {
+	Commentaries []struct {
+		Author string `json:"author"`
+		Book   string `json:"book"`
+	} `json:"commentaries"`
+	Verses map[string]map[string]ParallelUnits `json:"verses"`
+}
+
+// ParallelUnits lists a verse's cross-referenced units per commentary
+type ParallelUnits struct {
+	Range string  `json:"range"`
+	Units [][]int `json:"units"`
 }
 
 // VerseToCanon holds the verse-to-canon mapping for each gospel
@@ -132,7 +153,8 @@ var (
 		{ID: "revelation", Name: "Revelation", Chapters: 22},
 	}
 
-	paragraphData map[string][]ParagraphBreak
+	paragraphBits map[string][]uint64
+	parallelCommentary ParallelCommentary
 	templates     *template.Template
 )
 
@@ -149,6 +171,9 @@ func init() {
 	
 	// Load canon lookup data
 	loadCanonLookup()
+
+	// Load the verse-to-parallel-commentary join
+	loadParallelCommentary()
 	
 	// Load all commentaries
 	loadCommentary("chrysostom", "matthew", 
@@ -164,6 +189,18 @@ func init() {
 	// Load footnotes
 	loadAllFootnotes()
 
+	// Load the Greek search index
+	loadGreekIndex()
+
+	// Load the folded KJV text for English search
+	loadKJVVerseText()
+
+	// Load the typeahead index for reference resolution
+	loadTypeahead()
+
+	// Load the fuzzy word index for correcting misspelled searches
+	loadFuzzyIndex()
+
 	// Parse templates from filesystem (not embedded) for development
 	var err error
 	templates, err = template.ParseGlob("templates/*.html")
@@ -172,22 +209,33 @@ func init() {
 	}
 }
 
+// loadParagraphData reads the paragraph bitmaps that build_parallel_corpus.py
+// compiles from kjv_paragraph_divisions.json into the parallel verse store
 func loadParagraphData() {
-	file, err := os.Open("../texts/reference/kjv_paragraphs/kjv_paragraph_divisions.json")
+	paragraphBits = make(map[string][]uint64)
+	file, err := os.Open("../texts/reference/parallel/kjv_tr_parallel.json")
 	if err != nil {
 		log.Println("Warning: Could not load paragraph data:", err)
-		paragraphData = make(map[string][]ParagraphBreak)
 		return
 	}
 	defer file.Close()
 
-	err = json.NewDecoder(file).Decode(&paragraphData)
-	if err != nil {
+	var store ParallelParagraphs
+	if err := json.NewDecoder(file).Decode(&store); err != nil {
 		log.Println("Warning: Could not parse paragraph data:", err)
-		paragraphData = make(map[string][]ParagraphBreak)
+		return
+	}
+	if store.Paragraphs != nil {
+		paragraphBits = store.Paragraphs
 	}
 }
 
+// startsParagraph tests a verse's bit in a chapter's paragraph bitmap
+func startsParagraph(bits []uint64, verse int) bool {
+	i := verse - 1
+	return i >= 0 && i/64 < len(bits) && bits[i/64]&(1<<uint(i%64)) != 0
+}
+
 func loadVerseToCanon() {
 	file, err := os.Open("../texts/reference/eusebian_canons/verse_to_canon.json")
 	if err != nil {
@@ -204,6 +252,20 @@ func loadVerseToCanon() {
 	}
 }
 
+func loadParallelCommentary() {
+	file, err := os.Open("../texts/reference/eusebian_canons/verse_to_parallel_commentary.json")
+	if err != nil {
+		log.Println("Warning: Could not load parallel commentary:", err)
+		return
+	}
+	defer file.Close()
+
+	if err := json.NewDecoder(file).Decode(&parallelCommentary); err != nil {
+		log.Println("Warning: Could not parse parallel commentary:", err)
+		parallelCommentary = ParallelCommentary{}
+	}
+}
+
 func loadCanonLookup() {
 	file, err := os.Open("../texts/reference/eusebian_canons/canon_lookup.json")
 	if err != nil {
@@ -308,6 +370,646 @@ func loadAllFootnotes() {
 	}
 }
 
+// SearchIndex is a positional inverted index in the format written by
+// scripts/search_index.py. Postings are flat lists of doc ordinal, position
+// count and token positions, repeated per doc.
+type SearchIndex struct {
+	Format        string            `json:"format"`
+	Version       int               `json:"version"`
+	Normalization string            `json:"normalization"`
+	Fold          map[string]string `json:"fold"`
+	Docs          []string          `json:"docs"`
+	Postings      map[string][]int  `json:"postings"`
+	fold          map[rune]string
+}
+
+// PhraseMatch is a doc containing a phrase, with the token positions it starts at
+type PhraseMatch struct {
+	Doc    int
+	Starts []int
+}
+
+var (
+	greekIndex  *SearchIndex
+	greekVerses []string // TR verse text by doc ordinal
+)
+
+// loadGreekIndex loads the TR search index and the verse texts it refers to
+func loadGreekIndex() {
+	data, err := os.ReadFile("../texts/reference/search/greek_tr_index.json")
+	if err != nil {
+		log.Printf("Warning: Could not load Greek search index: %v", err)
+		return
+	}
+	index := &SearchIndex{}
+	if err := json.Unmarshal(data, index); err != nil || index.Format != "hypomnema-postings" || index.Version != 1 {
+		log.Printf("Warning: Could not parse Greek search index: %v", err)
+		return
+	}
+	index.fold = make(map[rune]string, len(index.Fold))
+	for char, folded := range index.Fold {
+		r, _ := utf8.DecodeRuneInString(char)
+		index.fold[r] = folded
+	}
+
+	verses := make(map[string]string)
+	for _, book := range books {
+		content, err := os.ReadFile(fmt.Sprintf("../texts/scripture/new_testament/greek/textus_receptus/%s/%s.txt", book.ID, book.ID))
+		if err != nil {
+			continue
+		}
+		for _, line := range strings.Split(string(content), "\n") {
+			if location, text, ok := strings.Cut(strings.TrimRight(line, "\r"), " "); ok {
+				verses[book.ID+" "+location] = text
+			}
+		}
+	}
+	greekVerses = make([]string, len(index.Docs))
+	for i, ref := range index.Docs {
+		greekVerses[i] = verses[ref]
+	}
+
+	greekIndex = index
+	log.Printf("Loaded Greek search index: %d verses, %d terms", len(index.Docs), len(index.Postings))
+}
+
+// tokenSpans returns the byte spans of the runs of letters and combining marks in text
+func tokenSpans(text string) [][2]int {
+	var spans [][2]int
+	start := -1
+	for i, r := range text {
+		if unicode.IsLetter(r) || unicode.Is(unicode.Mn, r) {
+			if start < 0 {
+				start = i
+			}
+		} else if start >= 0 {
+			spans = append(spans, [2]int{start, i})
+			start = -1
+		}
+	}
+	if start >= 0 {
+		spans = append(spans, [2]int{start, len(text)})
+	}
+	return spans
+}
+
+// normalize folds a token the way the index builder did: lowercase, no
+// diacritics or elision marks, final sigma as sigma
+func (idx *SearchIndex) normalize(token string) string {
+	var b strings.Builder
+	for _, r := range strings.ToLower(token) {
+		if folded, ok := idx.fold[r]; ok {
+			b.WriteString(folded)
+		} else if !unicode.Is(unicode.Mn, r) && !unicode.Is(unicode.Lm, r) {
+			b.WriteRune(r)
+		}
+	}
+	return b.String()
+}
+
+// postings decodes a term's flat posting list into doc ordinal -> positions
+func (idx *SearchIndex) postings(term string) map[int][]int {
+	flat := idx.Postings[term]
+	docs := make(map[int][]int)
+	for i := 0; i+1 < len(flat); i += 2 + flat[i+1] {
+		docs[flat[i]] = flat[i+2 : i+2+flat[i+1]]
+	}
+	return docs
+}
+
+// phraseSearch returns the docs where the terms occur consecutively, in doc order
+func (idx *SearchIndex) phraseSearch(terms []string) []PhraseMatch {
+	if len(terms) == 0 {
+		return nil
+	}
+	lists := make([]map[int][]int, len(terms))
+	for i, term := range terms {
+		lists[i] = idx.postings(term)
+		if len(lists[i]) == 0 {
+			return nil
+		}
+	}
+
+	var matches []PhraseMatch
+	for doc, firstPositions := range lists[0] {
+		var starts []int
+		for _, p := range firstPositions {
+			found := true
+			for offset := 1; offset < len(lists) && found; offset++ {
+				found = false
+				for _, q := range lists[offset][doc] {
+					if q == p+offset {
+						found = true
+						break
+					}
+				}
+			}
+			if found {
+				starts = append(starts, p)
+			}
+		}
+		if len(starts) > 0 {
+			matches = append(matches, PhraseMatch{Doc: doc, Starts: starts})
+		}
+	}
+	sort.Slice(matches, func(i, j int) bool { return matches[i].Doc < matches[j].Doc })
+	return matches
+}
+
+// highlightTokens marks the phrases of length tokens starting at the given
+// token positions and cuts a snippet around them
+func highlightTokens(text string, starts []int, length int) string {
+	spans := tokenSpans(text)
+	var marks [][2]int
+	for _, start := range starts {
+		if start+length <= len(spans) {
+			marks = append(marks, [2]int{spans[start][0], spans[start+length-1][1]})
+		}
+	}
+	return renderSnippet(text, marks)
+}
+
+// VerseText is the case-folded verse text written by scripts/build_verse_text.py.
+// Offsets[i] holds breakpoints [f0, o0, f1, o1, ...]: from byte fi of Folded[i]
+// on, folded byte f lies at byte oi + (f - fi) of Text[i] (see scripts/snippets.py).
+type VerseText struct {
+	Format  string            `json:"format"`
+	Version int               `json:"version"`
+	Fold    map[string]string `json:"fold"`
+	Docs    []string          `json:"docs"`
+	Text    []string          `json:"text"`
+	Folded  []string          `json:"folded"`
+	Offsets [][]int           `json:"offsets"`
+	fold    map[rune]string
+}
+
+var kjvText *VerseText
+
+// snippetWidth is the number of bytes of verse text shown per search result
+const snippetWidth = 200
+
+// loadKJVVerseText loads the folded KJV text used by the English search
+func loadKJVVerseText() {
+	data, err := os.ReadFile("../texts/reference/search/kjv_verse_text.json")
+	if err != nil {
+		log.Printf("Warning: Could not load KJV verse text: %v", err)
+		return
+	}
+	verseText := &VerseText{}
+	if err := json.Unmarshal(data, verseText); err != nil || verseText.Format != "hypomnema-verse-text" || verseText.Version != 1 {
+		log.Printf("Warning: Could not parse KJV verse text: %v", err)
+		return
+	}
+	verseText.fold = make(map[rune]string, len(verseText.Fold))
+	for char, folded := range verseText.Fold {
+		r, _ := utf8.DecodeRuneInString(char)
+		verseText.fold[r] = folded
+	}
+	kjvText = verseText
+	log.Printf("Loaded KJV verse text: %d verses", len(verseText.Docs))
+}
+
+// foldQuery folds a query the way the builder folded the verses
+func (vt *VerseText) foldQuery(query string) string {
+	var b strings.Builder
+	for _, r := range query {
+		if folded, ok := vt.fold[r]; ok {
+			b.WriteString(folded)
+		} else {
+			b.WriteRune(unicode.ToLower(r))
+		}
+	}
+	return b.String()
+}
+
+// toOriginal maps a byte offset in folded text back to the original text
+func toOriginal(breaks []int, offset int) int {
+	n := sort.Search(len(breaks)/2, func(i int) bool { return breaks[2*i] > offset })
+	if n == 0 {
+		return offset
+	}
+	return breaks[2*n-1] + offset - breaks[2*n-2]
+}
+
+// findSpans returns the original byte spans of the non-overlapping matches
+// of a folded query in verse i
+func (vt *VerseText) findSpans(i int, query string) [][2]int {
+	var spans [][2]int
+	folded := vt.Folded[i]
+	for from := 0; query != ""; {
+		at := strings.Index(folded[from:], query)
+		if at < 0 {
+			break
+		}
+		start := from + at
+		from = start + len(query)
+		spans = append(spans, [2]int{toOriginal(vt.Offsets[i], start), toOriginal(vt.Offsets[i], from)})
+	}
+	return spans
+}
+
+// snippetWindow returns the byte window of text to show around the first
+// match: from a quarter width before it, about width bytes long, with both
+// ends moved to a space where possible and never inside a character
+func snippetWindow(text string, spans [][2]int, width int) (int, int) {
+	if len(text) <= width {
+		return 0, len(text)
+	}
+	var firstStart, firstEnd int
+	if len(spans) > 0 {
+		firstStart, firstEnd = spans[0][0], spans[0][1]
+	}
+
+	start := firstStart - width/4
+	if start < 0 {
+		start = 0
+	}
+	if start > 0 {
+		if space := strings.IndexByte(text[start:firstStart], ' '); space >= 0 {
+			start += space + 1
+		}
+		for start < len(text) && !utf8.RuneStart(text[start]) {
+			start++
+		}
+	}
+
+	end := start + width
+	if end > len(text) {
+		end = len(text)
+	}
+	if end < len(text) {
+		if firstEnd < end {
+			if space := strings.LastIndexByte(text[firstEnd:end], ' '); space >= 0 {
+				end = firstEnd + space
+			}
+		}
+		for end < len(text) && !utf8.RuneStart(text[end]) {
+			end--
+		}
+	}
+	if end < firstEnd {
+		end = firstEnd
+	}
+	return start, end
+}
+
+// renderSnippet cuts a snippet of text around the given byte spans, escapes
+// it and wraps the matches in <mark>. Marks are added after cutting, so a
+// snippet never ends inside a tag or a character.
+func renderSnippet(text string, spans [][2]int) string {
+	start, end := snippetWindow(text, spans, snippetWidth)
+
+	var b strings.Builder
+	if start > 0 {
+		b.WriteString("...")
+	}
+	last := start
+	for _, span := range spans {
+		from, to := span[0], span[1]
+		// A match can start or end inside a character that folded to several
+		for from > 0 && from < len(text) && !utf8.RuneStart(text[from]) {
+			from--
+		}
+		for to < len(text) && !utf8.RuneStart(text[to]) {
+			to++
+		}
+		if from < last {
+			from = last
+		}
+		if to > end {
+			to = end
+		}
+		if from >= to {
+			continue
+		}
+		b.WriteString(html.EscapeString(text[last:from]))
+		b.WriteString("<mark>" + html.EscapeString(text[from:to]) + "</mark>")
+		last = to
+	}
+	b.WriteString(html.EscapeString(text[last:end]))
+	if end < len(text) {
+		b.WriteString("...")
+	}
+	return b.String()
+}
+
+// Typeahead holds the book aliases and verse counts from
+// scripts/build_typeahead.py, used to resolve typed references
+type Typeahead struct {
+	Format  string `json:"format"`
+	Version int    `json:"version"`
+	Books   []struct {
+		ID     string `json:"id"`
+		Name   string `json:"name"`
+		Verses []int  `json:"verses"`
+	} `json:"books"`
+	Aliases struct {
+		Keys  []string `json:"keys"`
+		Books []int    `json:"books"`
+	} `json:"aliases"`
+}
+
+var (
+	typeahead *Typeahead
+	// Same pattern as REFERENCE in scripts/build_typeahead.py
+	referencePattern = regexp.MustCompile(`^((?:[123]|i{1,3}\s)?\s*[a-z]+)\.?\s*(?:(\d+)(?:\s*:\s*(\d*))?)?$`)
+	aliasSeparators  = strings.NewReplacer(" ", "", "\t", "", ".", "")
+)
+
+// loadTypeahead loads the typeahead index for reference resolution
+func loadTypeahead() {
+	data, err := os.ReadFile("../texts/reference/search/typeahead.json")
+	if err != nil {
+		log.Printf("Warning: Could not load typeahead index: %v", err)
+		return
+	}
+	index := &Typeahead{}
+	if err := json.Unmarshal(data, index); err != nil || index.Format != "hypomnema-typeahead" || index.Version != 1 {
+		log.Printf("Warning: Could not parse typeahead index: %v", err)
+		return
+	}
+	typeahead = index
+	log.Printf("Loaded typeahead index: %d book aliases", len(index.Aliases.Keys))
+}
+
+// resolveReference resolves a typed reference like "jn 3:16" or "1 Cor 13"
+// to a book index, chapter and verse (0 if not given). The book part may be
+// an alias or the start of the aliases of exactly one book.
+func (ta *Typeahead) resolveReference(query string) (book, chapter, verse int, ok bool) {
+	match := referencePattern.FindStringSubmatch(strings.ToLower(strings.TrimSpace(query)))
+	if match == nil {
+		return 0, 0, 0, false
+	}
+	alias := aliasSeparators.Replace(match[1])
+	keys := ta.Aliases.Keys
+	lo := sort.SearchStrings(keys, alias)
+	book = -1
+	for i := lo; i < len(keys) && strings.HasPrefix(keys[i], alias); i++ {
+		if keys[i] == alias {
+			book = ta.Aliases.Books[i]
+			break
+		}
+		if book >= 0 && book != ta.Aliases.Books[i] {
+			return 0, 0, 0, false
+		}
+		book = ta.Aliases.Books[i]
+	}
+	if book < 0 {
+		return 0, 0, 0, false
+	}
+
+	verses := ta.Books[book].Verses
+	chapter, _ = strconv.Atoi(match[2])
+	verse, _ = strconv.Atoi(match[3])
+	if match[2] != "" && (chapter < 1 || chapter > len(verses)) {
+		return 0, 0, 0, false
+	}
+	if match[3] != "" && (verse < 1 || verse > verses[chapter-1]) {
+		return 0, 0, 0, false
+	}
+	return book, chapter, verse, true
+}
+
+// FuzzyIndex is the trigram index over the KJV and commentary vocabulary
+// from scripts/build_fuzzy_index.py, used to correct misspelled search words
+type FuzzyIndex struct {
+	Format  string   `json:"format"`
+	Version int      `json:"version"`
+	Words   []string `json:"words"`
+	Counts  struct {
+		KJV []int `json:"kjv"`
+	} `json:"counts"`
+	Trigrams map[string][]int `json:"trigrams"`
+	index    map[string]int
+	letters  []rune
+}
+
+// Same constants as scripts/build_fuzzy_index.py
+const (
+	fuzzyShortWord     = 4
+	fuzzyMaxCandidates = 100
+)
+
+var fuzzyIndex *FuzzyIndex
+
+// loadFuzzyIndex loads the fuzzy word index
+func loadFuzzyIndex() {
+	data, err := os.ReadFile("../texts/reference/search/fuzzy_index.json")
+	if err != nil {
+		log.Printf("Warning: Could not load fuzzy index: %v", err)
+		return
+	}
+	index := &FuzzyIndex{}
+	if err := json.Unmarshal(data, index); err != nil || index.Format != "hypomnema-fuzzy" || index.Version != 1 {
+		log.Printf("Warning: Could not parse fuzzy index: %v", err)
+		return
+	}
+	index.index = make(map[string]int, len(index.Words))
+	letters := make(map[rune]bool)
+	for i, word := range index.Words {
+		index.index[word] = i
+		for _, r := range word {
+			letters[r] = true
+		}
+	}
+	for r := range letters {
+		index.letters = append(index.letters, r)
+	}
+	sort.Slice(index.letters, func(i, j int) bool { return index.letters[i] < index.letters[j] })
+	fuzzyIndex = index
+	log.Printf("Loaded fuzzy index: %d words, %d trigrams", len(index.Words), len(index.Trigrams))
+}
+
+// fuzzyTrigrams returns the distinct trigrams of a word padded with "$"
+func fuzzyTrigrams(word string) []string {
+	padded := []rune("$" + word + "$")
+	seen := make(map[string]bool)
+	var grams []string
+	for i := 0; i+3 <= len(padded); i++ {
+		gram := string(padded[i : i+3])
+		if !seen[gram] {
+			seen[gram] = true
+			grams = append(grams, gram)
+		}
+	}
+	return grams
+}
+
+// oneEdit returns every string one deletion, transposition, substitution or
+// insertion away from word
+func oneEdit(word []rune, letters []rune) []string {
+	var edits []string
+	for i := 0; i <= len(word); i++ {
+		head, tail := string(word[:i]), word[i:]
+		if len(tail) > 0 {
+			edits = append(edits, head+string(tail[1:]))
+		}
+		if len(tail) > 1 {
+			edits = append(edits, head+string(tail[1])+string(tail[0])+string(tail[2:]))
+		}
+		for _, c := range letters {
+			if len(tail) > 0 {
+				edits = append(edits, head+string(c)+string(tail[1:]))
+			}
+			edits = append(edits, head+string(c)+string(tail))
+		}
+	}
+	return edits
+}
+
+// boundedDistance returns the edit distance of a and b, counting an adjacent
+// transposition as one edit, or limit+1 as soon as it must exceed limit
+func boundedDistance(a, b []rune, limit int) int {
+	if len(a)-len(b) > limit || len(b)-len(a) > limit {
+		return limit + 1
+	}
+	before := make([]int, len(b)+1)
+	previous := make([]int, len(b)+1)
+	current := make([]int, len(b)+1)
+	for j := range previous {
+		previous[j] = j
+	}
+	for i := 1; i <= len(a); i++ {
+		current[0] = i
+		rowMin := i
+		for j := 1; j <= len(b); j++ {
+			best := previous[j-1]
+			if a[i-1] != b[j-1] {
+				best++
+			}
+			if previous[j]+1 < best {
+				best = previous[j] + 1
+			}
+			if current[j-1]+1 < best {
+				best = current[j-1] + 1
+			}
+			if i > 1 && j > 1 && a[i-1] == b[j-2] && a[i-2] == b[j-1] && before[j-2]+1 < best {
+				best = before[j-2] + 1
+			}
+			current[j] = best
+			if best < rowMin {
+				rowMin = best
+			}
+		}
+		if rowMin > limit {
+			return limit + 1
+		}
+		before, previous, current = previous, current, before
+	}
+	if previous[len(b)] > limit {
+		return limit + 1
+	}
+	return previous[len(b)]
+}
+
+// suggestKJV returns the KJV word closest to a folded word that is not in
+// the KJV itself: fewest edits (one for short words, else two), then most
+// frequent. This mirrors suggest() in scripts/build_fuzzy_index.py.
+func (fi *FuzzyIndex) suggestKJV(word string) (string, bool) {
+	runes := []rune(word)
+	bound := 2
+	var candidates []int
+	if len(runes) <= fuzzyShortWord {
+		bound = 1
+		for _, edit := range oneEdit(runes, fi.letters) {
+			if i, ok := fi.index[edit]; ok {
+				candidates = append(candidates, i)
+			}
+		}
+	} else {
+		shared := make(map[int]int)
+		for _, gram := range fuzzyTrigrams(word) {
+			for _, i := range fi.Trigrams[gram] {
+				shared[i]++
+			}
+		}
+		for i := range shared {
+			if n := utf8.RuneCountInString(fi.Words[i]); n-len(runes) <= bound && len(runes)-n <= bound {
+				candidates = append(candidates, i)
+			}
+		}
+		sort.Slice(candidates, func(x, y int) bool {
+			if shared[candidates[x]] != shared[candidates[y]] {
+				return shared[candidates[x]] > shared[candidates[y]]
+			}
+			return candidates[x] < candidates[y]
+		})
+		if len(candidates) > fuzzyMaxCandidates {
+			candidates = candidates[:fuzzyMaxCandidates]
+		}
+	}
+
+	best, bestDistance, bestCount := -1, bound+1, 0
+	for _, i := range candidates {
+		count := fi.Counts.KJV[i]
+		if count == 0 {
+			continue
+		}
+		distance := boundedDistance(runes, []rune(fi.Words[i]), bound)
+		if distance < bestDistance || (distance == bestDistance && (count > bestCount || (count == bestCount && fi.Words[i] < fi.Words[best]))) {
+			best, bestDistance, bestCount = i, distance, count
+		}
+	}
+	if best < 0 {
+		return "", false
+	}
+	return fi.Words[best], true
+}
+
+// correctQuery replaces the words of a query that the KJV never uses with
+// their closest KJV words, and reports whether anything changed
+func (fi *FuzzyIndex) correctQuery(vt *VerseText, query string) (string, bool) {
+	var b strings.Builder
+	changed := false
+	last := 0
+	for _, span := range tokenSpans(query) {
+		b.WriteString(query[last:span[0]])
+		last = span[1]
+		word := vt.foldQuery(query[span[0]:span[1]])
+		if i, ok := fi.index[word]; ok && fi.Counts.KJV[i] > 0 {
+			b.WriteString(query[span[0]:span[1]])
+			continue
+		}
+		if correction, ok := fi.suggestKJV(word); ok {
+			b.WriteString(correction)
+			changed = true
+		} else {
+			b.WriteString(query[span[0]:span[1]])
+		}
+	}
+	b.WriteString(query[last:])
+	return b.String(), changed
+}
+
+// searchVerseText writes the verses containing the query as a substring,
+// ignoring case and accents, and returns the result count
+func searchVerseText(results *strings.Builder, vt *VerseText, query string, maxResults int) int {
+	folded := vt.foldQuery(query)
+	if folded == "" {
+		return 0
+	}
+	count := 0
+	for i := range vt.Docs {
+		if count >= maxResults {
+			break
+		}
+		if !strings.Contains(vt.Folded[i], folded) {
+			continue
+		}
+		bookID, location, _ := strings.Cut(vt.Docs[i], " ")
+		chapterStr, _, _ := strings.Cut(location, ":")
+		chapter, _ := strconv.Atoi(chapterStr)
+		for _, book := range books {
+			if book.ID == bookID {
+				writeSearchResult(results, book, chapter, location, renderSnippet(vt.Text[i], vt.findSpans(i, folded)))
+				count++
+				break
+			}
+		}
+	}
+	return count
+}
+
 // parseVerseRef parses a verse reference like "3.3" or "3.3-6" into chapter and verse numbers
 
 func parseVerseRef(ref string) (startChap, startVerse, endChap, endVerse int, err error) {
@@ -365,39 +1067,20 @@ func parseVerseRef(ref string) (startChap, startVerse, endChap, endVerse int, er
 	return startChap, startVerse, endChap, endVerse, nil
 }
 
-// findHomiliesForRange finds which homilies cover a given passage for a specific commentary
-func findHomiliesForRange(author, book string, startChap, startVerse, endChap, endVerse int) []Homily {
-	key := fmt.Sprintf("%s-%s", author, book)
-	commentary, ok := commentaries[key]
-	if !ok {
-		return nil
-	}
-	
-	var result []Homily
-	for _, hr := range commentary.Coverage {
-		// Check if the homily range overlaps with the requested range
-		if (hr.StartChapter < endChap || (hr.StartChapter == endChap && hr.StartVerse <= endVerse)) &&
-		   (hr.EndChapter > startChap || (hr.EndChapter == startChap && hr.EndVerse >= startVerse)) {
-			// Simple passage format - we'll format it properly when displaying
-			passage := fmt.Sprintf("%d:%d-%d:%d", hr.StartChapter, hr.StartVerse, hr.EndChapter, hr.EndVerse)
-			
-			result = append(result, Homily{
-				Number: hr.Number,
-				Roman:  hr.Roman,
-				Passage: passage,
-			})
-		}
-	}
-	
-	return result
-}
-
 func main() {
 	// Load footnotes at startup
 	if err := loadFootnotes(); err != nil {
 		log.Printf("Warning: Failed to load footnotes: %v", err)
 	}
 
+	// go run main.go check-rendered: verify scripts/render_homilies.py output
+	if len(os.Args) > 1 && os.Args[1] == "check-rendered" {
+		if checkRenderedHomilies() > 0 {
+			os.Exit(1)
+		}
+		return
+	}
+
 	// Serve static files
 	http.Handle("/static/", http.StripPrefix("/static/", http.FileServer(http.Dir("./static"))))
 
@@ -492,80 +1175,108 @@ func searchHandler(w http.ResponseWriter, r *http.Request) {
 	resultCount := 0
 	maxResults := 20
 	
-	// Search through all books
-	for _, book := range books {
-		if resultCount >= maxResults {
-			break
+	// A typed reference with a chapter ("jn 3:16") comes first as a direct link.
+	// It is not a text match, but it is an answer: no spelling correction and
+	// no "No results" message follow it.
+	resolved := false
+	if typeahead != nil {
+		if bookIndex, chapter, verse, ok := typeahead.resolveReference(query); ok && chapter > 0 {
+			location := strconv.Itoa(chapter)
+			if verse > 0 {
+				location += ":" + strconv.Itoa(verse)
+			}
+			for _, book := range books {
+				if book.ID == typeahead.Books[bookIndex].ID {
+					writeSearchResult(&results, book, chapter, location, "Go to reference")
+					resolved = true
+					break
+				}
+			}
 		}
-		
-		// Get book directory
-		bookDir := filepath.Join("../texts/scripture/new_testament/english/kjv", book.ID)
-		
-		// Read all chapters for this book
-		for chapter := 1; chapter <= book.Chapters; chapter++ {
+	}
+	
+	if greekIndex != nil && containsGreek(query) {
+		// Greek queries go to the accent-insensitive TR index
+		resultCount = searchGreek(&results, query, maxResults)
+	} else if kjvText != nil {
+		// Everything else is a substring search over the folded KJV text
+		resultCount = searchVerseText(&results, kjvText, query, maxResults)
+	} else {
+		// Without the folded text, scan the chapter files
+		highlight := regexp.MustCompile("(?i)" + regexp.QuoteMeta(query))
+		for _, book := range books {
 			if resultCount >= maxResults {
 				break
 			}
-			
-			chapterDir := fmt.Sprintf("%02d", chapter)
-			chapterFile := filepath.Join(bookDir, chapterDir, fmt.Sprintf("%s_%02d.txt", book.ID, chapter))
-			
-			// Read chapter file
-			content, err := os.ReadFile(chapterFile)
-			if err != nil {
-				continue
-			}
-			
-			// Search line by line
-			lines := strings.Split(string(content), "\n")
-			for _, line := range lines {
+		
+			// Get book directory
+			bookDir := filepath.Join("../texts/scripture/new_testament/english/kjv", book.ID)
+		
+			// Read all chapters for this book
+			for chapter := 1; chapter <= book.Chapters; chapter++ {
 				if resultCount >= maxResults {
 					break
 				}
+			
+				chapterDir := fmt.Sprintf("%02d", chapter)
+				chapterFile := filepath.Join(bookDir, chapterDir, fmt.Sprintf("%s_%02d.txt", book.ID, chapter))
+			
+				// Read chapter file
+				content, err := os.ReadFile(chapterFile)
+				if err != nil {
+					continue
+				}
+			
+				// Search line by line
+				lines := strings.Split(string(content), "\n")
+				for _, line := range lines {
+					if resultCount >= maxResults {
+						break
+					}
 				
-				// Check if line contains search term
-				if strings.Contains(strings.ToLower(line), searchTerm) {
-					// Parse verse reference
-					parts := strings.SplitN(line, " ", 2)
-					if len(parts) == 2 {
-						verseRef := parts[0]
-						verseText := parts[1]
+					// Check if line contains search term
+					if strings.Contains(strings.ToLower(line), searchTerm) {
+						// Parse verse reference
+						parts := strings.SplitN(line, " ", 2)
+						if len(parts) == 2 {
+							verseRef := parts[0]
+							verseText := parts[1]
 						
-						// Highlight search term
-						highlightedText := verseText
-						// Simple highlight - wrap matches in <mark> tags
-						re := regexp.MustCompile("(?i)" + regexp.QuoteMeta(query))
-						highlightedText = re.ReplaceAllString(highlightedText, "<mark>$0</mark>")
-						
-						// Truncate if too long
-						if len(highlightedText) > 200 {
-							highlightedText = highlightedText[:200] + "..."
-						}
+							// Highlight search term
+							var spans [][2]int
+							for _, match := range highlight.FindAllStringIndex(verseText, -1) {
+								spans = append(spans, [2]int{match[0], match[1]})
+							}
+							highlightedText := renderSnippet(verseText, spans)
 						
-						// Create clickable result
-						results.WriteString(fmt.Sprintf(`
-							<div class="search-result" 
-							     style="padding: 10px; border-bottom: 1px solid #eee; cursor: pointer; transition: background-color 0.2s;"
-							     onmouseover="this.style.backgroundColor='#f5f5f5'" 
-							     onmouseout="this.style.backgroundColor=''"
-							     hx-get="/api/chapter/%s/%d"
-							     hx-target="#text-content"
-							     hx-swap="innerHTML"
-							     hx-push-url="/%s/%d"
-							     hx-indicator="#loading-indicator">
-								<div style="color: #3498db; font-weight: 500; margin-bottom: 4px; pointer-events: none;">%s %s</div>
-								<div style="color: #666; font-size: 0.9em; line-height: 1.4; pointer-events: none;">%s</div>
-							</div>
-						`, book.ID, chapter, book.ID, chapter, book.Name, verseRef, highlightedText))
+							// Create clickable result
+							writeSearchResult(&results, book, chapter, verseRef, highlightedText)
 						
-						resultCount++
+							resultCount++
+						}
 					}
 				}
 			}
 		}
 	}
 	
-	if resultCount == 0 {
+	// Nothing found: retry with misspelled words corrected ("beleive", "sepulcre")
+	if resultCount == 0 && !resolved && fuzzyIndex != nil && kjvText != nil && !containsGreek(query) {
+		if corrected, ok := fuzzyIndex.correctQuery(kjvText, query); ok {
+			var correctedResults strings.Builder
+			if n := searchVerseText(&correctedResults, kjvText, corrected, maxResults); n > 0 {
+				results.WriteString(`<div style="padding: 10px; color: #666;">No results for "`)
+				results.WriteString(html.EscapeString(query))
+				results.WriteString(`"; showing results for "<strong>`)
+				results.WriteString(html.EscapeString(corrected))
+				results.WriteString(`</strong>"</div>`)
+				results.WriteString(correctedResults.String())
+				resultCount = n
+			}
+		}
+	}
+	
+	if resultCount == 0 && !resolved {
 		results.WriteString(`<div style="padding: 10px; color: #666;">No results found for "`)
 		results.WriteString(html.EscapeString(query))
 		results.WriteString(`"</div>`)
@@ -579,6 +1290,62 @@ func searchHandler(w http.ResponseWriter, r *http.Request) {
 	w.Write([]byte(results.String()))
 }
 
+// writeSearchResult writes one clickable search result linking to its chapter
+func writeSearchResult(results *strings.Builder, book Book, chapter int, verseRef, text string) {
+	results.WriteString(fmt.Sprintf(`
+		<div class="search-result" 
+		     style="padding: 10px; border-bottom: 1px solid #eee; cursor: pointer; transition: background-color 0.2s;"
+		     onmouseover="this.style.backgroundColor='#f5f5f5'" 
+		     onmouseout="this.style.backgroundColor=''"
+		     hx-get="/api/chapter/%s/%d"
+		     hx-target="#text-content"
+		     hx-swap="innerHTML"
+		     hx-push-url="/%s/%d"
+		     hx-indicator="#loading-indicator">
+			<div style="color: #3498db; font-weight: 500; margin-bottom: 4px; pointer-events: none;">%s %s</div>
+			<div style="color: #666; font-size: 0.9em; line-height: 1.4; pointer-events: none;">%s</div>
+		</div>
+	`, book.ID, chapter, book.ID, chapter, book.Name, verseRef, text))
+}
+
+func containsGreek(s string) bool {
+	for _, r := range s {
+		if unicode.Is(unicode.Greek, r) {
+			return true
+		}
+	}
+	return false
+}
+
+// searchGreek writes the TR verses matching a Greek phrase and returns the result count
+func searchGreek(results *strings.Builder, query string, maxResults int) int {
+	var terms []string
+	for _, span := range tokenSpans(query) {
+		if term := greekIndex.normalize(query[span[0]:span[1]]); term != "" {
+			terms = append(terms, term)
+		}
+	}
+
+	count := 0
+	for _, match := range greekIndex.phraseSearch(terms) {
+		if count >= maxResults {
+			break
+		}
+		bookID, location, _ := strings.Cut(greekIndex.Docs[match.Doc], " ")
+		chapterStr, _, _ := strings.Cut(location, ":")
+		chapter, _ := strconv.Atoi(chapterStr)
+		for _, book := range books {
+			if book.ID == bookID {
+				text := highlightTokens(greekVerses[match.Doc], match.Starts, len(terms))
+				writeSearchResult(results, book, chapter, location, text)
+				count++
+				break
+			}
+		}
+	}
+	return count
+}
+
 func chapterHandler(w http.ResponseWriter, r *http.Request) {
 	// Parse URL: /api/chapter/matthew/1
 	parts := strings.Split(strings.TrimPrefix(r.URL.Path, "/api/chapter/"), "/")
@@ -611,14 +1378,8 @@ func chapterHandler(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	// Get paragraph breaks for this chapter
-	bookParagraphs := paragraphData[bookID]
-	chapterParagraphs := []int{}
-	for _, p := range bookParagraphs {
-		if p.Chapter == chapter {
-			chapterParagraphs = append(chapterParagraphs, p.Verse)
-		}
-	}
+	// Get the paragraph bitmap for this chapter
+	chapterParagraphs := paragraphBits[fmt.Sprintf("%s %d", bookID, chapter)]
 
 	// Get verse-to-canon mapping for this book
 	bookCanons := verseToCanon[bookID]
@@ -711,7 +1472,7 @@ func chapterHandler(w http.ResponseWriter, r *http.Request) {
 	}
 }
 
-func formatChapterHTML(text string, paragraphBreaks []int, bookCanons map[string]string, chapter int, bookID string, homilyMap map[string][]Homily, cyrilHomilyMap map[string][]Homily) string {
+func formatChapterHTML(text string, paragraphBreaks []uint64, bookCanons map[string]string, chapter int, bookID string, homilyMap map[string][]Homily, cyrilHomilyMap map[string][]Homily) string {
 	lines := strings.Split(strings.TrimSpace(text), "\n")
 	var html strings.Builder
 	
@@ -743,7 +1504,7 @@ func formatChapterHTML(text string, paragraphBreaks []int, bookCanons map[string
 		verseText := line[colonIndex+spaceIndex+1:]
 		
 		// Check if this verse starts a new paragraph
-		shouldStartParagraph := isFirstVerse || contains(paragraphBreaks, verseNum)
+		shouldStartParagraph := isFirstVerse || startsParagraph(paragraphBreaks, verseNum)
 		
 		if shouldStartParagraph && inParagraph {
 			html.WriteString("</p>")
@@ -831,62 +1592,29 @@ func formatChapterHTML(text string, paragraphBreaks []int, bookCanons map[string
 			}
 		} 
 		
-		// Check for cross-referenced homilies via canon tables
-		if canonNum != "" {
-			if canonData, ok := canonLookup[canonNum]; ok {
-				// Get the current book's verse range from the canon
-				currentBookCanonRange := ""
-				if currentBookRef, ok := canonData[bookID]; ok {
-					// Parse and format the current book's range for the tooltip
-					startChap, startVerse, endChap, endVerse, err := parseVerseRef(currentBookRef)
-					if err == nil {
-						if startChap == endChap {
-							if startVerse == endVerse {
-								currentBookCanonRange = fmt.Sprintf("%d:%d", startChap, startVerse)
-							} else {
-								currentBookCanonRange = fmt.Sprintf("%d:%d-%d", startChap, startVerse, endVerse)
-							}
-						} else {
-							currentBookCanonRange = fmt.Sprintf("%d:%d-%d:%d", startChap, startVerse, endChap, endVerse)
-						}
-					}
+		// Cross-referenced homilies on the canon parallels in other gospels
+		if parallel, ok := parallelCommentary.Verses[bookID][verseKey]; ok {
+			for column, numbers := range parallel.Units {
+				if len(numbers) == 0 || column >= len(parallelCommentary.Commentaries) {
+					continue
 				}
-				
-				// Loop through all books mentioned in this canon
-				for canonBook, canonRef := range canonData {
-					// Skip the current book (don't show self-references)
-					if canonBook == bookID {
-						continue
-					}
-					
-					// Parse the reference for this book
-					startChap, startVerse, endChap, endVerse, err := parseVerseRef(canonRef)
-					if err != nil {
-						continue
-					}
-					
-					// Check all available commentaries for this book
-					for key := range commentaries {
-						// Extract author and book from the key (format: "author-book")
-						parts := strings.Split(key, "-")
-						if len(parts) != 2 {
-							continue
-						}
-						author := parts[0]
-						commBook := parts[1]
-						
-						// Check if this commentary is for the canon's book
-						if commBook == canonBook {
-							// Find homilies that cover this passage
-							homilies := findHomiliesForRange(author, commBook, startChap, startVerse, endChap, endVerse)
-							if len(homilies) > 0 {
-								renderedHTML, newHomilies := renderHomilyRefs(homilies, author, commBook, true, currentBookCanonRange, lastHomilies)
-								html.WriteString(renderedHTML)
-								currentHomilies = append(currentHomilies, newHomilies...)
-							}
-						}
-					}
+				source := parallelCommentary.Commentaries[column]
+				comm, ok := commentaries[source.Author+"-"+source.Book]
+				if !ok {
+					continue
 				}
+				homilies := make([]Homily, 0, len(numbers))
+				for _, number := range numbers {
+					hr := comm.Coverage[number]
+					homilies = append(homilies, Homily{
+						Number:  hr.Number,
+						Roman:   hr.Roman,
+						Passage: fmt.Sprintf("%d:%d-%d:%d", hr.StartChapter, hr.StartVerse, hr.EndChapter, hr.EndVerse),
+					})
+				}
+				renderedHTML, newHomilies := renderHomilyRefs(homilies, source.Author, source.Book, true, parallel.Range, lastHomilies)
+				html.WriteString(renderedHTML)
+				currentHomilies = append(currentHomilies, newHomilies...)
 			}
 		}
 		
@@ -1048,15 +1776,6 @@ func renderHomilyRefs(homilies []Homily, author, book string, isCrossRef bool, c
 	return html.String(), currentHomilies
 }
 
-func contains(slice []int, val int) bool {
-	for _, v := range slice {
-		if v == val {
-			return true
-		}
-	}
-	return false
-}
-
 func getCanonTooltipFromKey(canonKey string, currentBook string) string {
 	gospelAbbr := map[string]string{
 		"matthew": "Mt",
@@ -1240,16 +1959,14 @@ func homilyHandler(w http.ResponseWriter, r *http.Request) {
 	var authorName string
 	
 	if author == "chrysostom" {
-		// Extract homily text from XML
-		homilyText, verseRef, err = extractHomilyFromXML(book, homilyNum)
+		homilyText, verseRef, err = loadHomilyText(author, book, homilyNum)
 		if err != nil {
 			log.Printf("Error extracting %s homily %d: %v", book, homilyNum, err)
 			homilyText = "Error loading homily text."
 		}
 		authorName = "John Chrysostom"
 	} else if author == "cyril" {
-		// Extract sermon text from HTML
-		homilyText, verseRef, err = extractCyrilSermonFromHTML(homilyNum)
+		homilyText, verseRef, err = loadHomilyText(author, book, homilyNum)
 		if err != nil {
 			log.Printf("Error extracting Cyril sermon %d: %v", homilyNum, err)
 			homilyText = "Error loading sermon text."
@@ -1349,62 +2066,43 @@ func loadFootnotes() error {
 		cyrilLukeFootnotesData = make(map[string]FootnoteData)
 	} else {
 		var cyrilFootnotes map[string]struct {
-			File   string `json:"file"`
-			Number int    `json:"number"`
-			Text   string `json:"text"`
+			File          string `json:"file"`
+			Sermon        int    `json:"sermon"`
+			Number        int    `json:"number"`
+			DisplayNumber int    `json:"display_number"`
+			Text          string `json:"text"`
 		}
 		err = json.Unmarshal(cyrilData, &cyrilFootnotes)
 		if err != nil {
 			log.Printf("Warning: Could not parse Cyril Luke footnotes: %v", err)
 			cyrilLukeFootnotesData = make(map[string]FootnoteData)
 		} else {
-			// Convert Cyril footnotes to FootnoteData format
+			// Convert Cyril footnotes to FootnoteData format, grouped by sermon
 			cyrilLukeFootnotesData = make(map[string]FootnoteData)
-			// Group footnotes by sermon number
-			sermonFootnotes := make(map[int][]Footnote)
 			for _, fn := range cyrilFootnotes {
-				// Extract sermon number from filename
-				var sermonNum int
-				if _, err := fmt.Sscanf(fn.File, "cyril_on_luke_%d_sermons_", &sermonNum); err == nil {
-					// Map file numbers to actual sermon numbers
-					switch sermonNum {
-					case 1: // File 01 contains sermons 1-11
-						if fn.Number >= 1 && fn.Number <= 50 {
-							// Approximate - need better mapping
-							sermonFootnotes[1] = append(sermonFootnotes[1], Footnote{
-								Number: strconv.Itoa(fn.Number),
-								Content: fn.Text,
-							})
-						}
-					}
+				if fn.Sermon == 0 {
+					continue
 				}
-			}
-			// Convert to FootnoteData format
-			for sermonNum, footnotes := range sermonFootnotes {
-				// Convert []Footnote to the expected structure
-				var convertedFootnotes []struct {
+				key := strconv.Itoa(fn.Sermon)
+				data := cyrilLukeFootnotesData[key]
+				data.RomanNumeral = intToRoman(fn.Sermon)
+				data.Footnotes = append(data.Footnotes, struct {
 					OriginalNumber int    `json:"original_number"`
 					DisplayNumber  int    `json:"display_number"`
 					Content        string `json:"content"`
-				}
-				
-				for i, fn := range footnotes {
-					noteNum, _ := strconv.Atoi(fn.Number)
-					convertedFootnotes = append(convertedFootnotes, struct {
-						OriginalNumber int    `json:"original_number"`
-						DisplayNumber  int    `json:"display_number"`
-						Content        string `json:"content"`
-					}{
-						OriginalNumber: noteNum,
-						DisplayNumber:  i + 1,
-						Content:        fn.Content,
-					})
-				}
-				
-				cyrilLukeFootnotesData[strconv.Itoa(sermonNum)] = FootnoteData{
-					RomanNumeral: intToRoman(sermonNum),
-					Footnotes:    convertedFootnotes,
-				}
+				}{
+					OriginalNumber: fn.Number,
+					DisplayNumber:  fn.DisplayNumber,
+					Content:        fn.Text,
+				})
+				cyrilLukeFootnotesData[key] = data
+			}
+			// Map iteration order is random, so restore the per-sermon numbering
+			for _, data := range cyrilLukeFootnotesData {
+				footnotes := data.Footnotes
+				sort.Slice(footnotes, func(i, j int) bool {
+					return footnotes[i].DisplayNumber < footnotes[j].DisplayNumber
+				})
 			}
 		}
 	}
@@ -1414,6 +2112,98 @@ func loadFootnotes() error {
 	return nil
 }
 
+// RenderedHomily is a homily or sermon prerendered by scripts/render_homilies.py
+type RenderedHomily struct {
+	VerseRef string `json:"verse_ref"`
+	HTML     string `json:"html"`
+}
+
+func renderedHomilyPath(author, book string, homilyNum int) string {
+	return fmt.Sprintf("../texts/commentaries/%s/%s/rendered/%d.json", author, book, homilyNum)
+}
+
+// readRenderedHomily reads a prerendered homily, reporting false if there is none
+func readRenderedHomily(author, book string, homilyNum int) (RenderedHomily, bool) {
+	var rendered RenderedHomily
+	data, err := os.ReadFile(renderedHomilyPath(author, book, homilyNum))
+	if err != nil {
+		return rendered, false
+	}
+	if err := json.Unmarshal(data, &rendered); err != nil {
+		log.Printf("Warning: Could not parse rendered %s %s homily %d: %v", author, book, homilyNum, err)
+		return rendered, false
+	}
+	return rendered, true
+}
+
+// loadHomilyText returns the cleaned homily HTML and its verse reference,
+// extracting it from the source XML/HTML if it has not been prerendered
+func loadHomilyText(author, book string, homilyNum int) (string, string, error) {
+	if rendered, ok := readRenderedHomily(author, book, homilyNum); ok {
+		return rendered.HTML, rendered.VerseRef, nil
+	}
+	if author == "cyril" {
+		return extractCyrilSermonFromHTML(homilyNum)
+	}
+	return extractHomilyFromXML(book, homilyNum)
+}
+
+// renderedHomilyPaths lists every prerendered homily and sermon
+func renderedHomilyPaths() []string {
+	paths, _ := filepath.Glob("../texts/commentaries/*/*/rendered/*.json")
+	return paths
+}
+
+// compareRenderedHomily checks one prerendered homily against a live
+// extraction, returning an error that describes any difference
+func compareRenderedHomily(path string) error {
+	book := filepath.Base(filepath.Dir(filepath.Dir(path)))
+	author := filepath.Base(filepath.Dir(filepath.Dir(filepath.Dir(path))))
+	homilyNum, err := strconv.Atoi(strings.TrimSuffix(filepath.Base(path), ".json"))
+	if err != nil {
+		return fmt.Errorf("not a homily number")
+	}
+	rendered, ok := readRenderedHomily(author, book, homilyNum)
+	if !ok {
+		return fmt.Errorf("unreadable")
+	}
+
+	var text, verseRef string
+	if author == "cyril" {
+		text, verseRef, err = extractCyrilSermonFromHTML(homilyNum)
+	} else {
+		text, verseRef, err = extractHomilyFromXML(book, homilyNum)
+	}
+	switch {
+	case err != nil:
+		return fmt.Errorf("live extraction failed: %v", err)
+	case verseRef != rendered.VerseRef:
+		return fmt.Errorf("verse reference %q, live %q", rendered.VerseRef, verseRef)
+	case text != rendered.HTML:
+		i := 0
+		for i < len(text) && i < len(rendered.HTML) && text[i] == rendered.HTML[i] {
+			i++
+		}
+		return fmt.Errorf("HTML differs at byte %d", i)
+	}
+	return nil
+}
+
+// checkRenderedHomilies compares every prerendered homily with a live
+// extraction and returns the number of mismatches
+func checkRenderedHomilies() int {
+	paths := renderedHomilyPaths()
+	mismatches := 0
+	for _, path := range paths {
+		if err := compareRenderedHomily(path); err != nil {
+			fmt.Printf("%s: %v\n", path, err)
+			mismatches++
+		}
+	}
+	fmt.Printf("Checked %d rendered homilies: %d mismatches\n", len(paths), mismatches)
+	return mismatches
+}
+
 func extractHomilyFromXML(book string, homilyNum int) (string, string, error) {
 	// Read the XML file
 	xmlPath := fmt.Sprintf("../texts/commentaries/chrysostom/%s/chrysostom_%s_homilies.xml", book, book)
@@ -2273,8 +3063,7 @@ func homilyAPIHandler(w http.ResponseWriter, r *http.Request) {
 	var homilyText, verseRef string
 	
 	if author == "chrysostom" {
-		// Extract homily text from XML
-		homilyText, verseRef, err = extractHomilyFromXML(book, homilyNum)
+		homilyText, verseRef, err = loadHomilyText(author, book, homilyNum)
 		if err != nil {
 			log.Printf("Error extracting homily %d: %v", homilyNum, err)
 			w.Header().Set("Content-Type", "text/html")
@@ -2282,8 +3071,7 @@ func homilyAPIHandler(w http.ResponseWriter, r *http.Request) {
 			return
 		}
 	} else if author == "cyril" {
-		// Extract sermon text from HTML
-		homilyText, verseRef, err = extractCyrilSermonFromHTML(homilyNum)
+		homilyText, verseRef, err = loadHomilyText(author, book, homilyNum)
 		if err != nil {
 			log.Printf("Error extracting Cyril sermon %d: %v", homilyNum, err)
 			w.Header().Set("Content-Type", "text/html")
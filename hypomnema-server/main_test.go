@@ -0,0 +1,161 @@
+package main
+
+import (
+	"io"
+	"log"
+	"os"
+	"reflect"
+	"strings"
+	"testing"
+	"unicode/utf8"
+)
+
+// TestRenderedHomiliesMatchExtraction fails when a fragment prerendered by
+// scripts/render_homilies.py no longer matches what the server would extract
+// from the source XML/HTML, so the two cleaning pipelines cannot drift apart
+func TestRenderedHomiliesMatchExtraction(t *testing.T) {
+	// The extractors log every cleaning step
+	log.SetOutput(io.Discard)
+	defer log.SetOutput(os.Stderr)
+
+	if err := loadFootnotes(); err != nil {
+		t.Fatalf("loading footnotes: %v", err)
+	}
+	paths := renderedHomilyPaths()
+	if len(paths) == 0 {
+		t.Fatal("no prerendered homilies found under ../texts/commentaries")
+	}
+	for _, path := range paths {
+		path := path
+		t.Run(path, func(t *testing.T) {
+			if err := compareRenderedHomily(path); err != nil {
+				t.Error(err)
+			}
+		})
+	}
+}
+
+// Verse text fixtures folded by scripts/snippets.py fold_text(): John 1:1 in
+// the TR, precomposed and with its accents and breathings decomposed into
+// combining marks (which fold to nothing)
+var snippetFixtures = []struct {
+	name   string
+	text   string
+	folded string
+	breaks []int
+	spans  [][2]int
+}{
+	{
+		name:   "precomposed",
+		text:   "Ἐν ἀρχῇ ἦν ὁ λόγος, καὶ ὁ λόγος ἦν πρὸς τὸν θεόν, καὶ θεὸς ἦν ὁ λόγος.",
+		folded: "εν αρχη ην ο λογοσ, και ο λογοσ ην προσ τον θεον, και θεοσ ην ο λογοσ.",
+		breaks: []int{2, 3, 7, 9, 13, 16, 16, 20, 21, 26, 40, 46, 43, 50, 57, 65, 66, 75, 73, 83, 92, 103, 99, 111, 104, 117, 109, 123},
+		spans:  [][2]int{{27, 37}, {51, 61}, {124, 134}},
+	},
+	{
+		name:   "decomposed",
+		text:   "Ε\u0313ν α\u0313ρχη\u0342\u0345 η\u0313\u0342ν ο\u0314 λο\u0301γος, και\u0300 ο\u0314 λο\u0301γος η\u0313\u0342ν προ\u0300ς το\u0300ν θεο\u0301ν, και\u0300 θεο\u0300ς η\u0313\u0342ν ο\u0314 λο\u0301γος.",
+		folded: "εν αρχη ην ο λογοσ, και ο λογοσ ην προσ τον θεον, και θεοσ ην ο λογοσ.",
+		breaks: []int{2, 4, 7, 11, 13, 21, 16, 28, 21, 35, 26, 42, 40, 58, 43, 63, 48, 70, 57, 83, 66, 94, 73, 103, 82, 114, 92, 126, 99, 135, 104, 144, 109, 151, 114, 158},
+		spans:  [][2]int{{36, 48}, {64, 76}, {152, 164}},
+	},
+}
+
+func TestFindSpansMapsFoldedOffsets(t *testing.T) {
+	for _, fixture := range snippetFixtures {
+		vt := &VerseText{Text: []string{fixture.text}, Folded: []string{fixture.folded}, Offsets: [][]int{fixture.breaks}}
+		spans := vt.findSpans(0, "λογοσ")
+		if !reflect.DeepEqual(spans, fixture.spans) {
+			t.Errorf("%s: spans %v, want %v", fixture.name, spans, fixture.spans)
+			continue
+		}
+		word := fixture.text[spans[0][0]:spans[0][1]]
+		want := strings.ReplaceAll(fixture.text, word, "<mark>"+word+"</mark>")
+		if got := renderSnippet(fixture.text, spans); got != want {
+			t.Errorf("%s: snippet %q, want %q", fixture.name, got, want)
+		}
+	}
+}
+
+func TestToOriginal(t *testing.T) {
+	// KJV text folds byte for byte and has no breakpoints
+	if got := toOriginal(nil, 17); got != 17 {
+		t.Errorf("toOriginal(nil, 17) = %d", got)
+	}
+	// ẞ (3 bytes) folds to ß (2 bytes); Ⱥ (2 bytes) folds to ⱥ (3 bytes)
+	cases := []struct {
+		breaks         []int
+		folded, wanted int
+	}{
+		{[]int{2, 3}, 0, 0},
+		{[]int{2, 3}, 2, 3},
+		{[]int{2, 3}, 5, 6},
+		{[]int{3, 2}, 3, 2},
+		{[]int{3, 2}, 4, 3},
+	}
+	for _, c := range cases {
+		if got := toOriginal(c.breaks, c.folded); got != c.wanted {
+			t.Errorf("toOriginal(%v, %d) = %d, want %d", c.breaks, c.folded, got, c.wanted)
+		}
+	}
+}
+
+func TestFoldQuery(t *testing.T) {
+	log.SetOutput(io.Discard)
+	defer log.SetOutput(os.Stderr)
+	loadKJVVerseText()
+	if kjvText == nil {
+		t.Fatal("could not load ../texts/reference/search/kjv_verse_text.json")
+	}
+	cases := map[string]string{
+		"ΛΌΓΟΣ":            "λογοσ",
+		"λόγος":            "λογοσ",
+		"λο\u0301γος":      "λογοσ",
+		"ᾯ":                "ω",
+		"ẞTRAẞE":           "ßtraße",
+		"Straße":           "straße",
+		"Ⱥ":                "ⱥ",
+		"In the Beginning": "in the beginning",
+	}
+	for query, want := range cases {
+		if got := kjvText.foldQuery(query); got != want {
+			t.Errorf("foldQuery(%q) = %q, want %q", query, got, want)
+		}
+	}
+}
+
+func TestSnippetWindowNeverCutsACharacter(t *testing.T) {
+	// No spaces, so both ends fall back to character boundaries; mixes 2- and 3-byte characters
+	text := strings.Repeat("ἀρχῇλόγοςθεὸς", 40)
+	for _, width := range []int{50, 51, 52, 53, 200} {
+		for first := 0; first < len(text); first += 7 {
+			if !utf8.RuneStart(text[first]) {
+				continue
+			}
+			_, size := utf8.DecodeRuneInString(text[first:])
+			start, end := snippetWindow(text, [][2]int{{first, first + size}}, width)
+			if !utf8.RuneStart(text[start]) || (end < len(text) && !utf8.RuneStart(text[end])) {
+				t.Fatalf("width %d, match at %d: window [%d, %d) cuts a character", width, first, start, end)
+			}
+			if start > first || end < first+size {
+				t.Fatalf("width %d, match at %d: window [%d, %d) misses the match", width, first, start, end)
+			}
+		}
+	}
+}
+
+func TestRenderSnippetWidensMarks(t *testing.T) {
+	// A span starting in the middle of Ἀ and ending in the middle of ρ
+	if got := renderSnippet("Ἀρχή", [][2]int{{1, 4}}); got != "<mark>Ἀρ</mark>χή" {
+		t.Errorf("got %q", got)
+	}
+}
+
+func TestRenderSnippetEscapesAndCutsAtSpaces(t *testing.T) {
+	text := strings.Repeat("ἀρχῇ", 30) + " <θεὸς> & " + strings.Repeat("λόγος ", 40)
+	// As render_snippet() in scripts/snippets.py cuts it
+	want := "...&lt;<mark>θεὸς</mark>&gt; &amp; " + strings.TrimSuffix(strings.Repeat("λόγος ", 16), " ") + "..."
+	if got := renderSnippet(text, [][2]int{{302, 311}}); got != want {
+		t.Errorf("got  %q\nwant %q", got, want)
+	}
+}
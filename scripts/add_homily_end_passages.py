@@ -6,6 +6,8 @@ import os
 import re
 from pathlib import Path
 
+from json_output import write_json
+
 def extract_ending_verse_from_homily(homily_file_path):
     """
     Extract the ending verse reference from a homily text file.
@@ -109,8 +111,7 @@ def update_metadata_files():
         
         # Write updated metadata
         try:
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            write_json(metadata_file, metadata, ensure_ascii=False)
             
             print(f"Updated {homily_dir.name}: passage='{metadata.get('passage', '')}' -> end='{ending_verse}'")
             updated_count += 1
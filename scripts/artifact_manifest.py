@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Record a content hash for every deployable artifact under texts/.
+
+Deploys only need to upload the files whose content changed. This script
+hashes every data file under texts/ (SHA-256), compares the result with the
+manifest from the previous deploy and prints the changed paths one per line,
+ready for rsync --files-from. Build with HYPOMNEMA_CANONICAL_JSON=1 so that
+regenerated JSON is byte-identical whenever its data is.
+
+Listing the changes does not touch the manifest, so running it twice, or
+again after a failed upload, lists the same files. Once the deploy has
+succeeded, run it with --commit to record the uploaded state as the new
+baseline.
+
+Usage:
+    python scripts/artifact_manifest.py                      # print changes since the last deploy
+    python scripts/artifact_manifest.py --commit             # record the current state as deployed
+    python scripts/artifact_manifest.py --previous deployed.json --output new.json
+    python scripts/artifact_manifest.py --removed            # also print deleted paths
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from json_output import write_json
+from parse_cache import source_hash
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TEXTS_DIR = REPO_ROOT / 'texts'
+DEFAULT_MANIFEST = REPO_ROOT / '.cache' / 'artifact_hashes.json'
+
+# Scripts and editor/cache files are not deployed
+IGNORED_DIRS = {'__pycache__'}
+IGNORED_SUFFIXES = ('.py', '.pyc', '.tmp', '.swp', '~')
+
+def artifact_paths(root=TEXTS_DIR):
+    """Yield every deployable file under root, in a stable order."""
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.') or name.endswith(IGNORED_SUFFIXES):
+                continue
+            yield Path(dirpath) / name
+
+def build_manifest(root=TEXTS_DIR):
+    """Return {repo-relative path: {'sha256': ..., 'size': ...}}."""
+    manifest = {}
+    for path in artifact_paths(root):
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        manifest[rel] = {'sha256': source_hash(path), 'size': path.stat().st_size}
+    return manifest
+
+def diff_manifests(previous, current):
+    """Return (changed, removed) path lists between two manifests."""
+    changed = sorted(path for path, entry in current.items()
+                     if previous.get(path, {}).get('sha256') != entry['sha256'])
+    removed = sorted(path for path in previous if path not in current)
+    return changed, removed
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--previous', type=Path, default=DEFAULT_MANIFEST,
+                        help='manifest of the last deploy (default: %(default)s)')
+    parser.add_argument('--output', type=Path, help='also write the new manifest to this path')
+    parser.add_argument('--commit', action='store_true',
+                        help='record the current state in --previous (after a successful deploy)')
+    parser.add_argument('--removed', action='store_true', help='also list deleted artifacts, prefixed with "- "')
+    args = parser.parse_args()
+
+    previous = load_manifest(args.previous)
+    current = build_manifest()
+    changed, removed = diff_manifests(previous, current)
+
+    for path in changed:
+        print(path)
+    if args.removed:
+        for path in removed:
+            print(f"- {path}")
+
+    if args.output:
+        write_json(args.output, current, canonical=True)
+    if args.commit:
+        write_json(args.previous, current, canonical=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Precompute the commentary on each gospel verse's Eusebian parallels.
+
+The chapter view marks, next to a verse, the homilies and sermons on the
+parallel passages in the other gospels: Cyril's sermons on Luke beside
+Matthew 3:3, Chrysostom's homilies on Matthew beside Luke 3:3. That is a
+three-way join (verse -> canon key in verse_to_canon.json -> parallel ranges
+in canon_lookup.json -> units whose coverage overlaps a range), which the
+server used to run for every verse of every request. This script runs it
+once for every verse of the four gospels and every commentary:
+
+    {
+      "format": "hypomnema-canon-commentary",
+      "version": 1,
+      "commentaries": [{"author": "chrysostom", "book": "matthew"}, ...],
+      "verses": {
+        "luke": {
+          "3:3": {"canon": "I.1", "range": "3:3-6", "units": [[10], [], []]},
+          ...
+        },
+        ...
+      }
+    }
+
+units has one column per entry of commentaries, listing in homily order the
+units of that commentary that overlap the verse's parallel passage in its
+book. A commentary never cross-references its own book. range is the
+verse's own canon range ("3:3-6"), shown in the reference tooltips. Verses
+with no parallel commentary are left out, so a marker is one lookup.
+
+Coverage is read from the same homily_coverage.json files as the server,
+with the same overlap test. A new commentator is one more entry in
+COMMENTARIES and one more column.
+
+Usage:
+    python scripts/build_canon_commentary.py
+    python scripts/build_canon_commentary.py luke 3:3
+"""
+
+import json
+import re
+import sys
+
+from json_output import write_json
+from scripture import REPO_ROOT
+
+CANONS_DIR = REPO_ROOT / 'texts' / 'reference' / 'eusebian_canons'
+COMMENTARIES_DIR = REPO_ROOT / 'texts' / 'commentaries'
+OUTPUT_PATH = CANONS_DIR / 'verse_to_parallel_commentary.json'
+
+FORMAT_NAME = 'hypomnema-canon-commentary'
+FORMAT_VERSION = 1
+
+# (author, book), as loaded by the server
+COMMENTARIES = [
+    ('chrysostom', 'matthew'),
+    ('chrysostom', 'john'),
+    ('cyril', 'luke'),
+]
+
+# Canon references: "3.3", "3.3-6", "3.6-4.2", with an optional letter after a verse ("23B")
+CANON_REF = re.compile(r'^(\d+)\.(\d+)[A-Z]*(?:-(?:(\d+)\.)?(\d+)[A-Z]*)?$')
+
+VERSE_KEY = re.compile(r'^\d+:\d+$')
+
+def parse_canon_ref(ref):
+    """Parse a canon reference into (start chapter, start verse, end chapter, end verse), or None."""
+    match = CANON_REF.match(ref)
+    if not match:
+        return None
+    chapter, verse = int(match.group(1)), int(match.group(2))
+    if match.group(4) is None:
+        return chapter, verse, chapter, verse
+    end_chapter = int(match.group(3)) if match.group(3) else chapter
+    return chapter, verse, end_chapter, int(match.group(4))
+
+def format_range(start_chapter, start_verse, end_chapter, end_verse):
+    if start_chapter != end_chapter:
+        return f"{start_chapter}:{start_verse}-{end_chapter}:{end_verse}"
+    if start_verse != end_verse:
+        return f"{start_chapter}:{start_verse}-{end_verse}"
+    return f"{start_chapter}:{start_verse}"
+
+def load_coverage(author, book):
+    """Return [(number, start chapter, start verse, end chapter, end verse)] in homily order."""
+    path = COMMENTARIES_DIR / author / book / 'homily_coverage.json'
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        coverage = json.load(f)
+    return sorted((unit['homily_number'], unit['start_chapter'], unit['start_verse'],
+                   unit['end_chapter'], unit['end_verse']) for unit in coverage.values())
+
+def overlapping(units, start_chapter, start_verse, end_chapter, end_verse):
+    """Numbers of the units whose coverage overlaps the passage (the server's test)."""
+    return [number for number, sc, sv, ec, ev in units
+            if (sc, sv) <= (end_chapter, end_verse) and (ec, ev) >= (start_chapter, start_verse)]
+
+def build_canon_commentary():
+    with open(CANONS_DIR / 'verse_to_canon.json', 'r', encoding='utf-8') as f:
+        verse_to_canon = json.load(f)
+    with open(CANONS_DIR / 'canon_lookup.json', 'r', encoding='utf-8') as f:
+        canon_lookup = json.load(f)
+    coverages = [load_coverage(author, book) for author, book in COMMENTARIES]
+
+    # Every verse of a canon section has the same parallels, so join per canon key once
+    joins = {}
+    def join(canon, book):
+        if (canon, book) not in joins:
+            passages = canon_lookup.get(canon, {})
+            columns = []
+            for (_, commentary_book), units in zip(COMMENTARIES, coverages):
+                passage = passages.get(commentary_book) if commentary_book != book else None
+                span = parse_canon_ref(passage) if passage else None
+                columns.append(overlapping(units, *span) if span else [])
+            own = parse_canon_ref(passages.get(book, ''))
+            joins[canon, book] = (format_range(*own) if own else '', columns)
+        return joins[canon, book]
+
+    verses = {}
+    for book in sorted(verse_to_canon):
+        # Keys like "16:17 (in note)" are never looked up by verse
+        keys = [key for key in verse_to_canon[book] if VERSE_KEY.match(key)]
+        for verse in sorted(keys, key=lambda key: tuple(map(int, key.split(':')))):
+            canon = verse_to_canon[book][verse]
+            canon_range, columns = join(canon, book)
+            if any(columns):
+                verses.setdefault(book, {})[verse] = {'canon': canon, 'range': canon_range, 'units': columns}
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'commentaries': [{'author': author, 'book': book} for author, book in COMMENTARIES],
+        'verses': verses,
+    }
+
+def load_canon_commentary(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get('format') != FORMAT_NAME or table.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return table
+
+def parallel_units(table, book, verse):
+    """Return [(author, commentary book, [unit numbers])] for a verse like "3:3"."""
+    entry = table['verses'].get(book, {}).get(verse)
+    if entry is None:
+        return []
+    return [(c['author'], c['book'], units) for c, units in zip(table['commentaries'], entry['units']) if units]
+
+def main():
+    if len(sys.argv) == 3:
+        table = load_canon_commentary()
+        book, verse = sys.argv[1].lower(), sys.argv[2]
+        units = parallel_units(table, book, verse)
+        if not units:
+            print(f"No parallel commentary for {book} {verse}")
+            return
+        entry = table['verses'][book][verse]
+        print(f"{book} {verse} (canon {entry['canon']}, {entry['range']}):")
+        for author, commentary_book, numbers in units:
+            print(f"  {author} on {commentary_book}: {', '.join(map(str, numbers))}")
+        return
+
+    print("Joining gospel verses to parallel commentary through the canons...")
+    table = build_canon_commentary()
+    write_json(OUTPUT_PATH, table, indent=None, separators=(',', ':'))
+    for book, verses in table['verses'].items():
+        print(f"  {book}: {len(verses)} verses with parallel commentary")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
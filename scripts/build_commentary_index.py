@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Build the full-text search index for the commentaries in unified_json.
+
+Every content[].text paragraph of every homily and sermon is one document,
+keyed "<author> <book> <number>:<paragraph>" (paragraphs count from 1), e.g.
+"chrysostom matthew 5:12". Commentaries still missing from unified_json are
+read from their rendered fragments. Tokens are lowercased and stripped of
+accents and stored in the shared postings format (see search_index.py)
+together with each paragraph's token count, which is everything BM25 needs
+to rank hits.
+
+search() ranks paragraphs with BM25. Quoted parts of a query must occur as
+phrases; every hit carries the character offsets of the matched words in its
+paragraph text, ready to be wrapped in <mark> tags.
+
+Usage:
+    python scripts/build_commentary_index.py
+    python scripts/build_commentary_index.py 'almsgiving "kingdom of heaven"'
+"""
+
+import html
+import json
+import math
+import re
+import sys
+import time
+
+from scripture import REPO_ROOT
+from search_index import (build_postings, load_index, make_index, normalize_english,
+                          query_terms, tokenize, write_index)
+
+UNIFIED_DIR = REPO_ROOT / 'texts' / 'commentaries' / 'unified_json'
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'search' / 'commentary_index.json'
+
+# Unified files in index order: (file name, author, book)
+COMMENTARY_FILES = [
+    ('chrysostom_matthew.json', 'chrysostom', 'matthew'),
+    ('chrysostom_john.json', 'chrysostom', 'john'),
+    ('cyril_luke.json', 'cyril', 'luke'),
+]
+
+PARAGRAPH = re.compile(r'<p[^>]*>(.*?)</p>', re.DOTALL)
+TAG = re.compile(r'<[^>]+>')
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+def paragraph_ref(author, book, number, paragraph):
+    return f"{author} {book} {number}:{paragraph}"
+
+def rendered_paragraphs(author, book):
+    """Return {number: [paragraph texts]} from the rendered fragments of a commentary."""
+    rendered_dir = REPO_ROOT / 'texts' / 'commentaries' / author / book / 'rendered'
+    commentaries = {}
+    for path in rendered_dir.glob('*.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            fragment = json.load(f)
+        paragraphs = []
+        for block in PARAGRAPH.findall(fragment['html']):
+            text = ' '.join(html.unescape(TAG.sub('', block)).split())
+            if text:
+                paragraphs.append(text)
+        commentaries[int(path.stem)] = paragraphs
+    return commentaries
+
+def read_paragraphs(unified_dir=UNIFIED_DIR):
+    """Return parallel lists of paragraph references and texts, in index order.
+
+    A commentary whose unified file is empty (Cyril on Luke, at present) is
+    read from its rendered fragments instead.
+    """
+    docs = []
+    texts = []
+    for filename, author, book in COMMENTARY_FILES:
+        path = unified_dir / filename
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            commentaries = {int(key): [block['text'] for block in commentary.get('content', [])]
+                            for key, commentary in json.load(f).items()}
+        if not commentaries:
+            commentaries = rendered_paragraphs(author, book)
+        for number in sorted(commentaries):
+            for paragraph, text in enumerate(commentaries[number], 1):
+                docs.append(paragraph_ref(author, book, number, paragraph))
+                texts.append(text)
+    return docs, texts
+
+def build_commentary_index(output_path=OUTPUT_PATH, skip_unchanged=False):
+    """Build and write the index. Returns (index, paragraph texts, whether the file was written)."""
+    docs, texts = read_paragraphs()
+    postings = build_postings(texts, normalize_english)
+    lengths = [len(tokenize(text)) for text in texts]
+    index = make_index('commentaries', 'english', docs, postings, lengths=lengths)
+    return index, texts, write_index(output_path, index, skip_unchanged=skip_unchanged)
+
+def parse_query(query):
+    """Split a query into quoted phrases and single words, e.g. 'a "b c"' -> ['a', 'b c'].
+
+    Terms are not normalized here; see query_terms().
+    """
+    return [match.group(1) if match.group(1) is not None else match.group(2)
+            for match in re.finditer(r'"([^"]*)"|(\S+)', query)]
+
+def posting_offsets(flat):
+    """Return {doc: offset of its positions in flat} without decoding any positions."""
+    offsets = {}
+    i = 0
+    while i < len(flat):
+        offsets[flat[i]] = i + 2
+        i += 2 + flat[i + 1]
+    return offsets
+
+def term_offsets(index, term):
+    """Return posting_offsets() for term, cached on the index ({} if the term is absent).
+
+    The position count of doc d is flat[offsets[d] - 1], its positions the
+    following that many entries.
+    """
+    cache = index.setdefault('offsets', {})
+    if term not in cache:
+        cache[term] = posting_offsets(index['postings'].get(term, []))
+    return cache[term]
+
+def phrase_starts(index, terms, candidates=None):
+    """Return {doc: [start positions]} where terms occur consecutively."""
+    flats = [index['postings'].get(term) for term in terms]
+    if not all(flats):
+        return {}
+    offsets = [term_offsets(index, term) for term in terms]
+    docs = set(offsets[0]) if candidates is None else candidates & offsets[0].keys()
+    for later in offsets[1:]:
+        docs &= later.keys()
+
+    # Positions are only decoded for docs that contain every term
+    matches = {}
+    for doc in docs:
+        positions = [flat[o[doc]:o[doc] + flat[o[doc] - 1]] for flat, o in zip(flats, offsets)]
+        following = [set(later) for later in positions[1:]]
+        starts = [p for p in positions[0]
+                  if all(p + offset in later for offset, later in enumerate(following, 1))]
+        if starts:
+            matches[doc] = starts
+    return matches
+
+def bm25_scores(index, terms, candidates=None):
+    """Return {doc: BM25 score} over the docs containing any term (restricted to candidates)."""
+    lengths = index['lengths']
+    n_docs = len(lengths)
+    average_length = sum(lengths) / n_docs if n_docs else 0
+    scores = {}
+    for term in set(terms):
+        offsets = term_offsets(index, term)
+        if not offsets:
+            continue
+        flat = index['postings'][term]
+        idf = math.log(1 + (n_docs - len(offsets) + 0.5) / (len(offsets) + 0.5))
+        weight = idf * terms.count(term)
+        docs = offsets.keys() if candidates is None else candidates & offsets.keys()
+        for doc in docs:
+            tf = flat[offsets[doc] - 1]
+            norm = K1 * (1 - B + B * lengths[doc] / average_length)
+            scores[doc] = scores.get(doc, 0.0) + weight * tf * (K1 + 1) / (tf + norm)
+    return scores
+
+def highlight_offsets(text, terms, phrases, normalize=normalize_english):
+    """Return sorted (start, end) character spans of query words and phrases in text."""
+    spans = tokenize(text)
+    words = set(terms)
+    marked = [normalize(text[start:end]) in words for start, end in spans]
+    # A phrase is highlighted as one span rather than word by word
+    merged = []
+    for phrase in phrases:
+        for p in range(len(spans) - len(phrase) + 1):
+            if all(normalize(text[spans[p + k][0]:spans[p + k][1]]) == term for k, term in enumerate(phrase)):
+                merged.append((spans[p][0], spans[p + len(phrase) - 1][1]))
+                for k in range(len(phrase)):
+                    marked[p + k] = False
+    merged.extend(span for span, hit in zip(spans, marked) if hit)
+    return sorted(merged)
+
+def search(index, texts, query, limit=10):
+    """Rank paragraphs for a query with BM25.
+
+    Returns up to limit dicts {ref, doc, score, highlights}, best first, where
+    highlights are (start, end) offsets into texts[doc]. Every quoted phrase
+    must occur in a hit; the remaining words only add to the score.
+    """
+    parts = [query_terms(index, part) for part in parse_query(query)]
+    parts = [part for part in parts if part]
+    phrases = [part for part in parts if len(part) > 1]
+    terms = [term for part in parts for term in part]
+    if not terms:
+        return []
+
+    candidates = None
+    for phrase in phrases:
+        candidates = set(phrase_starts(index, phrase, candidates))
+        if not candidates:
+            return []
+
+    scores = bm25_scores(index, terms, candidates)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{
+        'ref': index['docs'][doc],
+        'doc': doc,
+        'score': round(score, 4),
+        'highlights': highlight_offsets(texts[doc], terms, phrases),
+    } for doc, score in ranked]
+
+def load_commentary_index(path=OUTPUT_PATH):
+    """Load the index and the paragraph texts it was built from.
+
+    Doc offsets are decoded for every term up front (well under a second), so
+    queries never scan a posting list.
+    """
+    index = load_index(path)
+    docs, texts = read_paragraphs()
+    if docs != index['docs']:
+        raise ValueError(f"{path} is out of date with unified_json; rebuild it")
+    for term in index['postings']:
+        term_offsets(index, term)
+    return index, texts
+
+def main():
+    if len(sys.argv) > 1:
+        index, texts = load_commentary_index()
+        query = ' '.join(sys.argv[1:])
+        start = time.perf_counter()
+        hits = search(index, texts, query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{len(hits)} hits for {query} ({elapsed:.1f} ms)")
+        for hit in hits:
+            text = texts[hit['doc']]
+            first, last = hit['highlights'][0]
+            snippet = text[max(first - 60, 0):last + 60].replace('\n', ' ')
+            print(f"  {hit['ref']:<28} {hit['score']:>7.3f}  ...{snippet}...")
+        return
+
+    print("Building commentary search index...")
+    index, _, _ = build_commentary_index()
+    print(f"Indexed {len(index['docs'])} paragraphs, {len(index['postings'])} terms, "
+          f"{sum(index['lengths'])} tokens")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
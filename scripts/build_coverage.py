@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Infer the passage coverage of every commentary in one vectorized batch.
+
+Each work's homily_coverage.json supplies the anchors: the passage each
+homily or sermon starts at, and its end where one was established (by hand
+for Matthew and Cyril on Luke, from a title range for John). An end equal to
+the start counts as open, as in the original extractors, and so does an end
+before the start (Matthew's homily XXXVI reads 11:1-10:6). All units of all
+works become NumPy arrays of verse ordinals (see build_versification.py), so
+every open end is inferred at once: a unit runs up to the verse before the
+next passage any unit of the same work starts at, and the last one to the end
+of the book.
+
+Coverage counts per verse then give each work's gaps (verses no unit covers)
+and overlaps (verses more than one unit covers) as runs.
+
+The output goes to texts/reference/coverage/, leaving the hand-corrected
+homily_coverage.json files alone: one "<author>_<book>.json" per work in the
+homily_coverage.json format, and summary.json:
+
+    {
+      "chrysostom matthew": {
+        "units": 39,
+        "inferred": 3,
+        "covered": 1057,
+        "gaps": ["matthew 9:31-10:6"],
+        "overlaps": ["matthew 1:1-25", ...]
+      },
+      ...
+    }
+
+coverage_ends.fill_open_ends() applies the same inference to a single
+homilies dict without NumPy, for the extractors.
+
+Usage:
+    python scripts/build_coverage.py
+"""
+
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from build_versification import versification
+from json_output import write_json
+from scripture import REPO_ROOT
+
+COMMENTARIES_DIR = REPO_ROOT / 'texts' / 'commentaries'
+OUTPUT_DIR = REPO_ROOT / 'texts' / 'reference' / 'coverage'
+SUMMARY_PATH = OUTPUT_DIR / 'summary.json'
+
+# (author, book, anchors)
+WORKS = [
+    ('chrysostom', 'matthew', COMMENTARIES_DIR / 'chrysostom' / 'matthew' / 'homily_coverage.json'),
+    ('chrysostom', 'john', COMMENTARIES_DIR / 'chrysostom' / 'john' / 'homily_coverage.json'),
+    ('cyril', 'luke', COMMENTARIES_DIR / 'cyril' / 'luke' / 'homily_coverage.json'),
+]
+
+def ordinal_arrays():
+    """Return (book index, chapter, verse) arrays indexed by verse ordinal."""
+    table = versification()
+    books, chapters, verses = [], [], []
+    for b, book in enumerate(table['books']):
+        for chapter, count in enumerate(table['verses'][book], 1):
+            books.append(np.full(count, b))
+            chapters.append(np.full(count, chapter))
+            verses.append(np.arange(1, count + 1))
+    return np.concatenate(books), np.concatenate(chapters), np.concatenate(verses)
+
+def to_ordinals(book, chapters, verses):
+    """Vectorized build_versification.ordinal() for one book."""
+    table = versification()
+    chapters = np.asarray(chapters)
+    verses = np.asarray(verses)
+    counts = np.array(table['verses'][book])
+    if np.any(chapters < 1) or np.any(chapters > len(counts)):
+        raise IndexError(f"{book} has no chapter {chapters[(chapters < 1) | (chapters > len(counts))][0]}")
+    if np.any(verses < 1) or np.any(verses > counts[chapters - 1]):
+        bad = np.flatnonzero((verses < 1) | (verses > counts[chapters - 1]))[0]
+        raise IndexError(f"{book} {chapters[bad]} has no verse {verses[bad]}")
+    return np.array(table['offsets'][book])[chapters - 1] + verses - 1
+
+def book_span(book):
+    """[first, last] verse ordinals of a book."""
+    table = versification()
+    first = table['offsets'][book][0]
+    return first, first + sum(table['verses'][book]) - 1
+
+def infer_ends(work_ids, starts, ends, book_last):
+    """Fill the open ends (-1) of units of several works at once.
+
+    work_ids, starts and ends are parallel arrays over all units; book_last[w]
+    is the last verse ordinal of work w's book. An open unit ends before the
+    next distinct start in its work, or at book_last if there is none.
+    """
+    total = versification()['total']
+    keys = work_ids * total + starts
+    distinct = np.unique(keys)
+    following = np.searchsorted(distinct, keys, side='right')
+    next_key = distinct[np.minimum(following, len(distinct) - 1)]
+    same_work = (following < len(distinct)) & (next_key // total == work_ids)
+    inferred = np.where(same_work, next_key % total - 1, book_last[work_ids])
+    return np.where(ends >= 0, ends, inferred)
+
+def runs(mask):
+    """Return (first, last) index pairs of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1))
+
+def format_range(book, first, last, chapters, verses):
+    start = f"{book} {chapters[first]}:{verses[first]}"
+    if first == last:
+        return start
+    if chapters[first] == chapters[last]:
+        return f"{start}-{verses[last]}"
+    return f"{start}-{chapters[last]}:{verses[last]}"
+
+def read_anchors(path, book):
+    """Return (units in homily order, start ordinals, end ordinals with -1 for open ends)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        coverage = json.load(f)
+    units = sorted(coverage.values(), key=lambda unit: unit['homily_number'])
+    starts = to_ordinals(book, [u['start_chapter'] for u in units], [u['start_verse'] for u in units])
+    ends = to_ordinals(book, [u['end_chapter'] for u in units], [u['end_verse'] for u in units])
+    return units, starts, np.where(ends <= starts, -1, ends)
+
+def build_coverage(works=WORKS):
+    """Infer every work's coverage. Returns ({work: homily_coverage dict}, summary)."""
+    _, chapters, verses = ordinal_arrays()
+    all_units, work_ids, starts, ends = [], [], [], []
+    for w, (_, book, path) in enumerate(works):
+        units, unit_starts, unit_ends = read_anchors(path, book)
+        all_units.append(units)
+        work_ids.append(np.full(len(units), w))
+        starts.append(unit_starts)
+        ends.append(unit_ends)
+    work_ids, starts, ends = np.concatenate(work_ids), np.concatenate(starts), np.concatenate(ends)
+    book_last = np.array([book_span(book)[1] for _, book, _ in works])
+    inferred = infer_ends(work_ids, starts, ends, book_last)
+
+    # Coverage counts per verse and work, from +1/-1 at the ends of each range
+    counts = np.zeros((len(works), versification()['total'] + 1), dtype=np.int32)
+    np.add.at(counts, (work_ids, starts), 1)
+    np.add.at(counts, (work_ids, inferred + 1), -1)
+    counts = np.cumsum(counts, axis=1)[:, :-1]
+
+    coverages, summary = {}, {}
+    for w, (author, book, _) in enumerate(works):
+        name = f"{author} {book}"
+        mine = work_ids == w
+        coverage = {}
+        for unit, end in zip(all_units[w], inferred[mine]):
+            coverage[str(unit['homily_number'])] = dict(unit, end_chapter=int(chapters[end]),
+                                                        end_verse=int(verses[end]))
+        coverages[name] = coverage
+
+        first, last = book_span(book)
+        in_book = counts[w, first:last + 1]
+        summary[name] = {
+            'units': int(mine.sum()),
+            'inferred': int((ends[mine] < 0).sum()),
+            'covered': int((in_book > 0).sum()),
+            'gaps': [format_range(book, first + a, first + b, chapters, verses) for a, b in runs(in_book == 0)],
+            'overlaps': [format_range(book, first + a, first + b, chapters, verses) for a, b in runs(in_book > 1)],
+        }
+    return coverages, summary
+
+def coverage_path(name):
+    """"chrysostom matthew" -> texts/reference/coverage/chrysostom_matthew.json"""
+    return OUTPUT_DIR / f"{name.replace(' ', '_')}.json"
+
+def write_coverage(skip_unchanged=False):
+    """Build and write every work's coverage and the summary. Returns (summary, paths written)."""
+    coverages, summary = build_coverage()
+    written = []
+    for name, coverage in coverages.items():
+        if write_json(coverage_path(name), coverage, skip_unchanged=skip_unchanged):
+            written.append(coverage_path(name))
+    if write_json(SUMMARY_PATH, summary, skip_unchanged=skip_unchanged):
+        written.append(SUMMARY_PATH)
+    return summary, written
+
+def main():
+    print("Inferring commentary coverage...")
+    start = time.time()
+    summary, _ = write_coverage()
+    for name, info in summary.items():
+        print(f"  {name}: {info['units']} units ({info['inferred']} ends inferred), "
+              f"{info['covered']} verses covered, {len(info['gaps'])} gaps, {len(info['overlaps'])} overlaps "
+              f"-> {coverage_path(name).relative_to(REPO_ROOT)}")
+    print(f"Done in {time.time() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
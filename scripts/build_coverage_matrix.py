@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Build the coverage matrix: for every homily and sermon, the set of New
+Testament verses it covers, as a packed bitset over verse ordinals.
+
+Ranges come from build_coverage.build_coverage(). Bit i of a bitset is verse
+ordinal i (see build_versification.py), most significant bit first in each
+byte, as numpy.packbits() lays them out. Bitsets are stored base64-encoded:
+
+    {
+      "format": "hypomnema-coverage-matrix",
+      "version": 1,
+      "verses": 7958,
+      "units": ["chrysostom matthew 1", ...],
+      "bits": ["AAAA...", ...],
+      "works": {"chrysostom matthew": "...", ...},
+      "authors": {"chrysostom": "...", ...}
+    }
+
+bits[i] is the bitset of units[i]; works and authors hold the union of their
+units. Once loaded, a question such as "which verses of Luke have no
+commentary" is a couple of byte-wise operations:
+
+    matrix = load_coverage_matrix()
+    ranges(difference(book_bits('luke'), union(*matrix['authors'].values())))
+
+verse_map() turns the matrix back into the verse-to-homilies maps the server
+reads, keyed by every verse a unit covers or by its first verse only.
+heatmap() exports the share of each chapter's verses that every work covers.
+
+Usage:
+    python scripts/build_coverage_matrix.py
+    python scripts/build_coverage_matrix.py --heatmap coverage.csv
+    python scripts/build_coverage_matrix.py --verse-map "chrysostom john" john_verses.json
+"""
+
+import argparse
+import base64
+import csv
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from build_coverage import build_coverage, format_range, ordinal_arrays, runs, to_ordinals
+from build_versification import versification
+from json_output import atomic_output, write_json
+from render_homilies import int_to_roman
+from scripture import REPO_ROOT
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'coverage' / 'coverage_matrix.json'
+
+FORMAT_NAME = 'hypomnema-coverage-matrix'
+FORMAT_VERSION = 1
+
+def encode(bits):
+    return base64.b64encode(bits.tobytes()).decode('ascii')
+
+def decode(text):
+    return np.frombuffer(base64.b64decode(text), dtype=np.uint8)
+
+def build_coverage_matrix():
+    total = versification()['total']
+    coverages, _ = build_coverage()
+    units, rows = [], []
+    works, authors = {}, {}
+    for work, coverage in coverages.items():
+        book = work.split(' ')[1]
+        entries = list(coverage.values())
+        starts = to_ordinals(book, [e['start_chapter'] for e in entries], [e['start_verse'] for e in entries])
+        ends = to_ordinals(book, [e['end_chapter'] for e in entries], [e['end_verse'] for e in entries])
+        # Each unit's row is 1 from its start ordinal through its end ordinal
+        verse = np.arange(total)
+        dense = (verse[None, :] >= starts[:, None]) & (verse[None, :] <= ends[:, None])
+        packed = np.packbits(dense, axis=1)
+        units.extend(f"{work} {e['homily_number']}" for e in entries)
+        rows.append(packed)
+        works[work] = union(*packed)
+        author = work.split(' ')[0]
+        authors[author] = union(authors[author], works[work]) if author in authors else works[work]
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'verses': total,
+        'units': units,
+        'bits': [encode(row) for row in np.concatenate(rows)],
+        'works': {work: encode(bits) for work, bits in works.items()},
+        'authors': {author: encode(bits) for author, bits in authors.items()},
+    }
+
+def load_coverage_matrix(path=OUTPUT_PATH):
+    """Load the matrix, with bits as a units x bytes array and works and authors decoded."""
+    with open(path, 'r', encoding='utf-8') as f:
+        matrix = json.load(f)
+    if matrix.get('format') != FORMAT_NAME or matrix.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    matrix['bits'] = np.stack([decode(row) for row in matrix['bits']])
+    matrix['works'] = {work: decode(bits) for work, bits in matrix['works'].items()}
+    matrix['authors'] = {author: decode(bits) for author, bits in matrix['authors'].items()}
+    matrix['index'] = {unit: i for i, unit in enumerate(matrix['units'])}
+    return matrix
+
+def unit_bits(matrix, unit):
+    """Bitset of one unit, e.g. "cyril luke 12"."""
+    return matrix['bits'][matrix['index'][unit]]
+
+def book_bits(book):
+    """Bitset of every verse of a book."""
+    table = versification()
+    first = table['offsets'][book][0]
+    dense = np.zeros(table['total'], dtype=bool)
+    dense[first:first + sum(table['verses'][book])] = True
+    return np.packbits(dense)
+
+def union(*bitsets):
+    return np.bitwise_or.reduce(bitsets)
+
+def intersection(*bitsets):
+    return np.bitwise_and.reduce(bitsets)
+
+def difference(bits, *others):
+    """Verses in bits and in none of the others."""
+    return bits & ~union(*others) if others else bits
+
+def ordinals(bits):
+    """The verse ordinals set in a bitset."""
+    return np.flatnonzero(np.unpackbits(bits)[:versification()['total']])
+
+def count(bits):
+    return int(np.unpackbits(bits).sum())
+
+def ranges(bits):
+    """The verses of a bitset as reference ranges ("luke 1:1-80", ...), never across books."""
+    table = versification()
+    books, chapters, verses = ordinal_arrays()
+    dense = np.unpackbits(bits)[:table['total']].astype(bool)
+    # Break runs at book boundaries
+    starts = np.zeros(table['total'], dtype=bool)
+    starts[[table['offsets'][book][0] for book in table['books']]] = True
+    result = []
+    for first, last in runs(dense):
+        cuts = [first] + [i for i in np.flatnonzero(starts[first + 1:last + 1]) + first + 1] + [last + 1]
+        for a, b in zip(cuts, cuts[1:]):
+            result.append(format_range(table['books'][books[a]], a, b - 1, chapters, verses))
+    return result
+
+def verse_map(matrix, work, every_verse=True):
+    """Rebuild a verse-to-homilies map ({"c:v": [{homily_number, homily_roman, passage, end}]})
+    for a work from its units' bitsets.
+
+    With every_verse, each unit is listed under every verse it covers (like
+    john_verse_to_homilies.json); otherwise only under its first verse (like
+    the Matthew and Luke maps).
+    """
+    table = versification()
+    _, chapters, verses = ordinal_arrays()
+    name = work.split(' ')[1].capitalize()
+    rows = [(unit, i) for unit, i in matrix['index'].items() if unit.rpartition(' ')[0] == work]
+    mapping = {}
+    for unit, i in rows:
+        covered = np.flatnonzero(np.unpackbits(matrix['bits'][i])[:table['total']])
+        if not len(covered):
+            continue
+        number = int(unit.rpartition(' ')[2])
+        first, last = covered[0], covered[-1]
+        entry = {
+            'homily_number': number,
+            'homily_roman': int_to_roman(number),
+            'passage': f"{name} {chapters[first]}:{verses[first]}",
+            'end': f"{name} {chapters[last]}:{verses[last]}",
+        }
+        for ordinal in (covered if every_verse else covered[:1]):
+            mapping.setdefault(f"{chapters[ordinal]}:{verses[ordinal]}", []).append(entry)
+    return mapping
+
+def heatmap(matrix, path):
+    """Write a CSV of book, chapter and the share of the chapter's verses each work covers."""
+    table = versification()
+    works = list(matrix['works'])
+    dense = {work: np.unpackbits(bits)[:table['total']] for work, bits in matrix['works'].items()}
+    with atomic_output(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(['book', 'chapter'] + works)
+        for book in table['books']:
+            for chapter, verse_count in enumerate(table['verses'][book], 1):
+                first = table['offsets'][book][chapter - 1]
+                writer.writerow([book, chapter] + [
+                    round(float(dense[work][first:first + verse_count].mean()), 3) for work in works])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--heatmap', metavar='CSV', help="write per-chapter coverage of each work")
+    parser.add_argument('--verse-map', nargs=2, metavar=('WORK', 'PATH'),
+                        help="write the every-verse map of a work, e.g. \"chrysostom john\"")
+    args = parser.parse_args()
+
+    if args.heatmap or args.verse_map:
+        matrix = load_coverage_matrix()
+        if args.heatmap:
+            heatmap(matrix, args.heatmap)
+            print(f"Heatmap saved to {args.heatmap}")
+        if args.verse_map:
+            work, path = args.verse_map
+            write_json(path, verse_map(matrix, work), sort_keys=True)
+            print(f"Verse map of {work} saved to {path}")
+        return
+
+    print("Building the coverage matrix...")
+    start = time.time()
+    write_json(OUTPUT_PATH, build_coverage_matrix(), indent=None, separators=(',', ':'))
+    matrix = load_coverage_matrix()
+    print(f"{len(matrix['units'])} units x {matrix['verses']} verses in {time.time() - start:.2f}s")
+    for author, bits in matrix['authors'].items():
+        print(f"  {author}: {count(bits)} verses")
+    everything = union(*matrix['authors'].values())
+    for book in ('matthew', 'luke', 'john'):
+        print(f"  {book} without commentary: {', '.join(ranges(difference(book_bits(book), everything))) or '-'}")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Build the search indexes over the commentary footnotes.
+
+Many footnotes quote the Greek text (e.g. παῤῥησίας πολλῆς) and then discuss
+it in English, so every footnote is indexed twice in the shared postings
+format (see search_index.py), once per token stream:
+
+    texts/reference/search/footnotes_greek_index.json    Greek words, normalized as Greek
+    texts/reference/search/footnotes_english_index.json  all other words, normalized as English
+
+Both indexes share the same docs list, keyed "<author> <book> <homily>
+n<display_number>", e.g. "chrysostom john 1 n1", and token positions count
+all tokens of a footnote, so a phrase only matches words that are adjacent
+in the note itself.
+
+find_footnotes() splits a query into its Greek and English words, looks each
+part up in its own index and returns the footnotes matching both.
+
+Usage:
+    python scripts/build_footnote_index.py
+    python scripts/build_footnote_index.py "παρρησιας" aorist
+"""
+
+import html
+import json
+import sys
+
+from scripture import REPO_ROOT
+from search_index import (build_postings, is_greek, load_index, make_index, normalize_english,
+                          normalize_greek, phrase_search, query_terms, tokenize, write_index)
+
+COMMENTARIES_DIR = REPO_ROOT / 'texts' / 'commentaries'
+SEARCH_DIR = REPO_ROOT / 'texts' / 'reference' / 'search'
+GREEK_INDEX_PATH = SEARCH_DIR / 'footnotes_greek_index.json'
+ENGLISH_INDEX_PATH = SEARCH_DIR / 'footnotes_english_index.json'
+
+def footnote_ref(author, book, homily, display_number):
+    return f"{author} {book} {homily} n{display_number}"
+
+def parse_footnote_ref(ref):
+    """Split "chrysostom john 1 n1" into ('chrysostom', 'john', 1, 1)."""
+    author, book, homily, note = ref.split(' ')
+    return author, book, int(homily), int(note[1:])
+
+def read_footnotes():
+    """Return parallel lists of footnote references and plain texts."""
+    notes = []
+    for book in ('matthew', 'john'):
+        path = COMMENTARIES_DIR / 'chrysostom' / book / 'all_footnotes.json'
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            footnotes = json.load(f)
+        for homily in footnotes.values():
+            for note in homily:
+                notes.append((('chrysostom', book, note['homily'], note['display_number']),
+                              note['content']))
+
+    # Cyril's notes keep the HTML character references of the source pages
+    path = COMMENTARIES_DIR / 'cyril' / 'luke' / 'footnotes.json'
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            footnotes = json.load(f)
+        for note in footnotes.values():
+            notes.append((('cyril', 'luke', note['sermon'], note['display_number']),
+                          html.unescape(note['text'])))
+
+    notes.sort(key=lambda note: note[0])
+    return [footnote_ref(*key) for key, _ in notes], [text for _, text in notes]
+
+def greek_stream(token):
+    return normalize_greek(token) if is_greek(token) else ''
+
+def english_stream(token):
+    return '' if is_greek(token) else normalize_english(token)
+
+def build_footnote_indexes(skip_unchanged=False):
+    """Build and write both indexes. Returns ((greek, english), the paths written)."""
+    docs, texts = read_footnotes()
+    greek = make_index('footnotes', 'greek', docs, build_postings(texts, greek_stream))
+    english = make_index('footnotes', 'english', docs, build_postings(texts, english_stream))
+    written = [path for path, index in ((GREEK_INDEX_PATH, greek), (ENGLISH_INDEX_PATH, english))
+               if write_index(path, index, skip_unchanged=skip_unchanged)]
+    return (greek, english), written
+
+def load_footnote_indexes():
+    return load_index(GREEK_INDEX_PATH), load_index(ENGLISH_INDEX_PATH)
+
+def find_footnotes(greek_index, english_index, query):
+    """Return the (author, book, homily, display_number) of the footnotes matching every word.
+
+    The Greek words of the query must occur together as a phrase, and so must
+    the English words.
+    """
+    words = [query[start:end] for start, end in tokenize(query)]
+    parts = [(greek_index, ' '.join(w for w in words if is_greek(w))),
+             (english_index, ' '.join(w for w in words if not is_greek(w)))]
+
+    matches = None
+    for index, part in parts:
+        terms = query_terms(index, part)
+        if not terms:
+            continue
+        docs = {doc for doc, _ in phrase_search(index, terms)}
+        matches = docs if matches is None else matches & docs
+    return [parse_footnote_ref(greek_index['docs'][doc]) for doc in sorted(matches or ())]
+
+def main():
+    if len(sys.argv) > 1:
+        greek_index, english_index = load_footnote_indexes()
+        query = ' '.join(sys.argv[1:])
+        matches = find_footnotes(greek_index, english_index, query)
+        print(f"{len(matches)} footnotes match {query}")
+        for author, book, homily, note in matches[:50]:
+            print(f"  {author} {book} {homily}, note {note}")
+        return
+
+    print("Building footnote search indexes...")
+    (greek, english), _ = build_footnote_indexes()
+    print(f"Indexed {len(greek['docs'])} footnotes: {len(greek['postings'])} Greek terms, "
+          f"{len(english['postings'])} English terms")
+    print(f"Saved to {GREEK_INDEX_PATH.relative_to(REPO_ROOT)} and {ENGLISH_INDEX_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
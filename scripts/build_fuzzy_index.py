@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Build the fuzzy word index: a trigram index over the KJV and commentary
+vocabulary for typo-tolerant lookup.
+
+The verse search matches substrings exactly, so "beleive", "sepulcre" or
+"Nicodemous" find nothing. Every folded word of the KJV (the vocabulary of
+build_typeahead.py) and of the commentaries (the terms of the commentary
+index) is padded as "$word$" and listed under each of its character
+trigrams:
+
+    {
+      "format": "hypomnema-fuzzy",
+      "version": 1,
+      "words": ["aaron", ...],
+      "counts": {"kjv": [5, ...], "commentary": [12, ...]},
+      "trigrams": {"$aa": [0, 1], "aar": [0], ...}
+    }
+
+words is sorted, counts holds each word's occurrences in either corpus (0
+if it does not occur there) and trigrams the sorted indexes of the words
+containing each trigram. Greek terms are left out; the Greek index folds
+accents and breathings already.
+
+A lookup folds the query word and tolerates max_distance() edits. A word of
+up to SHORT_WORD letters has too few trigrams to find its corrections by
+("hte" and "the" share none), so every string one edit away from it is
+looked up in the vocabulary instead. For a longer word, the words of a close
+enough length are ranked by the number of trigrams they share with it, and
+the MAX_CANDIDATES best are verified with an edit distance that counts a
+transposition as one edit and stops as soon as the bound is exceeded.
+Matches are ranked by distance, then by frequency.
+
+Usage:
+    python scripts/build_fuzzy_index.py
+    python scripts/build_fuzzy_index.py beleive sepulcre Nicodemous
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+
+from build_commentary_index import OUTPUT_PATH as COMMENTARY_INDEX_PATH
+from build_typeahead import vocabulary
+from json_output import write_json
+from scripture import REPO_ROOT
+from search_index import decode_postings, is_greek, load_index, normalize_english
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'search' / 'fuzzy_index.json'
+
+FORMAT_NAME = 'hypomnema-fuzzy'
+FORMAT_VERSION = 1
+
+CORPORA = ['kjv', 'commentary']
+PAD = '$'
+SUGGESTIONS = 5
+SHORT_WORD = 4
+MAX_CANDIDATES = 100
+
+def trigrams(word):
+    """The distinct trigrams of a word padded with PAD at both ends."""
+    padded = f"{PAD}{word}{PAD}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_distance(word):
+    """Edits tolerated in a word of this length."""
+    return 1 if len(word) <= SHORT_WORD else 2
+
+def one_edit(word, letters):
+    """Every string one deletion, transposition, substitution or insertion away from word."""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    edits = {a + b[1:] for a, b in splits if b}
+    edits |= {a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1}
+    edits |= {a + c + b[1:] for a, b in splits if b for c in letters}
+    edits |= {a + c + b for a, b in splits for c in letters}
+    return edits
+
+def commentary_vocabulary(path=COMMENTARY_INDEX_PATH):
+    """Return a Counter of the non-Greek terms of the commentary index."""
+    index = load_index(path)
+    words = Counter()
+    for term, flat in index['postings'].items():
+        if not is_greek(term):
+            words[term] = sum(len(positions) for positions in decode_postings(flat).values())
+    return words
+
+def build_fuzzy_index():
+    vocabularies = {'kjv': vocabulary(), 'commentary': commentary_vocabulary()}
+    words = sorted(set().union(*vocabularies.values()))
+    postings = {}
+    for i, word in enumerate(words):
+        for trigram in trigrams(word):
+            postings.setdefault(trigram, []).append(i)
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'words': words,
+        'counts': {corpus: [vocabularies[corpus][word] for word in words] for corpus in CORPORA},
+        'trigrams': {trigram: postings[trigram] for trigram in sorted(postings)},
+    }
+
+def load_fuzzy_index(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('format') != FORMAT_NAME or index.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    index['index'] = {word: i for i, word in enumerate(index['words'])}
+    index['letters'] = sorted(set(''.join(index['words'])))
+    return index
+
+def bounded_distance(a, b, limit):
+    """Edit distance of a and b with adjacent transpositions counted as one
+    edit, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = previous[j - 1] + (a[i - 1] != b[j - 1])
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+def suggest(index, word, corpus=None, limit=SUGGESTIONS):
+    """Return up to limit (word, distance, count) for a possibly misspelled
+    word, closest first, then most frequent.
+
+    With corpus ('kjv' or 'commentary'), only words occurring there are
+    suggested and counted.
+    """
+    word = normalize_english(word)
+    if not word:
+        return []
+    corpora = [corpus] if corpus else CORPORA
+    bound = max_distance(word)
+    if len(word) <= SHORT_WORD:
+        candidates = [index['index'][w] for w in one_edit(word, index['letters']) | {word}
+                      if w in index['index']]
+    else:
+        shared = Counter()
+        for trigram in trigrams(word):
+            shared.update(index['trigrams'].get(trigram, ()))
+        close = [(-common, i) for i, common in shared.items()
+                 if abs(len(index['words'][i]) - len(word)) <= bound]
+        candidates = [i for _, i in sorted(close)[:MAX_CANDIDATES]]
+
+    found = []
+    for i in candidates:
+        count = sum(index['counts'][c][i] for c in corpora)
+        if not count:
+            continue
+        candidate = index['words'][i]
+        distance = bounded_distance(word, candidate, bound)
+        if distance <= bound:
+            found.append((distance, -count, candidate))
+    found.sort()
+    return [(candidate, distance, -count) for distance, count, candidate in found[:limit]]
+
+def main():
+    if len(sys.argv) > 1:
+        index = load_fuzzy_index()
+        for word in sys.argv[1:]:
+            start = time.perf_counter()
+            suggestions = suggest(index, word)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{word} ({elapsed:.1f} ms)")
+            for candidate, distance, count in suggestions:
+                print(f"  {candidate} (distance {distance}, {count} occurrences)")
+        return
+
+    print("Building fuzzy word index...")
+    index = build_fuzzy_index()
+    write_json(OUTPUT_PATH, index, indent=None, separators=(',', ':'), ensure_ascii=False)
+    print(f"{len(index['words'])} words, {len(index['trigrams'])} trigrams")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
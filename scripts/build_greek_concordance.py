@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Build the Greek TR concordance: every occurrence of every word, with
+per-book and per-chapter frequency tables.
+
+Words are grouped by their normalized form (the same accent-, breathing- and
+case-insensitive folding as the search index), counted with NumPy into
+term x book and term x chapter matrices, and every occurrence is listed in
+canonical order. The result is written in a columnar layout so concordance
+pages and frequency charts can be drawn straight from it:
+
+    {
+      "format": "hypomnema-concordance",
+      "version": 1,
+      "books": ["matthew", ...],
+      "chapters": ["matthew 1", ...],
+      "docs": ["matthew 1:1", ...],
+      "terms": ["αβαδδων", ...],
+      "forms": ["Ἀβαδδών", ...],
+      "totals": [1, ...],
+      "book_counts": {"indptr": [...], "indices": [...], "data": [...]},
+      "chapter_counts": {"indptr": [...], "indices": [...], "data": [...]},
+      "occurrences": {"indptr": [...], "doc": [...], "position": [...]}
+    }
+
+Row i of each table belongs to terms[i]; forms[i] is the term's most common
+spelling. The count tables are sparse rows (CSR): the columns and counts of
+term i are indices/data[indptr[i]:indptr[i + 1]]. occurrences lists the
+verse ordinal and token position of each occurrence of term i, in verse
+order, from which KWIC lines are cut out of the verse text (see kwic()).
+
+A printed concordance is sorted by context, so that the same phrase ("ο λογος
+του θεου") lines up. sort_kwic() orders KWIC lines by the folded words
+following the keyword, or by the words preceding it read leftward, with
+verse order breaking ties. Looking up a word reads the saved concordance;
+only a run without one rebuilds and rewrites it.
+
+Usage:
+    python scripts/build_greek_concordance.py
+    python scripts/build_greek_concordance.py λογος              # KWIC lines sorted by right context
+    python scripts/build_greek_concordance.py λογος --sort left  # or by left context, or in verse order
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from json_output import write_json
+from scripture import NT_BOOKS, REPO_ROOT, iter_tr_verses, verse_ref
+from search_index import normalize_greek, tokenize
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'concordance' / 'greek_tr_concordance.json'
+
+FORMAT_NAME = 'hypomnema-concordance'
+FORMAT_VERSION = 1
+
+def read_tokens():
+    """Return the verse table and parallel token columns for the whole TR."""
+    books = list(NT_BOOKS)
+    chapters = []
+    chapter_ids = {}
+    docs = []
+    verses = []
+    columns = {'term': [], 'doc': [], 'position': [], 'book': [], 'chapter': []}
+    forms = {}
+
+    for book, chapter, verse, text in iter_tr_verses():
+        chapter_key = f"{book} {chapter}"
+        if chapter_key not in chapter_ids:
+            chapter_ids[chapter_key] = len(chapters)
+            chapters.append(chapter_key)
+        doc = len(docs)
+        docs.append(verse_ref(book, chapter, verse))
+        verses.append(text)
+
+        for position, (start, end) in enumerate(tokenize(text)):
+            surface = text[start:end]
+            term = normalize_greek(surface)
+            if not term:
+                continue
+            forms.setdefault(term, Counter())[surface] += 1
+            columns['term'].append(term)
+            columns['doc'].append(doc)
+            columns['position'].append(position)
+            columns['book'].append(books.index(book))
+            columns['chapter'].append(chapter_ids[chapter_key])
+
+    return books, chapters, docs, verses, columns, forms
+
+def count_matrix(term_ids, column_ids, n_terms, n_columns):
+    """Count (term, column) pairs into a dense term x column matrix."""
+    matrix = np.zeros((n_terms, n_columns), dtype=np.int32)
+    np.add.at(matrix, (term_ids, column_ids), 1)
+    return matrix
+
+def to_csr(matrix):
+    """Return the nonzero entries of a dense matrix as CSR lists."""
+    rows, cols = np.nonzero(matrix)
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=matrix.shape[0]))))
+    return {
+        'indptr': indptr.tolist(),
+        'indices': cols.tolist(),
+        'data': matrix[rows, cols].tolist(),
+    }
+
+def from_csr(csr, n_columns):
+    """Rebuild the dense matrix from CSR lists."""
+    indptr = np.asarray(csr['indptr'])
+    matrix = np.zeros((len(indptr) - 1, n_columns), dtype=np.int32)
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    matrix[rows, np.asarray(csr['indices'], dtype=np.int64)] = csr['data']
+    return matrix
+
+def build_concordance():
+    books, chapters, docs, verses, columns, forms = read_tokens()
+
+    terms = sorted(forms)
+    term_index = {term: i for i, term in enumerate(terms)}
+    term_ids = np.fromiter((term_index[t] for t in columns['term']), dtype=np.int32,
+                           count=len(columns['term']))
+    doc_ids = np.asarray(columns['doc'], dtype=np.int32)
+    positions = np.asarray(columns['position'], dtype=np.int32)
+
+    book_counts = count_matrix(term_ids, np.asarray(columns['book']), len(terms), len(books))
+    chapter_counts = count_matrix(term_ids, np.asarray(columns['chapter']), len(terms), len(chapters))
+
+    # Occurrences grouped by term, each group in canonical verse order
+    order = np.lexsort((positions, doc_ids, term_ids))
+    occurrence_indptr = np.concatenate(([0], np.cumsum(np.bincount(term_ids, minlength=len(terms)))))
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'normalization': 'greek',
+        'books': books,
+        'chapters': chapters,
+        'docs': docs,
+        'terms': terms,
+        # Most common spelling; ties go to the alphabetically first
+        'forms': [min(forms[t].items(), key=lambda item: (-item[1], item[0]))[0] for t in terms],
+        'totals': book_counts.sum(axis=1).tolist(),
+        'book_counts': to_csr(book_counts),
+        'chapter_counts': to_csr(chapter_counts),
+        'occurrences': {
+            'indptr': occurrence_indptr.tolist(),
+            'doc': doc_ids[order].tolist(),
+            'position': positions[order].tolist(),
+        },
+    }, verses
+
+def load_concordance(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        concordance = json.load(f)
+    if concordance.get('format') != FORMAT_NAME or concordance.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return concordance
+
+def kwic(concordance, verses, term, width=5):
+    """Yield (reference, left context, keyword, right context) for every occurrence of term."""
+    try:
+        i = concordance['terms'].index(term)
+    except ValueError:
+        return
+    occurrences = concordance['occurrences']
+    for j in range(occurrences['indptr'][i], occurrences['indptr'][i + 1]):
+        doc, position = occurrences['doc'][j], occurrences['position'][j]
+        text = verses[doc]
+        spans = tokenize(text)
+        start, end = spans[position]
+        left = text[spans[max(position - width, 0)][0]:start]
+        right = text[end:spans[min(position + width, len(spans) - 1)][1]]
+        yield concordance['docs'][doc], left.strip(), text[start:end], right.strip()
+
+def read_verses(concordance):
+    """Return the TR verse texts in the order of the concordance's docs."""
+    texts = {verse_ref(book, chapter, verse): text for book, chapter, verse, text in iter_tr_verses()}
+    return [texts[ref] for ref in concordance['docs']]
+
+def context_key(context, reverse=False):
+    """Folded words of a context, nearest the keyword first when reverse."""
+    words = [normalize_greek(context[start:end]) for start, end in tokenize(context)]
+    return [word for word in (reversed(words) if reverse else words) if word]
+
+def sort_kwic(lines, by='right'):
+    """Sort KWIC lines by right or left context; 'verse' keeps them in verse order."""
+    if by == 'verse':
+        return list(lines)
+    reverse = by == 'left'
+    # sorted() is stable, so equal contexts stay in verse order
+    return sorted(lines, key=lambda line: context_key(line[1] if reverse else line[3], reverse))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('word', nargs='?', help="print the KWIC lines and book frequencies of a word")
+    parser.add_argument('--sort', choices=['right', 'left', 'verse'], default='right',
+                        help="order of the KWIC lines (default: %(default)s context)")
+    args = parser.parse_args()
+
+    if args.word:
+        concordance = load_concordance()
+        term = normalize_greek(args.word)
+        lines = sort_kwic(kwic(concordance, read_verses(concordance), term), args.sort)
+        print(f"{term}: {len(lines)} occurrences")
+        for ref, left, keyword, right in lines[:40]:
+            print(f"  {ref:<22} {left[-40:]:>40} [{keyword}] {right[:40]}")
+
+        i = concordance['terms'].index(term) if lines else None
+        if i is not None:
+            book_counts = from_csr(concordance['book_counts'], len(concordance['books']))[i]
+            print("\nPer book:")
+            for book, count in zip(concordance['books'], book_counts):
+                if count:
+                    print(f"  {book:<16} {count}")
+        return
+
+    print("Building Greek Textus Receptus concordance...")
+    concordance, verses = build_concordance()
+    write_json(OUTPUT_PATH, concordance, indent=None, separators=(',', ':'), ensure_ascii=False)
+    print(f"Counted {sum(concordance['totals'])} tokens of {len(concordance['terms'])} words "
+          f"across {len(concordance['books'])} books and {len(concordance['chapters'])} chapters")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Build the accent- and breathing-insensitive search index for the Greek TR.
+
+Every token of the Textus Receptus is NFD-decomposed, stripped of diacritics,
+lowercased and folded for final sigma, then indexed by verse ordinal and
+token position in the shared postings format (see search_index.py), so a
+query for λογος finds λόγος and Λόγος, and λογον finds λόγον.
+
+Usage:
+    python scripts/build_greek_index.py
+    python scripts/search_index.py texts/reference/search/greek_tr_index.json λογος
+"""
+
+from scripture import REPO_ROOT, iter_tr_verses, verse_ref
+from search_index import (GREEK_BLOCKS, build_postings, decode_postings, fold_table, make_index,
+                          normalize_greek, write_index)
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'search' / 'greek_tr_index.json'
+
+def build_greek_index(output_path=OUTPUT_PATH, skip_unchanged=False):
+    """Build and write the index. Returns (index, whether the file was written)."""
+    docs = []
+    texts = []
+    for book, chapter, verse, text in iter_tr_verses():
+        docs.append(verse_ref(book, chapter, verse))
+        texts.append(text)
+
+    postings = build_postings(texts, normalize_greek)
+    index = make_index('textus_receptus', 'greek', docs, postings,
+                       fold=fold_table(normalize_greek, GREEK_BLOCKS))
+    return index, write_index(output_path, index, skip_unchanged=skip_unchanged)
+
+def main():
+    print("Building Greek Textus Receptus search index...")
+    index, _ = build_greek_index()
+    tokens = sum(len(positions) for flat in index['postings'].values()
+                 for positions in decode_postings(flat).values())
+    print(f"Indexed {len(index['docs'])} verses, {len(index['postings'])} terms, {tokens} tokens")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
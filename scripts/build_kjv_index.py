@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Build the KJV word indexes: one by surface form and one by lemma.
+
+Both use the shared postings format (see search_index.py) over the same
+docs and token positions. kjv_index.json is keyed by the folded word, so
+"believe" finds only "believe". kjv_lemma_index.json is keyed by lemma, so
+"believe" also finds "believeth" and "believest", and "say" finds "saith",
+"said" and "sayest". Lemmas are assigned once, at index time:
+
+- IRREGULAR lists the Early Modern English forms no rule derives: hath,
+  doth, saith, spake, wast, and the past tenses and participles of strong
+  verbs (came, gave, begat, smitten);
+- a word ending in -eth or -est is reduced to the most frequent of its
+  possible stems that the KJV itself uses: the bare stem (knoweth ->
+  know), the stem with a final e (believeth -> believe), the stem with a
+  doubled consonant undoubled (runneth -> run) or with -i as -y (crieth ->
+  cry). The result goes through IRREGULAR again (sawest -> saw -> see);
+- an -eth word whose stem the KJV never uses is still a verb, and is
+  reduced by spelling alone (availeth -> avail, kindleth -> kindle), except
+  for the names and nouns in NOT_VERBS (Nazareth, teeth). An -est word with
+  no attested stem is left alone: priest, harvest and honest are nouns.
+
+The lemma index also stores the cached mapping in two extra keys:
+
+    "lemmas": {"saith": "say", "believeth": "believe", ...},
+    "forms": {"say": ["said", "saidst", "saith", "say", "sayest"], ...}
+
+query_terms() maps each folded query word through "lemmas", so a lemma
+search is one dictionary lookup away from an exact one. "forms" lists the
+surface forms of each lemma with more than one, for highlighting.
+
+Usage:
+    python scripts/build_kjv_index.py
+    python scripts/build_kjv_index.py say believe
+    python scripts/search_index.py texts/reference/search/kjv_lemma_index.json "he that believe"
+"""
+
+import sys
+from collections import Counter
+
+from scripture import REPO_ROOT, iter_kjv_verses, verse_ref
+from search_index import (build_postings, decode_postings, load_index, make_index, normalize_english,
+                          phrase_search, query_terms, tokenize, write_index)
+
+SEARCH_DIR = REPO_ROOT / 'texts' / 'reference' / 'search'
+OUTPUT_PATH = SEARCH_DIR / 'kjv_index.json'
+LEMMA_OUTPUT_PATH = SEARCH_DIR / 'kjv_lemma_index.json'
+
+# Forms no suffix rule derives, by lemma
+IRREGULAR_FORMS = {
+    'be': ['am', 'art', 'is', 'are', 'was', 'wast', 'were', 'wert', 'been'],
+    'have': ['hath', 'hast', 'had', 'hadst'],
+    'do': ['doth', 'dost', 'did', 'didst', 'doeth', 'doest', 'done'],
+    'say': ['saith', 'said', 'saidst'],
+    'speak': ['spake', 'spakest', 'spoke', 'spoken'],
+    'shall': ['shalt'],
+    'will': ['wilt'],
+    'can': ['canst'],
+    'come': ['came', 'camest'],
+    'go': ['went', 'gone'],
+    'see': ['saw', 'seen'],
+    'give': ['gave', 'given'],
+    'take': ['took', 'taken'],
+    'know': ['knew', 'known'],
+    'make': ['made'],
+    'bear': ['bare', 'born', 'borne'],
+    'break': ['brake', 'broke', 'broken'],
+    'bring': ['brought'],
+    'eat': ['ate', 'eaten'],
+    'drink': ['drank', 'drunk'],
+    'fall': ['fell', 'fallen'],
+    'find': ['found'],
+    'get': ['gat', 'got', 'gotten'],
+    'beget': ['begat', 'begotten'],
+    'hear': ['heard'],
+    'lead': ['led'],
+    'rise': ['rose', 'risen'],
+    'run': ['ran'],
+    'sit': ['sat'],
+    'slay': ['slew', 'slain'],
+    'smite': ['smote', 'smitten'],
+    'stand': ['stood'],
+    'swear': ['sware', 'sworn'],
+    'tell': ['told'],
+    'think': ['thought'],
+    'write': ['wrote', 'written'],
+    'choose': ['chose', 'chosen'],
+    'forsake': ['forsook', 'forsaken'],
+    'send': ['sent'],
+    'seek': ['sought'],
+    'teach': ['taught'],
+    'sell': ['sold'],
+    'buy': ['bought'],
+    'flee': ['fled'],
+    'feed': ['fed'],
+    'hold': ['held'],
+    'keep': ['kept'],
+    'lose': ['lost'],
+    'sleep': ['slept'],
+    'weep': ['wept'],
+    'lay': ['laid'],
+    'pay': ['paid'],
+    'begin': ['began', 'begun'],
+    'grow': ['grew', 'grown'],
+    'draw': ['drew', 'drawn'],
+    'throw': ['threw', 'thrown'],
+    'bid': ['bade', 'bidden'],
+    'cleave': ['clave'],
+    'drive': ['drave', 'driven'],
+    'hide': ['hid', 'hidden'],
+    'shake': ['shook', 'shaken'],
+    'spring': ['sprang', 'sprung'],
+    'strike': ['struck', 'stricken'],
+}
+IRREGULAR = {form: lemma for lemma, forms in IRREGULAR_FORMS.items() for form in forms}
+
+# Words in -eth that are not verbs
+NOT_VERBS = {'nazareth', 'elisabeth', 'seth', 'teeth', 'japheth', 'gennesaret', 'bethphage'}
+
+VOWELS = set('aeiou')
+# Final doubles that belong to the stem (falleth, passeth, puffeth)
+KEPT_DOUBLES = set('lsfz')
+
+def stems(stem):
+    """Possible stems of a word whose -eth or -est ending was removed."""
+    candidates = [stem, stem + 'e']
+    if stem.endswith('i'):
+        candidates.append(stem[:-1] + 'y')
+    if len(stem) > 2 and stem[-1] == stem[-2]:
+        candidates.append(stem[:-1])
+    return candidates
+
+def spelled_stem(stem):
+    """Guess the stem of an -eth verb the KJV has no other form of."""
+    if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in KEPT_DOUBLES:
+        return stem[:-1]
+    if stem.endswith('i'):
+        return stem[:-1] + 'y'
+    # kindl-, suffic-, deceiv-, argu- take a final e
+    if stem[-1] in 'cvu' or (stem[-1] == 'l' and stem[-2] not in VOWELS):
+        return stem + 'e'
+    # So do describ-, pin-, dur- (but not visit-, vomit-)
+    if (len(stem) > 2 and stem[-1] not in VOWELS | {'t'} and stem[-2] in 'iu'
+            and stem[-3] not in VOWELS):
+        return stem + 'e'
+    return stem
+
+def lemmatize(word, counts):
+    """Return the lemma of a folded KJV word, given the counts of the KJV vocabulary."""
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    for suffix in ('eth', 'est'):
+        if not word.endswith(suffix) or len(word) - len(suffix) < 2:
+            continue
+        stem = word[:-len(suffix)]
+        found = [candidate for candidate in stems(stem) if counts[candidate]]
+        if found:
+            base = max(found, key=lambda candidate: counts[candidate])
+            return IRREGULAR.get(base, base)
+        if suffix == 'eth' and word not in NOT_VERBS:
+            return spelled_stem(stem)
+    return word
+
+def read_verses():
+    docs, texts = [], []
+    for book, chapter, verse, text in iter_kjv_verses():
+        docs.append(verse_ref(book, chapter, verse))
+        texts.append(text)
+    return docs, texts
+
+def lemma_postings(postings, lemmas):
+    """Merge surface postings into lemma postings, positions sorted per doc."""
+    merged = {}
+    for term, flat in postings.items():
+        docs = merged.setdefault(lemmas.get(term, term), {})
+        for doc, positions in decode_postings(flat).items():
+            docs.setdefault(doc, []).extend(positions)
+    result = {}
+    for lemma, docs in merged.items():
+        flat = []
+        for doc in sorted(docs):
+            positions = sorted(docs[doc])
+            flat.extend([doc, len(positions), *positions])
+        result[lemma] = flat
+    return result
+
+def build_kjv_indexes(skip_unchanged=False):
+    """Build and write both indexes. Returns (surface index, lemma index, paths written)."""
+    docs, texts = read_verses()
+    postings = build_postings(texts, normalize_english)
+    lengths = [len(tokenize(text)) for text in texts]
+    counts = Counter({term: sum(len(positions) for positions in decode_postings(flat).values())
+                      for term, flat in postings.items()})
+
+    lemmas = {}
+    for term in sorted(postings):
+        lemma = lemmatize(term, counts)
+        if lemma != term:
+            lemmas[term] = lemma
+    forms = {}
+    for term in sorted(postings):
+        forms.setdefault(lemmas.get(term, term), []).append(term)
+
+    surface = make_index('kjv', 'english', docs, postings, lengths=lengths)
+    lemma_index = make_index('kjv', 'english', docs, lemma_postings(postings, lemmas), lengths=lengths)
+    lemma_index['lemmas'] = lemmas
+    lemma_index['forms'] = {lemma: words for lemma, words in sorted(forms.items()) if len(words) > 1}
+
+    written = []
+    for path, index in ((OUTPUT_PATH, surface), (LEMMA_OUTPUT_PATH, lemma_index)):
+        if write_index(path, index, skip_unchanged=skip_unchanged):
+            written.append(path)
+    return surface, lemma_index, written
+
+def main():
+    if len(sys.argv) > 1:
+        surface, lemma_index = load_index(OUTPUT_PATH), load_index(LEMMA_OUTPUT_PATH)
+        for word in sys.argv[1:]:
+            terms = query_terms(lemma_index, word)
+            if not terms:
+                continue
+            lemma = terms[0]
+            exact = len(phrase_search(surface, query_terms(surface, word)))
+            verses = len(phrase_search(lemma_index, terms))
+            print(f"{word}: lemma {lemma}, {exact} verses exactly, {verses} by lemma")
+            print(f"  forms: {', '.join(lemma_index['forms'].get(lemma, [lemma]))}")
+        return
+
+    print("Building KJV surface and lemma indexes...")
+    surface, lemma_index, _ = build_kjv_indexes()
+    print(f"Indexed {len(surface['docs'])} verses, {len(surface['postings'])} words, "
+          f"{len(lemma_index['postings'])} lemmas ({len(lemma_index['lemmas'])} words lemmatized)")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)} and {LEMMA_OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
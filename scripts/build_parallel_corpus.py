@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Build the KJV / Greek TR parallel corpus: both texts joined verse by verse.
+
+The KJV is stored one chapter per file and the TR one book per file, so a
+side-by-side view would otherwise scan two trees per chapter. This script
+reads both once, joins them on verse reference and writes one store in
+canonical verse order:
+
+    {
+      "format": "hypomnema-parallel",
+      "version": 1,
+      "refs": ["matthew 1:1", ...],
+      "kjv": ["The book of the generation ...", ...],
+      "tr": ["Βίβλος γενέσεως ...", ...],
+      "chapters": {"matthew 1": [0, 25], ...},
+      "paragraphs": {"matthew 1": [131072], ...},
+      "mismatches": {"kjv_only": ["acts 1:27", ...], "tr_only": ["jude 1:1", ...]}
+    }
+
+refs holds the union of the verses of both texts; kjv[i] and tr[i] are the
+two texts of refs[i], or null where that edition has no such verse. Every
+such verse is also listed under mismatches, so versification differences
+(and gaps in the source files) can be reviewed without diffing the trees.
+chapters gives the [start, end) ordinal slice of each chapter.
+
+paragraphs compiles kjv_paragraph_divisions.json into one bitmap per chapter,
+a list of 64-bit words in which bit v - 1 (word (v - 1) // 64, counting from
+the least significant bit) is set when verse v starts a paragraph. The first
+verse of a chapter always starts one, marked or not; chapters without any
+marked break are left out. The bitmaps are keyed by chapter and verse
+number rather than by edition, so the Greek text is segmented the same way
+(see paragraphs()).
+
+Once loaded, a verse range is one dictionary lookup per end and a slice
+(see fetch_range()).
+
+Usage:
+    python scripts/build_parallel_corpus.py
+    python scripts/build_parallel_corpus.py "john 1:1" "john 1:5"
+"""
+
+import json
+import sys
+
+from json_output import write_json
+from scripture import NT_BOOKS, REPO_ROOT, iter_kjv_verses, iter_tr_verses, verse_ref
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'parallel' / 'kjv_tr_parallel.json'
+PARAGRAPHS_PATH = REPO_ROOT / 'texts' / 'reference' / 'kjv_paragraphs' / 'kjv_paragraph_divisions.json'
+
+FORMAT_NAME = 'hypomnema-parallel'
+FORMAT_VERSION = 1
+
+def read_editions():
+    """Return {(book, chapter, verse): text} for the KJV and the TR."""
+    kjv = {(book, ch, v): text for book, ch, v, text in iter_kjv_verses()}
+    tr = {(book, ch, v): text for book, ch, v, text in iter_tr_verses()}
+    return kjv, tr
+
+def paragraph_bitmaps(path=PARAGRAPHS_PATH):
+    """Compile {book: [{chapter, verse}]} paragraph breaks into {"book ch": [64-bit words]}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        divisions = json.load(f)
+    masks = {}
+    for book, breaks in divisions.items():
+        for entry in breaks:
+            key = f"{book} {entry['chapter']}"
+            masks[key] = masks.get(key, 0) | 1 << (entry['verse'] - 1)
+    bitmaps = {}
+    for key, mask in masks.items():
+        words = []
+        while mask:
+            words.append(mask & 0xFFFFFFFFFFFFFFFF)
+            mask >>= 64
+        bitmaps[key] = words
+    return bitmaps
+
+def build_parallel_corpus():
+    kjv, tr = read_editions()
+
+    book_order = {book: i for i, book in enumerate(NT_BOOKS)}
+    keys = sorted(kjv.keys() | tr.keys(), key=lambda key: (book_order[key[0]], key[1], key[2]))
+
+    refs = []
+    kjv_column = []
+    tr_column = []
+    chapters = {}
+    kjv_only = []
+    tr_only = []
+    for ordinal, (book, chapter, verse) in enumerate(keys):
+        ref = verse_ref(book, chapter, verse)
+        refs.append(ref)
+        kjv_column.append(kjv.get((book, chapter, verse)))
+        tr_column.append(tr.get((book, chapter, verse)))
+        if kjv_column[-1] is None:
+            tr_only.append(ref)
+        elif tr_column[-1] is None:
+            kjv_only.append(ref)
+
+        span = chapters.setdefault(f"{book} {chapter}", [ordinal, ordinal])
+        span[1] = ordinal + 1
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'refs': refs,
+        'kjv': kjv_column,
+        'tr': tr_column,
+        'chapters': chapters,
+        'paragraphs': paragraph_bitmaps(),
+        'mismatches': {'kjv_only': kjv_only, 'tr_only': tr_only},
+    }
+
+def load_parallel_corpus(path=OUTPUT_PATH):
+    """Load the store and add an in-memory "ordinals" map from reference to ordinal."""
+    with open(path, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    if corpus.get('format') != FORMAT_NAME or corpus.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    corpus['ordinals'] = {ref: i for i, ref in enumerate(corpus['refs'])}
+    return corpus
+
+def fetch_range(corpus, start_ref, end_ref=None):
+    """Return [(ref, kjv text, tr text)] from start_ref to end_ref inclusive.
+
+    Either text is None where that edition lacks the verse. Raises KeyError
+    for a reference neither edition has.
+    """
+    start = corpus['ordinals'][start_ref]
+    end = corpus['ordinals'][end_ref or start_ref] + 1
+    return list(zip(corpus['refs'][start:end], corpus['kjv'][start:end], corpus['tr'][start:end]))
+
+def fetch_chapter(corpus, book, chapter):
+    """Return [(ref, kjv text, tr text)] for a whole chapter, or [] if neither edition has it."""
+    start, end = corpus['chapters'].get(f"{book} {chapter}", (0, 0))
+    return list(zip(corpus['refs'][start:end], corpus['kjv'][start:end], corpus['tr'][start:end]))
+
+def starts_paragraph(corpus, book, chapter, verse):
+    """True if the verse starts a paragraph (always for the first verse of a chapter)."""
+    if verse == 1:
+        return True
+    words = corpus['paragraphs'].get(f"{book} {chapter}", [])
+    word, bit = divmod(verse - 1, 64)
+    return word < len(words) and bool(words[word] >> bit & 1)
+
+def paragraphs(corpus, book, chapter, edition='kjv'):
+    """Return a chapter of one edition ('kjv' or 'tr') as a list of paragraphs,
+    each a list of (ref, text); verses the edition lacks are skipped."""
+    start, end = corpus['chapters'].get(f"{book} {chapter}", (0, 0))
+    result = []
+    for ref, text in zip(corpus['refs'][start:end], corpus[edition][start:end]):
+        if text is None:
+            continue
+        if not result or starts_paragraph(corpus, book, chapter, int(ref.rpartition(':')[2])):
+            result.append([])
+        result[-1].append((ref, text))
+    return result
+
+def group_runs(refs):
+    """Collapse consecutive verses of one chapter into "book ch:first-last" ranges."""
+    runs = []
+    for ref in refs:
+        chapter, _, verse = ref.rpartition(':')
+        if runs and runs[-1][0] == chapter and runs[-1][2] == int(verse) - 1:
+            runs[-1][2] = int(verse)
+        else:
+            runs.append([chapter, int(verse), int(verse)])
+    return [f"{chapter}:{first}" if first == last else f"{chapter}:{first}-{last}"
+            for chapter, first, last in runs]
+
+def main():
+    if len(sys.argv) > 1:
+        corpus = load_parallel_corpus()
+        try:
+            rows = fetch_range(corpus, *sys.argv[1:3])
+        except KeyError as e:
+            print(f"Unknown verse reference: {e}")
+            sys.exit(1)
+        for ref, kjv, tr in rows:
+            print(ref)
+            print(f"  KJV: {kjv if kjv is not None else '(missing)'}")
+            print(f"  TR:  {tr if tr is not None else '(missing)'}")
+        return
+
+    print("Building KJV / Textus Receptus parallel corpus...")
+    corpus = build_parallel_corpus()
+    write_json(OUTPUT_PATH, corpus, indent=None, separators=(',', ':'), ensure_ascii=False)
+    mismatches = corpus['mismatches']
+    print(f"Aligned {len(corpus['refs'])} verses in {len(corpus['chapters'])} chapters")
+    print(f"KJV only: {len(mismatches['kjv_only'])} verses")
+    for run in group_runs(mismatches['kjv_only']):
+        print(f"  {run}")
+    print(f"TR only: {len(mismatches['tr_only'])} verses")
+    for run in group_runs(mismatches['tr_only']):
+        print(f"  {run}")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
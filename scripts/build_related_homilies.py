@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Find related homilies and paragraphs across the commentaries by content.
+
+Every paragraph read by build_commentary_index.read_paragraphs() becomes a
+TF-IDF vector (sublinear term frequency, smoothed IDF, unit length) in a
+sparse matrix. Cosine similarities are computed block by block as sparse
+matrix products, and the top K neighbours of each paragraph are kept, leaving
+out paragraphs of the same homily. Homilies are compared the same way, each
+one the normalized sum of its paragraph vectors.
+
+Homilies of one commentary resemble each other more than anything in another
+commentary, so neighbours are kept per target commentary: the K closest in
+Chrysostom on Matthew, the K closest in Cyril on Luke, and so on. The result
+is a neighbour table per level, in CSR layout:
+
+    {
+      "format": "hypomnema-neighbours",
+      "version": 1,
+      "k": 10,
+      "paragraphs": {
+        "docs": ["chrysostom matthew 1:1", ...],
+        "by_commentary": {
+          "cyril luke": {"indptr": [0, 10, ...], "neighbours": [8012, ...], "scores": [0.4132, ...]},
+          ...
+        }
+      },
+      "homilies": {"docs": ["chrysostom matthew 1", ...], "by_commentary": {...}}
+    }
+
+Within a commentary's lists, the neighbours of docs[i] are
+neighbours[indptr[i]:indptr[i + 1]], best first, with their cosine
+similarity in scores. Paragraphs shorter than MIN_TOKENS words (headings,
+verse quotations) get no neighbours and are never one.
+
+Usage:
+    python scripts/build_related_homilies.py
+    python scripts/build_related_homilies.py "chrysostom matthew 15"
+"""
+
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    print("numpy and scipy not installed. Install with: pip install numpy scipy")
+    sys.exit(1)
+
+from build_commentary_index import read_paragraphs
+from json_output import write_json
+from scripture import REPO_ROOT
+from search_index import normalize_english, tokenize
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'related' / 'related_commentary.json'
+
+FORMAT_NAME = 'hypomnema-neighbours'
+FORMAT_VERSION = 1
+
+K = 10
+MIN_TOKENS = 20
+# Terms in fewer paragraphs than this, or in more than this share of them, are dropped
+MIN_DF = 2
+MAX_DF = 0.5
+# Rows per block of the similarity product
+BLOCK_SIZE = 1024
+
+def homily_key(ref):
+    """"chrysostom matthew 5:12" -> "chrysostom matthew 5"."""
+    return ref.rpartition(':')[0]
+
+def commentary_key(ref):
+    """"chrysostom matthew 5:12" or "chrysostom matthew 5" -> "chrysostom matthew"."""
+    return ' '.join(ref.split(' ')[:2])
+
+def count_matrix(texts):
+    """Return the paragraph x term count matrix (CSR) and the vocabulary."""
+    vocabulary = {}
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for start, end in tokenize(text):
+            term = normalize_english(text[start:end])
+            if len(term) < 2:
+                continue
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+    counts = sparse.csr_matrix((np.ones(len(rows), dtype=np.float64), (rows, cols)),
+                               shape=(len(texts), len(vocabulary)))
+    counts.sum_duplicates()
+    return counts, vocabulary
+
+def tfidf(counts):
+    """Weight a count matrix by sublinear TF and smoothed IDF; rows are L2-normalized."""
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    keep = (df >= MIN_DF) & (df <= MAX_DF * n_docs)
+    idf = np.where(keep, np.log((1 + n_docs) / (1 + df)) + 1, 0.0)
+
+    weights = counts.copy()
+    weights.data = 1 + np.log(weights.data)
+    weights = weights @ sparse.diags(idf)
+    weights.eliminate_zeros()
+    return normalize_rows(weights)
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+def top_neighbours(vectors, groups, columns, k=K, block_size=BLOCK_SIZE):
+    """Return CSR lists (indptr, neighbours, scores) of each row's k most similar
+    rows among the given columns (row indexes).
+
+    Rows in the same group (and the row itself) are skipped, as are zero
+    similarities. Similarities are computed block_size rows at a time, so
+    memory stays at block_size x len(columns).
+    """
+    n = vectors.shape[0]
+    groups = np.asarray(groups)
+    columns = np.asarray(columns)
+    transposed = vectors[columns].T.tocsc()
+    count = min(k, len(columns))
+    indptr, neighbours, scores = [0], [], []
+    for first in range(0, n, block_size):
+        block = (vectors[first:first + block_size] @ transposed).toarray()
+        rows = np.arange(first, first + block.shape[0])
+        block[groups[rows][:, None] == groups[columns][None, :]] = 0
+
+        if count == 0:
+            indptr.extend([0] * block.shape[0])
+            continue
+        candidates = np.argpartition(-block, count - 1, axis=1)[:, :count]
+        for i, row in enumerate(candidates):
+            values = block[i, row]
+            order = np.lexsort((row, -values))
+            row, values = columns[row[order]], values[order]
+            positive = values > 0
+            neighbours.extend(row[positive].tolist())
+            scores.extend(np.round(values[positive], 4).tolist())
+            indptr.append(len(neighbours))
+    return indptr, neighbours, scores
+
+def neighbour_table(docs, vectors, groups):
+    """Neighbours of every doc within each commentary ("chrysostom matthew", ...)."""
+    commentaries = list(dict.fromkeys(commentary_key(ref) for ref in docs))
+    table = {'docs': docs, 'by_commentary': {}}
+    for commentary in commentaries:
+        columns = [i for i, ref in enumerate(docs) if commentary_key(ref) == commentary]
+        indptr, neighbours, scores = top_neighbours(vectors, groups, columns)
+        table['by_commentary'][commentary] = {'indptr': indptr, 'neighbours': neighbours, 'scores': scores}
+    return table
+
+def build_related():
+    docs, texts = read_paragraphs()
+    counts, _ = count_matrix(texts)
+    vectors = tfidf(counts)
+
+    # Short paragraphs are headings and quotations; they take no part
+    lengths = np.asarray(counts.sum(axis=1)).ravel()
+    vectors = sparse.diags((lengths >= MIN_TOKENS).astype(np.float64)) @ vectors
+    vectors = vectors.tocsr()
+    vectors.eliminate_zeros()
+
+    homilies = list(dict.fromkeys(homily_key(ref) for ref in docs))
+    homily_ids = {key: i for i, key in enumerate(homilies)}
+    paragraph_homily = np.array([homily_ids[homily_key(ref)] for ref in docs])
+
+    # Sum the paragraph vectors of each homily
+    membership = sparse.csr_matrix((np.ones(len(docs)), (paragraph_homily, np.arange(len(docs)))),
+                                   shape=(len(homilies), len(docs)))
+    homily_vectors = normalize_rows(membership @ vectors).tocsr()
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'k': K,
+        'paragraphs': neighbour_table(docs, vectors, paragraph_homily),
+        'homilies': neighbour_table(homilies, homily_vectors, np.arange(len(homilies))),
+    }
+
+def load_related(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        related = json.load(f)
+    if related.get('format') != FORMAT_NAME or related.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return related
+
+def neighbours_of(table, ref, commentary):
+    """Return [(ref, score)] for the neighbours of ref within a commentary, best first."""
+    i = table['docs'].index(ref)
+    lists = table['by_commentary'].get(commentary)
+    if lists is None:
+        return []
+    start, end = lists['indptr'][i], lists['indptr'][i + 1]
+    return [(table['docs'][j], score) for j, score in zip(lists['neighbours'][start:end],
+                                                          lists['scores'][start:end])]
+
+def main():
+    if len(sys.argv) > 1:
+        related = load_related()
+        ref = ' '.join(sys.argv[1:]).lower()
+        table = related['paragraphs'] if ':' in ref else related['homilies']
+        if ref not in table['docs']:
+            print(f"Unknown homily or paragraph: {ref}")
+            sys.exit(1)
+        for commentary in table['by_commentary']:
+            print(f"Related to {ref} in {commentary}:")
+            for neighbour, score in neighbours_of(table, ref, commentary)[:5]:
+                print(f"  {neighbour:<28} {score:.4f}")
+        return
+
+    print("Computing TF-IDF neighbours for commentary paragraphs...")
+    start = time.time()
+    related = build_related()
+    write_json(OUTPUT_PATH, related, indent=None, separators=(',', ':'), ensure_ascii=False)
+    paragraphs, homilies = related['paragraphs'], related['homilies']
+    print(f"{len(paragraphs['docs'])} paragraphs, {len(homilies['docs'])} homilies, "
+          f"{len(homilies['by_commentary'])} commentaries in {time.time() - start:.1f}s")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
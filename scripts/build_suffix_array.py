@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Build suffix and LCP arrays over the folded KJV and Textus Receptus text.
+
+The server's verse search is a case- and accent-insensitive substring test
+(strings.Contains on the folded text of build_verse_text.py) run against
+every verse, which no word index reproduces exactly: "eth the" or "ρχη"
+match inside words. A suffix array answers the same question with a binary
+search. Each corpus is its folded verses as UTF-8, separated by a NUL byte
+(which never occurs in a query, so no match spans two verses), and the
+arrays are saved as .npy files in texts/reference/search/suffix/, which
+np.load() memory-maps:
+
+    kjv_text.npy    uint8, the concatenated folded text
+    kjv_sa.npy      int32, byte offsets of the suffixes in sorted order
+    kjv_lcp.npy     int32, lcp[i] = common prefix length of suffixes sa[i - 1] and sa[i]
+    kjv_starts.npy  int32, byte offset of each verse's text
+    kjv_ordinals.npy int32, each verse's ordinal (see build_versification.py), -1 if uncounted
+
+plus kjv_suffix.json with the format, the verse references and the fold
+table. Suffixes are sorted bytewise by prefix doubling: every round sorts
+by (rank of the first k bytes, rank of the next k bytes) with NumPy, until
+all ranks are distinct. LCP is computed by Kasai's algorithm.
+
+A query is folded with the stored table and the start of its suffix range
+found in O(m log n) byte comparisons; the end of the range is read off the
+LCP array in time proportional to the number of matches. Offsets map back to verses by a binary search over the verse starts:
+
+    index = load_suffix_index('kjv')
+    verse_ordinals(index, "eth the")
+
+The arrays are derived and large, so they are not committed; run this
+script to build them. It requires NumPy.
+
+Usage:
+    python scripts/build_suffix_array.py
+    python scripts/build_suffix_array.py kjv "in the beginning"
+"""
+
+import io
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from build_verse_text import build_verse_text
+from build_versification import ordinal
+from json_output import atomic_output, write_json
+from scripture import REPO_ROOT, parse_verse_ref
+from snippets import fold_text, text_fold_table
+
+SUFFIX_DIR = REPO_ROOT / 'texts' / 'reference' / 'search' / 'suffix'
+CORPORA = ['kjv', 'tr']
+ARRAYS = ['text', 'sa', 'lcp', 'starts', 'ordinals']
+
+FORMAT_NAME = 'hypomnema-suffix-array'
+FORMAT_VERSION = 1
+
+SEPARATOR = b'\x00'
+
+def array_path(corpus, name):
+    return SUFFIX_DIR / f"{corpus}_{name}.npy"
+
+def header_path(corpus):
+    return SUFFIX_DIR / f"{corpus}_suffix.json"
+
+def suffix_array(text):
+    """Sort the suffixes of a uint8 array by prefix doubling."""
+    n = len(text)
+    rank = text.astype(np.int64)
+    sa = np.argsort(rank, kind='stable')
+    k = 1
+    while True:
+        # Rank of the k bytes after each suffix's first k, -1 past the end
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[sa], second[sa]
+        new_group = np.empty(n, dtype=bool)
+        new_group[0] = True
+        new_group[1:] = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(new_group) - 1
+        if new_group.all():
+            return sa.astype(np.int32)
+        k *= 2
+
+def lcp_array(text, sa):
+    """Kasai's algorithm: lcp[i] is the common prefix length of suffixes sa[i - 1] and sa[i]."""
+    n = len(sa)
+    data = text.tobytes()
+    suffixes = sa.tolist()
+    rank = [0] * n
+    for i, suffix in enumerate(suffixes):
+        rank[suffix] = i
+    lcp = [0] * n
+    h = 0
+    for position in range(n):
+        r = rank[position]
+        if r == 0:
+            h = 0
+            continue
+        previous = suffixes[r - 1]
+        while position + h < n and previous + h < n and data[position + h] == data[previous + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return np.array(lcp, dtype=np.int32)
+
+def build_suffix_index(corpus, fold=None):
+    """Return (header, {array name: array}) for one corpus."""
+    verse_text = build_verse_text(corpus, fold)
+    encoded = [folded.encode('utf-8') for folded in verse_text['folded']]
+    starts = np.cumsum([0] + [len(text) + len(SEPARATOR) for text in encoded[:-1]])
+    text = np.frombuffer(SEPARATOR.join(encoded), dtype=np.uint8)
+    ordinals = []
+    for ref in verse_text['docs']:
+        try:
+            ordinals.append(ordinal(*parse_verse_ref(ref)))
+        except IndexError:
+            ordinals.append(-1)
+    sa = suffix_array(text)
+    arrays = {
+        'text': text,
+        'sa': sa,
+        'lcp': lcp_array(text, sa),
+        'starts': starts.astype(np.int32),
+        'ordinals': np.array(ordinals, dtype=np.int32),
+    }
+    header = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'corpus': corpus,
+        'fold': verse_text['fold'],
+        'docs': verse_text['docs'],
+    }
+    return header, arrays
+
+def save_array(path, array, skip_unchanged=False):
+    """Save an array as .npy atomically; returns True if the file was written."""
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    data = buffer.getvalue()
+    if skip_unchanged and path.exists() and path.read_bytes() == data:
+        return False
+    with atomic_output(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def write_suffix_index(corpus, header, arrays, skip_unchanged=False):
+    """Write a corpus's arrays and header. Returns the paths written."""
+    SUFFIX_DIR.mkdir(parents=True, exist_ok=True)
+    written = [array_path(corpus, name) for name in ARRAYS
+               if save_array(array_path(corpus, name), arrays[name], skip_unchanged)]
+    if write_json(header_path(corpus), header, indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=skip_unchanged):
+        written.append(header_path(corpus))
+    return written
+
+def load_suffix_index(corpus, mmap_mode='r'):
+    """Load a corpus's header and arrays, memory-mapped by default."""
+    path = header_path(corpus)
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('format') != FORMAT_NAME or index.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    for name in ARRAYS:
+        index[name] = np.load(array_path(corpus, name), mmap_mode=mmap_mode)
+    return index
+
+def fold_query(index, query):
+    return fold_text(query, index['fold'])[0].encode('utf-8')
+
+def suffix_range(index, query):
+    """Return [lo, hi) of the suffixes starting with the folded query."""
+    pattern = fold_query(index, query)
+    if not pattern or SEPARATOR in pattern:
+        return 0, 0
+    text, sa, m = index['text'], index['sa'], len(pattern)
+    lo, hi = 0, len(sa)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = int(sa[mid])
+        if text[start:start + m].tobytes() < pattern:
+            lo = mid + 1
+        else:
+            hi = mid
+    start = int(sa[lo]) if lo < len(sa) else 0
+    if lo == len(sa) or text[start:start + m].tobytes() != pattern:
+        return lo, lo
+    # The range continues while the next suffix shares at least m bytes; scan
+    # the LCP array in doubling blocks, so the cost follows the match count
+    lcp, end, size = index['lcp'], lo + 1, 64
+    while end < len(sa):
+        shorter = np.flatnonzero(lcp[end:end + size] < m)
+        if len(shorter):
+            return lo, end + int(shorter[0])
+        end, size = end + size, size * 2
+    return lo, len(sa)
+
+def occurrences(index, query):
+    """Byte offsets of every match of the query, in text order."""
+    lo, hi = suffix_range(index, query)
+    return np.sort(index['sa'][lo:hi])
+
+def match_count(index, query):
+    lo, hi = suffix_range(index, query)
+    return hi - lo
+
+def verse_indexes(index, query):
+    """Indexes (into docs) of the verses containing the query, in canonical order."""
+    return np.unique(np.searchsorted(index['starts'], occurrences(index, query), side='right') - 1)
+
+def verse_ordinals(index, query):
+    """Verse ordinals of the verses containing the query (uncounted verses left out)."""
+    ordinals = index['ordinals'][verse_indexes(index, query)]
+    return ordinals[ordinals >= 0]
+
+def main():
+    if len(sys.argv) == 3:
+        corpus, query = sys.argv[1].lower(), sys.argv[2]
+        index = load_suffix_index(corpus)
+        verses = verse_indexes(index, query)
+        print(f"{match_count(index, query)} matches in {len(verses)} verses")
+        for i in verses[:20]:
+            print(f"  {index['docs'][i]}")
+        return
+
+    print("Building suffix arrays over the folded KJV and Textus Receptus...")
+    fold = text_fold_table()
+    for corpus in CORPORA:
+        start = time.time()
+        header, arrays = build_suffix_index(corpus, fold)
+        write_suffix_index(corpus, header, arrays)
+        print(f"  {corpus}: {len(arrays['sa'])} suffixes over {len(header['docs'])} verses, "
+              f"longest repeat {int(arrays['lcp'].max())} bytes, {time.time() - start:.1f}s "
+              f"-> {SUFFIX_DIR.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
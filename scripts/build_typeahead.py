@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Build the typeahead index: KJV vocabulary, book names and abbreviations, and
+chapter/verse counts for completing and resolving references.
+
+The index is one JSON file of sorted arrays, so a prefix is two binary
+searches away from its completions:
+
+    {
+      "format": "hypomnema-typeahead",
+      "version": 1,
+      "books": [{"id": "matthew", "name": "Matthew", "verses": [25, 23, ...]}, ...],
+      "aliases": {"keys": ["1co", "1cor", ...], "books": [6, 6, ...]},
+      "words": {"keys": ["aaron", ...], "counts": [5, ...], "top": {"a": [12, 40, ...], ...}}
+    }
+
+books[i].verses holds the verse count of each chapter, from the
+versification table (build_versification.py). aliases.keys are
+folded book names and abbreviations (lowercase, no spaces or dots: "Matt."
+is "matt", "1 Cor" is "1cor") and aliases.books the index of the book each
+one names. words.keys is the folded KJV vocabulary with its counts; for
+prefixes of up to TOP_PREFIX_LENGTH characters, words.top lists the indexes
+of the most frequent completions, since those ranges are too long to rank on
+every keystroke.
+
+complete() returns the completions for what has been typed so far and
+resolve() turns a finished reference into (book, chapter, verse).
+
+Usage:
+    python scripts/build_typeahead.py
+    python scripts/build_typeahead.py "1 cor 13:"
+"""
+
+import json
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from build_versification import load_versification
+from json_output import write_json
+from scripture import NT_BOOKS, REPO_ROOT, iter_kjv_verses
+from search_index import normalize_english, tokenize
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'search' / 'typeahead.json'
+
+FORMAT_NAME = 'hypomnema-typeahead'
+FORMAT_VERSION = 1
+
+BOOK_NAMES = {
+    'matthew': 'Matthew', 'mark': 'Mark', 'luke': 'Luke', 'john': 'John',
+    'acts': 'Acts', 'romans': 'Romans', '1corinthians': '1 Corinthians', '2corinthians': '2 Corinthians',
+    'galatians': 'Galatians', 'ephesians': 'Ephesians', 'philippians': 'Philippians',
+    'colossians': 'Colossians', '1thessalonians': '1 Thessalonians', '2thessalonians': '2 Thessalonians',
+    '1timothy': '1 Timothy', '2timothy': '2 Timothy', 'titus': 'Titus', 'philemon': 'Philemon',
+    'hebrews': 'Hebrews', 'james': 'James', '1peter': '1 Peter', '2peter': '2 Peter',
+    '1john': '1 John', '2john': '2 John', '3john': '3 John', 'jude': 'Jude', 'revelation': 'Revelation',
+}
+
+# Common abbreviations; numbered books list them without the number
+ABBREVIATIONS = {
+    'matthew': ['matt', 'mat', 'mt'],
+    'mark': ['mrk', 'mk', 'mr'],
+    'luke': ['luk', 'lk', 'lu'],
+    'john': ['joh', 'jhn', 'jn'],
+    'acts': ['act', 'ac'],
+    'romans': ['rom', 'ro', 'rm'],
+    'corinthians': ['cor', 'co'],
+    'galatians': ['gal', 'ga'],
+    'ephesians': ['ephes', 'eph'],
+    'philippians': ['phil', 'php', 'pp'],
+    'colossians': ['col'],
+    'thessalonians': ['thess', 'thes', 'th'],
+    'timothy': ['tim', 'ti'],
+    'titus': ['tit'],
+    'philemon': ['philem', 'phlm', 'phm'],
+    'hebrews': ['heb'],
+    'james': ['jas', 'jm'],
+    'peter': ['pet', 'pe', 'pt'],
+    '1john': ['jn', 'jo', 'jhn'],
+    'jude': ['jud', 'jd'],
+    'revelation': ['rev', 're', 'revelations', 'apocalypse', 'apoc'],
+}
+
+# Ways of writing the number of a numbered book
+BOOK_NUMBERS = {'1': ['1', 'i'], '2': ['2', 'ii'], '3': ['3', 'iii']}
+
+# words.top covers prefixes up to this length, with this many completions each
+TOP_PREFIX_LENGTH = 3
+TOP_COMPLETIONS = 10
+
+REFERENCE = re.compile(r'^((?:[123]|i{1,3}\s)?\s*[a-z]+)\.?\s*(?:(\d+)(?:\s*:\s*(\d*))?)?$')
+
+def fold_alias(alias):
+    """Fold a book name or abbreviation: lowercase, without spaces or dots."""
+    return re.sub(r'[\s.]', '', alias.lower())
+
+def book_aliases():
+    """Return {folded alias: book id} for every book."""
+    aliases = {}
+    for book_id, name in BOOK_NAMES.items():
+        number, base = (book_id[0], book_id[1:]) if book_id[0].isdigit() else ('', book_id)
+        # 2john and 3john share 1john's abbreviations
+        forms = [base] + ABBREVIATIONS.get(base, []) + ABBREVIATIONS.get('1' + base, [])
+        prefixes = BOOK_NUMBERS[number] if number else ['']
+        for prefix in prefixes:
+            for form in forms:
+                aliases.setdefault(prefix + form, book_id)
+        aliases.setdefault(fold_alias(name), book_id)
+    return aliases
+
+def vocabulary():
+    """Return a Counter of the folded KJV words."""
+    words = Counter()
+    for _, _, _, text in iter_kjv_verses():
+        for start, end in tokenize(text):
+            word = normalize_english(text[start:end])
+            if word:
+                words[word] += 1
+    return words
+
+def prefix_range(keys, prefix):
+    """Return the (lo, hi) slice of sorted keys that start with prefix."""
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + '\U0010ffff')
+
+def build_typeahead():
+    books = list(NT_BOOKS)
+    counts = load_versification()['verses']
+    aliases = book_aliases()
+    alias_keys = sorted(aliases)
+
+    words = vocabulary()
+    word_keys = sorted(words)
+    word_counts = [words[word] for word in word_keys]
+    top = {}
+    for word in word_keys:
+        for length in range(1, min(len(word), TOP_PREFIX_LENGTH) + 1):
+            top.setdefault(word[:length], None)
+    for prefix in top:
+        lo, hi = prefix_range(word_keys, prefix)
+        ranked = sorted(range(lo, hi), key=lambda i: (-word_counts[i], i))
+        top[prefix] = ranked[:TOP_COMPLETIONS]
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'books': [{'id': book, 'name': BOOK_NAMES[book], 'verses': counts[book]} for book in books],
+        'aliases': {'keys': alias_keys, 'books': [books.index(aliases[key]) for key in alias_keys]},
+        'words': {'keys': word_keys, 'counts': word_counts, 'top': top},
+    }
+
+def load_typeahead(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        typeahead = json.load(f)
+    if typeahead.get('format') != FORMAT_NAME or typeahead.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return typeahead
+
+def match_books(typeahead, text):
+    """Return the indexes of the books text can name: an exact alias, else every
+    book with an alias starting with text."""
+    keys = typeahead['aliases']['keys']
+    text = fold_alias(text)
+    lo, hi = prefix_range(keys, text)
+    if lo < hi and keys[lo] == text:
+        return [typeahead['aliases']['books'][lo]]
+    return sorted(set(typeahead['aliases']['books'][lo:hi]))
+
+def complete_words(typeahead, prefix, limit=TOP_COMPLETIONS):
+    """Return up to limit vocabulary words starting with prefix, most frequent first."""
+    words = typeahead['words']
+    prefix = normalize_english(prefix)
+    if not prefix:
+        return []
+    if prefix in words['top'] and limit <= TOP_COMPLETIONS:
+        return [words['keys'][i] for i in words['top'][prefix][:limit]]
+    lo, hi = prefix_range(words['keys'], prefix)
+    ranked = sorted(range(lo, hi), key=lambda i: (-words['counts'][i], i))
+    return [words['keys'][i] for i in ranked[:limit]]
+
+def resolve(typeahead, query):
+    """Resolve a reference like "jn 3:16", "1 Cor 13" or "Matt." to (book id, chapter, verse).
+
+    chapter and verse are None when not given. Returns None if the query is
+    not a reference to one book, or names a chapter or verse that does not exist.
+    """
+    match = REFERENCE.match(query.strip().lower())
+    if not match:
+        return None
+    books = match_books(typeahead, match.group(1))
+    if len(books) != 1:
+        return None
+    book = typeahead['books'][books[0]]
+    chapter = int(match.group(2)) if match.group(2) else None
+    verse = int(match.group(3)) if match.group(3) else None
+    if chapter is not None and not 1 <= chapter <= len(book['verses']):
+        return None
+    if verse is not None and not 1 <= verse <= book['verses'][chapter - 1]:
+        return None
+    return book['id'], chapter, verse
+
+def complete(typeahead, query, limit=TOP_COMPLETIONS):
+    """Return up to limit completions of a partly typed query.
+
+    A reference in progress completes to book names ("1 co" -> "1 Corinthians"),
+    chapters ("john 1" -> "John 1", "John 10", ...) or verses ("john 3:" ->
+    "John 3:1", ...). Anything else completes its last word from the KJV vocabulary.
+    """
+    match = REFERENCE.match(query.strip().lower())
+    if match:
+        books = match_books(typeahead, match.group(1))
+        if books:
+            chapter, verse = match.group(2), match.group(3)
+            if chapter is None:
+                # A lone word may be a book or the start of a search
+                names = [typeahead['books'][i]['name'] for i in books]
+                return (names + complete_text(typeahead, query, limit))[:limit]
+            book = typeahead['books'][books[0]]
+            if verse is None and ':' not in query:
+                return [f"{book['name']} {c}" for c in range(1, len(book['verses']) + 1)
+                        if str(c).startswith(chapter)][:limit]
+            if len(books) == 1 and 1 <= int(chapter) <= len(book['verses']):
+                count = book['verses'][int(chapter) - 1]
+                return [f"{book['name']} {chapter}:{v}" for v in range(1, count + 1)
+                        if str(v).startswith(verse or '')][:limit]
+            return []
+
+    return complete_text(typeahead, query, limit)
+
+def complete_text(typeahead, query, limit=TOP_COMPLETIONS):
+    """Complete the last word of query from the vocabulary, keeping the words before it."""
+    spans = tokenize(query)
+    if not spans or spans[-1][1] != len(query):
+        return []
+    head = query[:spans[-1][0]]
+    return [head + word for word in complete_words(typeahead, query[spans[-1][0]:], limit)]
+
+def main():
+    if len(sys.argv) > 1:
+        typeahead = load_typeahead()
+        query = ' '.join(sys.argv[1:])
+        start = time.perf_counter()
+        completions = complete(typeahead, query)
+        reference = resolve(typeahead, query)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{query!r} ({elapsed:.0f} µs)")
+        if reference:
+            print(f"  resolves to {reference}")
+        for completion in completions:
+            print(f"  {completion}")
+        return
+
+    print("Building typeahead index...")
+    typeahead = build_typeahead()
+    write_json(OUTPUT_PATH, typeahead, indent=None, separators=(',', ':'), ensure_ascii=False)
+    print(f"{len(typeahead['aliases']['keys'])} book aliases, {len(typeahead['words']['keys'])} words, "
+          f"{len(typeahead['words']['top'])} ranked prefixes")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Write the case-folded verse text of the KJV and the Greek TR for substring search.
+
+Each corpus is one JSON file:
+
+    {
+      "format": "hypomnema-verse-text",
+      "version": 1,
+      "corpus": "kjv",
+      "fold": {"A": "a", "Ἀ": "α", ...},
+      "docs": ["matthew 1:1", ...],
+      "text": ["The book of the generation ...", ...],
+      "folded": ["the book of the generation ...", ...],
+      "offsets": [[], ...]
+    }
+
+folded[i] is text[i] folded character by character (see snippets.py) and
+offsets[i] its breakpoint list, which maps byte offsets in folded[i] back to
+text[i]. "fold" is the character table used, so readers fold queries the
+same way; characters not in it fold to their lowercase.
+
+Usage:
+    python scripts/build_verse_text.py
+    python scripts/snippets.py "in the beginning" "In the beginning was the Word"
+"""
+
+import time
+
+from json_output import write_json
+from scripture import REPO_ROOT, iter_kjv_verses, iter_tr_verses, verse_ref
+from snippets import fold_text, text_fold_table
+
+SEARCH_DIR = REPO_ROOT / 'texts' / 'reference' / 'search'
+OUTPUT_PATHS = {
+    'kjv': SEARCH_DIR / 'kjv_verse_text.json',
+    'tr': SEARCH_DIR / 'tr_verse_text.json',
+}
+READERS = {
+    'kjv': iter_kjv_verses,
+    'tr': iter_tr_verses,
+}
+
+FORMAT_NAME = 'hypomnema-verse-text'
+FORMAT_VERSION = 1
+
+def build_verse_text(corpus, fold=None):
+    fold = text_fold_table() if fold is None else fold
+    docs, texts, folded_texts, offsets = [], [], [], []
+    for book, chapter, verse, text in READERS[corpus]():
+        folded, breaks = fold_text(text, fold)
+        docs.append(verse_ref(book, chapter, verse))
+        texts.append(text)
+        folded_texts.append(folded)
+        offsets.append(breaks)
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'corpus': corpus,
+        'fold': fold,
+        'docs': docs,
+        'text': texts,
+        'folded': folded_texts,
+        'offsets': offsets,
+    }
+
+def write_verse_texts(skip_unchanged=False):
+    """Build and write every corpus. Returns the paths written."""
+    fold = text_fold_table()
+    written = []
+    for corpus, path in OUTPUT_PATHS.items():
+        verse_text = build_verse_text(corpus, fold)
+        if write_json(path, verse_text, indent=None, separators=(',', ':'), ensure_ascii=False,
+                      skip_unchanged=skip_unchanged):
+            written.append(path)
+    return written
+
+def main():
+    print("Folding KJV and Textus Receptus verse text...")
+    start = time.time()
+    fold = text_fold_table()
+    for corpus, path in OUTPUT_PATHS.items():
+        verse_text = build_verse_text(corpus, fold)
+        write_json(path, verse_text, indent=None, separators=(',', ':'), ensure_ascii=False)
+        remapped = sum(1 for breaks in verse_text['offsets'] if breaks)
+        print(f"  {corpus}: {len(verse_text['docs'])} verses, {remapped} with an offset map "
+              f"-> {path.relative_to(REPO_ROOT)}")
+    print(f"Done in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Build the versification table: the number of verses in every chapter of the
+New Testament, with cumulative verse ordinals, derived from the KJV and TR.
+
+    {
+      "format": "hypomnema-versification",
+      "version": 1,
+      "books": ["matthew", ...],
+      "verses": {"matthew": [25, 23, ...], ...},
+      "offsets": {"matthew": [0, 25, 48, ...], ...},
+      "total": 7958,
+      "disagreements": {"acts 1": {"kjv": 32, "tr": 26}, ...}
+    }
+
+verses[book][c - 1] is the verse count of chapter c and offsets[book][c - 1]
+the 0-based ordinal of its first verse, counting from Matthew 1:1, so every
+verse of the New Testament has one ordinal and a range of verses is a range
+of ordinals. total is the number of verses.
+
+A chapter's count is the KJV's. The editions legitimately differ by a verse
+at some chapter ends (Acts 19:41, 2 Corinthians 13:14, Revelation 12:18);
+where they differ by more than MAX_DRIFT the KJV chapter has text misfiled
+from another book or missing verses, and the TR count is used instead. Every
+chapter where the two differ is listed under disagreements.
+
+The table is loaded once per process by versification(); verse_count(),
+last_verse(), ordinal() and from_ordinal() read it.
+
+Usage:
+    python scripts/build_versification.py
+    python scripts/build_versification.py matthew 27
+"""
+
+import json
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+
+from json_output import write_json
+from scripture import NT_BOOKS, REPO_ROOT, iter_kjv_verses, iter_tr_verses
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'versification.json'
+
+FORMAT_NAME = 'hypomnema-versification'
+FORMAT_VERSION = 1
+
+MAX_DRIFT = 1
+
+def chapter_counts(reader):
+    """Return {book: [highest verse number per chapter]} for one edition (0 if missing)."""
+    counts = {book: [0] * chapters for book, chapters in NT_BOOKS.items()}
+    for book, chapter, verse, _ in reader():
+        if chapter <= len(counts[book]):
+            counts[book][chapter - 1] = max(counts[book][chapter - 1], verse)
+    return counts
+
+def build_versification():
+    kjv = chapter_counts(iter_kjv_verses)
+    tr = chapter_counts(iter_tr_verses)
+    verses, offsets, disagreements = {}, {}, {}
+    total = 0
+    for book in NT_BOOKS:
+        verses[book], offsets[book] = [], []
+        for chapter, (kjv_count, tr_count) in enumerate(zip(kjv[book], tr[book]), 1):
+            count = kjv_count if abs(kjv_count - tr_count) <= MAX_DRIFT or not tr_count else tr_count
+            if kjv_count != tr_count:
+                disagreements[f"{book} {chapter}"] = {'kjv': kjv_count, 'tr': tr_count}
+            verses[book].append(count)
+            offsets[book].append(total)
+            total += count
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'books': list(NT_BOOKS),
+        'verses': verses,
+        'offsets': offsets,
+        'total': total,
+        'disagreements': disagreements,
+    }
+
+def load_versification(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get('format') != FORMAT_NAME or table.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    # Ordinal of the first verse of each book, for from_ordinal()
+    table['starts'] = [table['offsets'][book][0] for book in table['books']]
+    return table
+
+@lru_cache(maxsize=None)
+def versification():
+    """The versification table, loaded on first use."""
+    return load_versification()
+
+def verse_count(book, chapter):
+    """Number of verses in a chapter (KeyError/IndexError if there is no such chapter)."""
+    if chapter < 1:
+        raise IndexError(f"{book} has no chapter {chapter}")
+    return versification()['verses'][book][chapter - 1]
+
+def last_verse(book):
+    """(chapter, verse) of the last verse of a book."""
+    counts = versification()['verses'][book]
+    return len(counts), counts[-1]
+
+def ordinal(book, chapter, verse):
+    """0-based position of a verse in the New Testament."""
+    if not 1 <= verse <= verse_count(book, chapter):
+        raise IndexError(f"{book} {chapter} has no verse {verse}")
+    return versification()['offsets'][book][chapter - 1] + verse - 1
+
+def from_ordinal(n):
+    """(book, chapter, verse) of a 0-based verse ordinal."""
+    table = versification()
+    if not 0 <= n < table['total']:
+        raise IndexError(f"verse ordinal {n} out of range")
+    book = table['books'][bisect_right(table['starts'], n) - 1]
+    offsets = table['offsets'][book]
+    chapter = bisect_right(offsets, n)
+    return book, chapter, n - offsets[chapter - 1] + 1
+
+def main():
+    if len(sys.argv) > 1:
+        book = sys.argv[1].lower()
+        chapters = [int(arg) for arg in sys.argv[2:]] or range(1, NT_BOOKS[book] + 1)
+        for chapter in chapters:
+            print(f"{book} {chapter}: {verse_count(book, chapter)} verses, "
+                  f"ordinals {ordinal(book, chapter, 1)}-{ordinal(book, chapter, verse_count(book, chapter))}")
+        return
+
+    print("Building versification table from the KJV and Textus Receptus...")
+    table = build_versification()
+    write_json(OUTPUT_PATH, table, indent=None, separators=(',', ':'))
+    print(f"{len(table['books'])} books, {sum(map(len, table['verses'].values()))} chapters, "
+          f"{table['total']} verses")
+    for chapter, counts in table['disagreements'].items():
+        print(f"  {chapter}: KJV {counts['kjv']}, TR {counts['tr']}")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
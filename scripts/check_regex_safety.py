@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Check the extractors' regular expressions for super-linear matching time.
+
+The extractors run their patterns over whole ThML and HTML files several
+megabytes long. A lazy "opener.*?closer" pattern is linear on well-formed
+markup, but when a closer is missing, finditer() scans from every opener to
+the end of the file. That is quadratic in the number of openers, and a
+truncated or hand-edited source can stall a rebuild. This script finds every
+pattern literal passed to re.compile, re.search, re.finditer and the other
+re functions in the extractors, builds inputs that stress it and times it as
+the inputs grow.
+
+Each pattern is parsed (with the re module's own parser) into a witness, a
+short string it matches, with the pattern's flags taken from the call. The
+witness is used four ways, each at doubling sizes:
+
+    repeated   the witness over and over: well-formed input, many matches
+    unclosed   the witness less its last character, over and over
+    openers    the witness up to its first lazy repetition (the .*? of
+               "opener.*?closer") or else its last unbounded one, over and
+               over: every opener and no closer
+    stretched  one witness whose every repetition (*, +, {m,n}) is n
+               characters long, less its last character
+
+Repeated units are separated by newlines, as lines of markup are. A pattern
+is flagged when its time grows faster than SUPERLINEAR (an exponent of 1.5;
+linear is 1, quadratic 2) over the last two doublings, or when one input kind
+takes longer than --timeout seconds. Each input kind runs in its own
+process, so a runaway match is killed rather than waited for. Patterns built
+at run time (f-strings, concatenations) are listed as not checked.
+
+Lazy patterns over whole documents are rewritten with lazy_match.py, which
+pairs each opener with the next closer in one forward pass.
+
+Usage:
+    python scripts/check_regex_safety.py
+    python scripts/check_regex_safety.py --verbose
+    python scripts/check_regex_safety.py scripts/extract_footnotes_to_json.py
+"""
+
+import argparse
+import ast
+import math
+import multiprocessing
+import queue
+import re
+import sys
+import time
+from pathlib import Path
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+from scripture import REPO_ROOT
+
+EXTRACTOR_GLOBS = ['scripts/extract_*.py', 'texts/commentaries/*/*/extract_*.py']
+
+# re functions taking a pattern first, and the position of their flags argument
+RE_FUNCTIONS = {
+    'compile': 1, 'search': 2, 'match': 2, 'fullmatch': 2, 'finditer': 2,
+    'findall': 2, 'split': 3, 'sub': 4, 'subn': 4,
+}
+
+KINDS = ['repeated', 'unclosed', 'openers', 'stretched']
+# Input length of the smallest size, and how many times it is doubled
+BASE_LENGTH = 2000
+DOUBLINGS = 5
+RUNS = 3
+# Times below this are too noisy to extrapolate from
+MIN_SECONDS = 0.005
+SUPERLINEAR = 1.5
+DEFAULT_TIMEOUT = 10.0
+
+# Characters tried, in order, for a character class; "a" keeps stretched runs inside [^>] and [^<]
+CANDIDATE_CHARS = 'a ' + '0Ix.<>"=-:,;\n' + 'bcdefghijklmnopqrstuvwxyz'
+
+def display_path(path):
+    """path relative to the repository root, or as given if it lies outside it."""
+    try:
+        return path.relative_to(REPO_ROOT)
+    except ValueError:
+        return path
+
+class Pattern:
+    def __init__(self, path, line, function, source, flags):
+        self.path = path
+        self.line = line
+        self.function = function
+        self.source = source
+        self.flags = flags
+
+    @property
+    def location(self):
+        return f"{display_path(self.path)}:{self.line}"
+
+def flags_value(node):
+    """Evaluate a flags argument such as re.DOTALL | re.IGNORECASE, or None."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        left, right = flags_value(node.left), flags_value(node.right)
+        return None if left is None or right is None else left | right
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 're':
+        value = getattr(re, node.attr, None)
+        return int(value) if isinstance(value, re.RegexFlag) else None
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return node.value
+    return None
+
+def string_literals(node):
+    """The strings of a string literal or a list or tuple of them, or None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)) and node.elts and all(
+            isinstance(item, ast.Constant) and isinstance(item.value, str) for item in node.elts):
+        return [item.value for item in node.elts]
+    return None
+
+def find_patterns(path):
+    """Return ([Pattern], [(line, function)] of the patterns built at run time) in a source file."""
+    tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+    # Names bound to string literals: pattern = r'...', and the loop variable
+    # of for pattern in patterns, where patterns is a list of literals
+    literals, lists = {}, {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            strings = string_literals(node.value)
+            if isinstance(node.value, ast.Constant) and strings:
+                literals.setdefault(node.targets[0].id, []).extend(strings)
+            elif strings:
+                lists[node.targets[0].id] = strings
+    for node in ast.walk(tree):
+        if isinstance(node, ast.For) and isinstance(node.target, ast.Name):
+            strings = string_literals(node.iter)
+            if isinstance(node.iter, ast.Name):
+                strings = lists.get(node.iter.id)
+            if strings:
+                literals.setdefault(node.target.id, []).extend(strings)
+
+    patterns, dynamic = [], []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == 're'
+                and node.func.attr in RE_FUNCTIONS and node.args):
+            continue
+        function, argument = node.func.attr, node.args[0]
+        if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+            sources = [argument.value]
+        elif isinstance(argument, ast.Name) and argument.id in literals:
+            sources = literals[argument.id]
+        else:
+            dynamic.append((node.lineno, function))
+            continue
+        flags = 0
+        position = RE_FUNCTIONS[function]
+        flags_node = next((k.value for k in node.keywords if k.arg == 'flags'), None)
+        if flags_node is None and len(node.args) > position:
+            flags_node = node.args[position]
+        if flags_node is not None:
+            flags = flags_value(flags_node)
+            if flags is None:
+                dynamic.append((node.lineno, function))
+                continue
+        for source in sources:
+            patterns.append(Pattern(path, node.lineno, function, source, flags))
+    return sorted(patterns, key=lambda p: p.line), sorted(dynamic)
+
+def class_accepts(items, char):
+    """Whether a parsed character class ([...], \\s, \\d) accepts char."""
+    code = ord(char)
+    negate = False
+    accepted = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            accepted = accepted or code == av
+        elif op is sre_constants.RANGE:
+            accepted = accepted or av[0] <= code <= av[1]
+        elif op is sre_constants.CATEGORY:
+            name = str(av)
+            if 'DIGIT' in name:
+                hit = char.isdigit()
+            elif 'SPACE' in name:
+                hit = char.isspace()
+            elif 'WORD' in name:
+                hit = char.isalnum() or char == '_'
+            else:
+                hit = False
+            accepted = accepted or (hit != ('NOT' in name))
+    return accepted != negate
+
+def class_char(items):
+    for char in CANDIDATE_CHARS:
+        if class_accepts(items, char):
+            return char
+    return None
+
+class Cut(Exception):
+    """Raised at the repetition a witness is cut at, carrying the text before it."""
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.prefix = prefix
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None))
+
+def witness(parsed, stretch=0, state=None):
+    """Build a string the parsed pattern matches, or None.
+
+    With stretch, every unbounded or wide enough repetition is repeated
+    stretch times instead of its minimum. state counts the unbounded
+    repetitions met (state['unbounded']) and notes the first lazy one
+    (state['lazy']); when the count reaches state['cut'], Cut is raised with
+    the witness so far.
+    """
+    state = {'unbounded': 0, 'cut': None, 'groups': {}} if state is None else state
+    pieces = []
+    for op, av in parsed:
+        try:
+            piece = witness_item(op, av, stretch, state)
+        except Cut as cut:
+            raise Cut(''.join(pieces) + cut.prefix)
+        if piece is None:
+            return None
+        pieces.append(piece)
+    return ''.join(pieces)
+
+def witness_item(op, av, stretch, state):
+    if op is sre_constants.LITERAL:
+        return chr(av)
+    if op is sre_constants.NOT_LITERAL:
+        return 'a' if av != ord('a') else 'b'
+    if op is sre_constants.ANY:
+        return 'a'
+    if op is sre_constants.IN:
+        return class_char(av)
+    if op in REPEATS:
+        low, high, item = av
+        if high == sre_constants.MAXREPEAT:
+            if state['unbounded'] == state['cut']:
+                raise Cut('')
+            if op is sre_constants.MIN_REPEAT and state.get('lazy') is None:
+                state['lazy'] = state['unbounded']
+            state['unbounded'] += 1
+        count = low
+        if stretch and (high == sre_constants.MAXREPEAT or high >= stretch):
+            count = max(low, stretch)
+        one = witness(item, stretch, state)
+        return None if one is None else one * count
+    if op is sre_constants.SUBPATTERN:
+        group, _, _, item = av
+        piece = witness(item, stretch, state)
+        if group is not None and piece is not None:
+            state['groups'][group] = piece
+        return piece
+    if op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+        return witness(av, stretch, state)
+    if op is sre_constants.BRANCH:
+        return witness(av[1][0], stretch, state)
+    if op is sre_constants.GROUPREF:
+        return state['groups'].get(av)
+    if op is sre_constants.GROUPREF_EXISTS:
+        return witness(av[1], stretch, state)
+    if op is sre_constants.ASSERT:
+        # A lookahead (usually the pattern's last item) needs its text to follow
+        direction, item = av
+        return witness(item, stretch, state) if direction == 1 else ''
+    if op in (sre_constants.ASSERT_NOT, sre_constants.AT):
+        return ''
+    return None
+
+def openers(parsed):
+    """The witness up to the first lazy repetition or else the last unbounded
+    one, or None if there is neither."""
+    state = {'unbounded': 0, 'cut': None, 'lazy': None, 'groups': {}}
+    witness(parsed, state=state)
+    if not state['unbounded']:
+        return None
+    cut_at = state['lazy'] if state['lazy'] is not None else state['unbounded'] - 1
+    try:
+        witness(parsed, state={'unbounded': 0, 'cut': cut_at, 'groups': {}})
+    except Cut as cut:
+        return cut.prefix
+    return None
+
+def build_inputs(pattern):
+    """Return {kind: [input text at each size]}, or None when no witness matches the pattern."""
+    compiled = re.compile(pattern.source, pattern.flags)
+    parsed = sre_parse.parse(pattern.source, pattern.flags)
+    sample = witness(parsed)
+    if not sample or not compiled.search(sample):
+        return None
+    sizes = [BASE_LENGTH << i for i in range(DOUBLINGS + 1)]
+    units = {'repeated': sample, 'unclosed': sample[:-1], 'openers': openers(parsed)}
+    inputs = {}
+    for kind, unit in units.items():
+        if unit:
+            unit += '\n'
+            inputs[kind] = [unit * (size // len(unit) + 1) for size in sizes]
+    stretched = []
+    for size in sizes:
+        # Spread the size over the pattern's repetitions
+        text = witness(parsed, stretch=max(size // len(sample), 2))
+        if text is None:
+            break
+        stretched.append(text[:-1])
+    else:
+        inputs['stretched'] = stretched
+    return inputs
+
+def time_inputs(source, flags, texts, results):
+    """Time finditer over each text, best of RUNS, putting (length, seconds) on results."""
+    compiled = re.compile(source, flags)
+    for text in texts:
+        best = math.inf
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            for _ in compiled.finditer(text):
+                pass
+            best = min(best, time.perf_counter() - start)
+        results.put((len(text), best))
+
+def growth(timings):
+    """Exponent of the time's growth over the last two doublings, or None if too fast to tell."""
+    if len(timings) < 3:
+        return None
+    (small_length, small_time), (large_length, large_time) = timings[-3], timings[-1]
+    if large_time < MIN_SECONDS:
+        return None
+    return math.log(large_time / max(small_time, 1e-9)) / math.log(large_length / small_length)
+
+def check_pattern(pattern, timeout, context):
+    """Return {kind: (timings, exponent or None, timed out)}, or None if no input could be built."""
+    try:
+        inputs = build_inputs(pattern)
+    except (re.error, RecursionError, OverflowError):
+        inputs = None
+    if inputs is None:
+        return None
+    report = {}
+    for kind in KINDS:
+        if kind not in inputs:
+            continue
+        results = context.Queue()
+        process = context.Process(target=time_inputs,
+                                  args=(pattern.source, pattern.flags, inputs[kind], results))
+        process.start()
+        timings = []
+        deadline = time.monotonic() + timeout
+        while len(timings) < len(inputs[kind]):
+            try:
+                timings.append(results.get(timeout=max(deadline - time.monotonic(), 0.01)))
+            except queue.Empty:
+                break
+        timed_out = len(timings) < len(inputs[kind])
+        if timed_out:
+            process.terminate()
+        process.join()
+        report[kind] = (timings, growth(timings), timed_out)
+    return report
+
+def is_flagged(report):
+    return any(timed_out or (exponent is not None and exponent > SUPERLINEAR)
+               for _, exponent, timed_out in report.values())
+
+def describe(kind, timings, exponent, timed_out):
+    if timed_out:
+        done = f" after {timings[-1][0]} chars in {timings[-1][1]:.2f}s" if timings else ""
+        return f"{kind}: timed out{done}"
+    largest = timings[-1]
+    shape = f"exponent {exponent:.2f}" if exponent is not None else "too fast to measure"
+    return f"{kind}: {largest[1] * 1000:.1f} ms at {largest[0]} chars, {shape}"
+
+def default_paths():
+    return sorted(path for pattern in EXTRACTOR_GLOBS for path in REPO_ROOT.glob(pattern))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', type=Path, help="source files (default: the extractors)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds allowed per pattern and input kind")
+    parser.add_argument('--verbose', action='store_true', help="report every pattern, not just flagged ones")
+    args = parser.parse_args()
+
+    paths = [path.resolve() for path in args.paths] or default_paths()
+    context = multiprocessing.get_context()
+    checked = flagged = 0
+    unchecked = []
+    for path in paths:
+        patterns, dynamic = find_patterns(path)
+        unchecked.extend((path, line, function, "pattern not a literal") for line, function in dynamic)
+        for pattern in patterns:
+            report = check_pattern(pattern, args.timeout, context)
+            if report is None:
+                unchecked.append((path, pattern.line, pattern.function, "no matching input could be built"))
+                continue
+            checked += 1
+            bad = is_flagged(report)
+            flagged += bad
+            if bad or args.verbose:
+                print(f"{'FLAGGED' if bad else 'ok':8}{pattern.location} re.{pattern.function}({pattern.source!r})")
+                for kind, (timings, exponent, timed_out) in report.items():
+                    print(f"          {describe(kind, timings, exponent, timed_out)}")
+
+    if args.verbose:
+        for path, line, function, reason in unchecked:
+            print(f"{'skipped':8}{display_path(path)}:{line} re.{function}: {reason}")
+    print(f"\n{checked} patterns checked in {len(paths)} files, {flagged} super-linear, "
+          f"{len(unchecked)} not checked")
+    sys.exit(1 if flagged else 0)
+
+if __name__ == "__main__":
+    main()
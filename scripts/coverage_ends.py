@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Fill in the open ends of a book's homily coverage, without NumPy.
+
+A homily_coverage.json entry has an open end when its end is not after its
+start: the original extractors wrote the start again when no end was known,
+and Matthew's homily XXXVI reads 11:1-10:6. An open end runs up to the verse
+before the next passage any homily starts at, and the last one to the end of
+the book. This is the inference build_coverage.py applies to all works at
+once; the Matthew extractors use it on the few dozen homilies of one file.
+
+Ends are compared as (chapter, verse) pairs, so an end that is not a verse of
+the book (the XML has references such as Matt. I. 64) is kept as written
+rather than rejected.
+
+    homilies = {3: {'start_chapter': 1, 'start_verse': 1, 'end_chapter': 1, 'end_verse': 1, ...}, ...}
+    fill_open_ends(homilies, 'matthew')
+"""
+
+from bisect import bisect_right
+
+from build_versification import last_verse, verse_count
+
+def verse_before(book, chapter, verse):
+    """(chapter, verse) of the verse before chapter:verse."""
+    if verse > 1:
+        return chapter, verse - 1
+    return chapter - 1, verse_count(book, chapter - 1)
+
+def is_open(unit):
+    return (unit['end_chapter'], unit['end_verse']) <= (unit['start_chapter'], unit['start_verse'])
+
+def fill_open_ends(homilies, book):
+    """Set the end of every homily whose end is not after its start, in place.
+
+    homilies maps homily numbers to homily_coverage.json entries of one book.
+    """
+    starts = sorted({(unit['start_chapter'], unit['start_verse']) for unit in homilies.values()})
+    for unit in homilies.values():
+        if not is_open(unit):
+            continue
+        following = bisect_right(starts, (unit['start_chapter'], unit['start_verse']))
+        if following < len(starts):
+            unit['end_chapter'], unit['end_verse'] = verse_before(book, *starts[following])
+        else:
+            unit['end_chapter'], unit['end_verse'] = last_verse(book)
+    return homilies
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Find exact and near-duplicate paragraphs across the unified commentary JSON.
+
+Until the Chrysostom extractor stopped descending into <note> elements,
+footnote text turned up a second time among the content paragraphs, and
+unified files written before then still carry those copies. Editorial
+boilerplate ("[See note 11, (p. 29).—R.]") also repeats across homilies.
+
+Every content paragraph and every footnote is reduced to its set of word
+3-shingles (words folded as in the search indexes) and summarized by a
+MinHash signature of NUM_HASHES values. LSH banding (BANDS bands of
+ROWS_PER_BAND values) puts paragraphs whose signatures agree on a whole band
+in the same bucket, so only those pairs are compared: pairs whose estimated
+Jaccard similarity reaches THRESHOLD are duplicates, and duplicates are
+merged into clusters. Identical folded texts are reported as exact.
+
+A content paragraph is redundant when it duplicates a footnote of its own
+homily or an earlier paragraph of the same homily. Unified files whose source
+is in the tree are fixed by regenerating them with
+extract_all_commentaries_to_json.py. chrysostom_john.json has no source XML
+here, so --write FILE drops the redundant paragraphs from the named unified
+files instead; nothing is rewritten unless a file is named.
+
+Usage:
+    python scripts/dedup_paragraphs.py                      # print the report
+    python scripts/dedup_paragraphs.py --report dups.json   # also save it as JSON
+    python scripts/dedup_paragraphs.py --write chrysostom_john.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import zlib
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from build_commentary_index import COMMENTARY_FILES, UNIFIED_DIR
+from json_output import write_json
+from scripture import REPO_ROOT
+from search_index import normalize_english, tokenize
+
+SHINGLE_SIZE = 3
+NUM_HASHES = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+# With 16 bands of 8 rows, pairs above about 0.7 similarity almost always share a bucket
+THRESHOLD = 0.8
+
+# Universal hashing modulo a Mersenne prime; products of 31- and 32-bit values fit in uint64
+PRIME = (1 << 31) - 1
+SEED = 20240815
+
+TAG = re.compile(r'<[^>]+>')
+
+def read_units(unified_dir=UNIFIED_DIR):
+    """Return [(unit key, text)] for every content paragraph and footnote.
+
+    Keys are "<author> <book> <number>:<paragraph>" for paragraphs (as in the
+    commentary index) and "<author> <book> <number> n<display number>" for footnotes.
+    """
+    units = []
+    for filename, author, book in COMMENTARY_FILES:
+        path = unified_dir / filename
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            commentaries = json.load(f)
+        for key in sorted(commentaries, key=int):
+            commentary = commentaries[key]
+            for paragraph, block in enumerate(commentary.get('content', []), 1):
+                units.append((f"{author} {book} {key}:{paragraph}", block['text']))
+            for note in commentary.get('footnotes', []):
+                units.append((f"{author} {book} {key} n{note.get('display_number')}", note['content']))
+    return units
+
+def fold_words(text):
+    text = TAG.sub('', text)
+    words = [normalize_english(text[start:end]) for start, end in tokenize(text)]
+    return [word for word in words if word]
+
+def shingle_hashes(words):
+    """Return the 32-bit hashes of the word shingles (the whole text if it is shorter)."""
+    size = min(SHINGLE_SIZE, len(words))
+    shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.array(sorted(zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64)
+
+def hash_parameters():
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, PRIME, size=NUM_HASHES, dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=NUM_HASHES, dtype=np.uint64)
+    return a, b
+
+def minhash(hashes, a, b):
+    """Return the MinHash signature of a set of shingle hashes."""
+    return ((a[:, None] * hashes[None, :] + b[:, None]) % PRIME).min(axis=1)
+
+def candidate_pairs(signatures):
+    """Yield the index pairs that share at least one LSH band bucket, each once."""
+    seen = set()
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        rows = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        for i, row in enumerate(rows):
+            buckets[row.tobytes()].append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pair = (members[x], members[y])
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+def find_duplicates(units):
+    """Return (clusters, pairs) of near-duplicate units.
+
+    pairs is [(i, j, estimated similarity, exact)], clusters lists the unit
+    indexes of each group of two or more connected duplicates.
+    """
+    a, b = hash_parameters()
+    folded = [fold_words(text) for _, text in units]
+    present = [i for i, words in enumerate(folded) if words]
+    signatures = np.stack([minhash(shingle_hashes(folded[i]), a, b) for i in present])
+
+    pairs = []
+    for x, y in candidate_pairs(signatures):
+        similarity = float(np.mean(signatures[x] == signatures[y]))
+        if similarity >= THRESHOLD:
+            i, j = present[x], present[y]
+            pairs.append((i, j, round(similarity, 3), folded[i] == folded[j]))
+    pairs.sort()
+
+    # Union-find over the duplicate pairs
+    parent = {}
+    def find(i):
+        parent.setdefault(i, i)
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for i, j, _, _ in pairs:
+        parent[find(i)] = find(j)
+    groups = defaultdict(list)
+    for i in parent:
+        groups[find(i)].append(i)
+    clusters = sorted(sorted(members) for members in groups.values())
+    return clusters, pairs
+
+def homily_of(key):
+    """"chrysostom matthew 5:12" or "chrysostom matthew 5 n3" -> "chrysostom matthew 5"."""
+    return key.rsplit(' ', 1)[0] if ' n' in key else key.rpartition(':')[0]
+
+def is_footnote(key):
+    return ' n' in key
+
+def redundant_paragraphs(units, pairs):
+    """Return the keys of content paragraphs that duplicate a footnote or an
+    earlier paragraph of their own homily."""
+    redundant = set()
+    for i, j, _, _ in pairs:
+        first, second = units[i][0], units[j][0]
+        if homily_of(first) != homily_of(second):
+            continue
+        if is_footnote(first) != is_footnote(second):
+            redundant.add(second if is_footnote(first) else first)
+        elif not is_footnote(first):
+            # Units are in reading order, so j is the later paragraph
+            redundant.add(second)
+    return redundant
+
+def write_deduplicated(redundant, filenames, unified_dir=UNIFIED_DIR):
+    """Rewrite the named unified files without the redundant paragraphs. Returns the paths written."""
+    written = []
+    for filename, author, book in COMMENTARY_FILES:
+        path = unified_dir / filename
+        if filename not in filenames or not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            commentaries = json.load(f)
+        for key, commentary in commentaries.items():
+            commentary['content'] = [block for paragraph, block in enumerate(commentary.get('content', []), 1)
+                                     if f"{author} {book} {key}:{paragraph}" not in redundant]
+        if write_json(path, commentaries, ensure_ascii=False, skip_unchanged=True):
+            written.append(path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--report', metavar='PATH', help="save the duplicate report as JSON")
+    parser.add_argument('--write', metavar='FILE', action='append', default=[],
+                        choices=[filename for filename, _, _ in COMMENTARY_FILES],
+                        help="rewrite this unified file without its redundant paragraphs (repeatable)")
+    args = parser.parse_args()
+
+    start = time.time()
+    units = read_units()
+    clusters, pairs = find_duplicates(units)
+    redundant = redundant_paragraphs(units, pairs)
+    exact = sum(1 for pair in pairs if pair[3])
+
+    print(f"{len(units)} paragraphs and footnotes, {len(pairs)} duplicate pairs ({exact} exact) "
+          f"in {len(clusters)} clusters, {time.time() - start:.1f}s")
+    print(f"{len(redundant)} content paragraphs repeat a footnote or paragraph of their own homily")
+    for cluster in sorted(clusters, key=len, reverse=True)[:10]:
+        keys = [units[i][0] for i in cluster]
+        print(f"  {len(cluster)}x {units[cluster[0]][1][:70]!r}")
+        print(f"      {', '.join(keys[:6])}{' ...' if len(keys) > 6 else ''}")
+
+    if args.report:
+        report = {
+            'threshold': THRESHOLD,
+            'clusters': [[units[i][0] for i in cluster] for cluster in clusters],
+            'pairs': [{'a': units[i][0], 'b': units[j][0], 'similarity': similarity, 'exact': is_exact}
+                      for i, j, similarity, is_exact in pairs],
+            'redundant': sorted(redundant),
+        }
+        write_json(args.report, report, ensure_ascii=False)
+        print(f"Report saved to {args.report}")
+
+    for path in write_deduplicated(redundant, args.write):
+        print(f"Rewrote {path.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
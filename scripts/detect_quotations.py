@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Detect New Testament quotations in the commentary text.
+
+Cyril's sermons have no scripRef markup and the Chrysostom XML marks only
+some of the passages it quotes, so quotations are found from the text
+itself. Every KJV word (folded as in the search indexes) becomes a
+vocabulary id, and every run of SHINGLE_SIZE consecutive words a 64-bit
+polynomial fingerprint. The fingerprints of all windows of a word sequence
+are computed at once with NumPy (h = h * BASE + ids[k:k + n], wrapping in
+uint64). KJV fingerprints occurring more than MAX_KJV_REPEATS times ("and he
+said unto them") are dropped, and the rest are sorted into a lookup table
+of (fingerprint, KJV word position).
+
+Each paragraph is fingerprinted the same way and its windows are looked up
+in the table with searchsorted. Hits on the same diagonal (KJV position -
+paragraph position) form runs, and runs at most MAX_GAP windows apart whose
+diagonals differ by at most MAX_SHIFT words (a word added or left out) are
+chained into candidate alignments. The verification pass then aligns the actual words of
+each candidate against the KJV around it (which also rules out fingerprint
+collisions), trims it to the first and last matching word and scores it by
+the Dice ratio of matched words over both extents. Candidates with fewer
+than MIN_WORDS matched words or a score below MIN_SCORE are dropped.
+Paragraphs are processed in chunks on a process pool.
+
+The result is saved to texts/reference/quotations/scripture_quotations.json:
+
+    {
+      "format": "hypomnema-quotations",
+      "version": 1,
+      "quotations": [
+        {"paragraph": "chrysostom matthew 63:1", "verses": [676, 677],
+         "ref": "matthew 20:29-30", "span": [1, 218], "words": 37, "score": 0.925},
+        ...
+      ]
+    }
+
+verses holds the first and last verse ordinals (see build_versification.py)
+of the quoted KJV text and span the character offsets of the quotation in
+the paragraph text as build_commentary_index.read_paragraphs() returns it.
+Words quoted from passages the gospels share, or that a passage repeats,
+give one candidate per place.
+
+Usage:
+    python scripts/detect_quotations.py
+    python scripts/detect_quotations.py --workers 4
+    python scripts/detect_quotations.py "chrysostom matthew 63:1"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+try:
+    import numpy as np
+except ImportError:
+    print("numpy not installed. Install with: pip install numpy")
+    sys.exit(1)
+
+from build_commentary_index import read_paragraphs
+from build_versification import from_ordinal, ordinal
+from json_output import write_json
+from scripture import REPO_ROOT, iter_kjv_verses
+from search_index import normalize_english, tokenize
+
+OUTPUT_PATH = REPO_ROOT / 'texts' / 'reference' / 'quotations' / 'scripture_quotations.json'
+
+FORMAT_NAME = 'hypomnema-quotations'
+FORMAT_VERSION = 1
+
+SHINGLE_SIZE = 5
+BASE = np.uint64(1000003)
+MAX_KJV_REPEATS = 4
+# Windows a chain may skip: one changed word hides SHINGLE_SIZE windows, and
+# a short interpolation such as "he says" a few more
+MAX_GAP = SHINGLE_SIZE + 3
+# Words a quotation may add or leave out between two runs of a chain
+MAX_SHIFT = 3
+# KJV words searched beyond either end of a chain during verification
+SLACK = 4
+MIN_WORDS = 7
+MIN_SCORE = 0.75
+CHUNK_SIZE = 250
+
+def fingerprints(ids):
+    """Fingerprints of every window of SHINGLE_SIZE ids (empty if there are fewer)."""
+    count = len(ids) - SHINGLE_SIZE + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    h = np.zeros(count, dtype=np.uint64)
+    for k in range(SHINGLE_SIZE):
+        h = h * BASE + ids[k:k + count]
+    return h
+
+def build_kjv_table():
+    """Return the KJV word table: vocabulary, word ids, word ordinals and the fingerprint lookup."""
+    vocabulary, ids, ordinals = {}, [], []
+    for book, chapter, verse, text in iter_kjv_verses():
+        try:
+            n = ordinal(book, chapter, verse)
+        except IndexError:
+            # Verses the versification does not count (misfiled KJV text)
+            continue
+        for start, end in tokenize(text):
+            word = normalize_english(text[start:end])
+            if word:
+                # Id 0 is reserved for words the KJV never uses
+                ids.append(vocabulary.setdefault(word, len(vocabulary) + 1))
+                ordinals.append(n)
+    ids = np.array(ids, dtype=np.uint64)
+    hashes = fingerprints(ids)
+    order = np.argsort(hashes, kind='stable')
+    hashes, positions = hashes[order], order
+    # Drop fingerprints too common to locate a quotation
+    _, counts = np.unique(hashes, return_counts=True)
+    keep = np.repeat(counts <= MAX_KJV_REPEATS, counts)
+    return {
+        'vocabulary': vocabulary,
+        'ids': ids,
+        'ordinals': np.array(ordinals, dtype=np.int32),
+        'hashes': hashes[keep],
+        'positions': positions[keep],
+    }
+
+_table = None
+
+def init_worker(table):
+    global _table
+    _table = table
+
+def chains(hashes, table):
+    """Return [(first window, last window, first KJV position, last KJV position)] of the chained hits."""
+    left = np.searchsorted(table['hashes'], hashes, side='left')
+    right = np.searchsorted(table['hashes'], hashes, side='right')
+    hits = np.repeat(np.arange(len(hashes)), right - left)
+    if not len(hits):
+        return []
+    kjv = table['positions'][np.concatenate([np.arange(a, b) for a, b in zip(left, right) if b > a])]
+    diagonals = kjv - hits
+    order = np.lexsort((hits, diagonals))
+    hits, diagonals = hits[order], diagonals[order]
+    breaks = np.flatnonzero((np.diff(diagonals) != 0) | (np.diff(hits) > MAX_GAP + 1)) + 1
+    runs = sorted((int(hits[run[0]]), int(hits[run[-1]]), int(diagonals[run[0]]))
+                  for run in np.split(np.arange(len(hits)), breaks))
+
+    # Chain runs in paragraph order; a shared passage in several gospels keeps one chain per gospel
+    result = []
+    for first, last, diagonal in runs:
+        for chain in result:
+            if first <= chain[1] + MAX_GAP + 1 and abs(diagonal - chain[4]) <= MAX_SHIFT:
+                chain[1] = max(chain[1], last)
+                chain[2] = min(chain[2], diagonal + first)
+                chain[3] = max(chain[3], diagonal + last)
+                chain[4] = diagonal
+                break
+        else:
+            result.append([first, last, diagonal + first, diagonal + last, diagonal])
+    return [tuple(chain[:4]) for chain in result]
+
+def verify(words, first, last, kjv_first, kjv_last, table):
+    """Align a chain word by word against the KJV around it.
+
+    Returns (first word, last word, first KJV position, last KJV position,
+    matched words, score) of the trimmed alignment, or None.
+    """
+    kjv_ids = table['ids']
+    para = words[first:last + SHINGLE_SIZE]
+    lo = max(kjv_first - SLACK, 0)
+    hi = min(kjv_last + SHINGLE_SIZE + SLACK, len(kjv_ids))
+    blocks = [b for b in SequenceMatcher(None, para.tolist(), kjv_ids[lo:hi].tolist(),
+                                         autojunk=False).get_matching_blocks() if b.size]
+    matched = sum(b.size for b in blocks)
+    if matched < MIN_WORDS:
+        return None
+    para_extent = blocks[-1].a + blocks[-1].size - blocks[0].a
+    kjv_extent = blocks[-1].b + blocks[-1].size - blocks[0].b
+    score = 2 * matched / (para_extent + kjv_extent)
+    if score < MIN_SCORE:
+        return None
+    return (first + blocks[0].a, first + blocks[-1].a + blocks[-1].size - 1,
+            lo + blocks[0].b, lo + blocks[-1].b + blocks[-1].size - 1, matched, score)
+
+def format_ref(first, last):
+    book, chapter, verse = from_ordinal(first)
+    _, end_chapter, end_verse = from_ordinal(last)
+    if first == last:
+        return f"{book} {chapter}:{verse}"
+    if chapter == end_chapter:
+        return f"{book} {chapter}:{verse}-{end_verse}"
+    return f"{book} {chapter}:{verse}-{end_chapter}:{end_verse}"
+
+def detect(chunk):
+    """Return the verified quotations in a chunk of (paragraph reference, text)."""
+    table = _table
+    vocabulary = table['vocabulary']
+    found = []
+    for ref, text in chunk:
+        spans, ids = [], []
+        for start, end in tokenize(text):
+            word = normalize_english(text[start:end])
+            if word:
+                spans.append((start, end))
+                ids.append(vocabulary.get(word, 0))
+        words = np.array(ids, dtype=np.uint64)
+        seen = set()
+        for first, last, kjv_first, kjv_last in chains(fingerprints(words), table):
+            result = verify(words, first, last, kjv_first, kjv_last, table)
+            if result is None or result[:4] in seen:
+                continue
+            seen.add(result[:4])
+            word_first, word_last, kjv_first, kjv_last, matched, score = result
+            verses = [int(table['ordinals'][kjv_first]), int(table['ordinals'][kjv_last])]
+            found.append({
+                'paragraph': ref,
+                'verses': verses,
+                'ref': format_ref(*verses),
+                'span': [spans[word_first][0], spans[word_last][1]],
+                'words': matched,
+                'score': round(score, 3),
+            })
+    return found
+
+def iter_quotations(workers=None):
+    """Yield the quotations in every commentary paragraph, in paragraph order, as
+    the pool finds them."""
+    docs, texts = read_paragraphs()
+    paragraphs = list(zip(docs, texts))
+    chunks = [paragraphs[i:i + CHUNK_SIZE] for i in range(0, len(paragraphs), CHUNK_SIZE)]
+    table = build_kjv_table()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(table,)) as executor:
+        for found in executor.map(detect, chunks):
+            yield from found
+
+def counted(quotations, per_paragraph):
+    """Pass quotations through, counting them per paragraph."""
+    for q in quotations:
+        per_paragraph[q['paragraph']] += 1
+        yield q
+
+def load_quotations(path=OUTPUT_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get('format') != FORMAT_NAME or table.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paragraph', nargs='?', help="list the quotations found in a paragraph")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    args = parser.parse_args()
+
+    if args.paragraph:
+        docs, texts = read_paragraphs()
+        text = dict(zip(docs, texts)).get(args.paragraph)
+        if text is None:
+            print(f"No paragraph {args.paragraph}")
+            return
+        for q in load_quotations()['quotations']:
+            if q['paragraph'] == args.paragraph:
+                start, end = q['span']
+                print(f"{q['ref']} ({q['words']} words, score {q['score']}): {text[start:end]}")
+        return
+
+    print("Detecting scripture quotations in the commentaries...")
+    start = time.time()
+    # Quotations are written as the workers return them rather than collected first
+    per_paragraph = Counter()
+    table = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'quotations': counted(iter_quotations(args.workers), per_paragraph),
+    }
+    write_json(OUTPUT_PATH, table, indent=None, separators=(',', ':'))
+    print(f"{sum(per_paragraph.values())} quotations in {len(per_paragraph)} paragraphs "
+          f"in {time.time() - start:.1f}s")
+    print(f"Saved to {OUTPUT_PATH.relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from pathlib import Path
 from typing import Dict, List, Any
 from html.parser import HTMLParser
 
+from json_output import write_json
+from parse_cache import cached_parse
+
 class HTMLTextExtractor(HTMLParser):
     """Extract text from HTML, converting certain tags to markdown-like format"""
     def __init__(self):
@@ -113,9 +116,58 @@ def extract_text_from_element(elem):
     process_node(elem)
     return clean_text(''.join(text_parts))
 
-def extract_chrysostom_homilies(book):
+# Bump when the shape or content of a cached parse result changes
+HOMILY_SEGMENTS_VERSION = 2
+CYRIL_SERMONS_VERSION = 1
+
+def content_elements(elem):
+    """Yield the p and div3 elements under elem in document order, skipping
+    footnotes: the <p> elements inside a <note> belong to the footnote"""
+    for child in elem:
+        if child.tag == 'note':
+            continue
+        if child.tag in ['p', 'div3']:
+            yield child
+        yield from content_elements(child)
+
+def parse_chrysostom_homily_segments(xml_file):
+    """Parse a ThML file into (homily numeral, paragraphs, verse reference) segments"""
+    # Parse XML
+    tree = ET.parse(xml_file)
+    root = tree.getroot()
+    
+    segments = []
+    
+    # Find all homilies (ThML uses div2 with type="Homily")
+    for div in root.findall('.//div2[@type="Homily"]'):
+        homily_num_str = div.get('n')
+        if not homily_num_str:
+            continue
+        
+        # Extract content paragraphs
+        # ThML uses div3 for paragraphs/sections
+        paragraphs = []
+        for elem in content_elements(div):
+            text = extract_text_from_element(elem)
+            if text and len(text) > 20:  # Skip very short fragments
+                paragraphs.append(text)
+        
+        # Store verse reference if available
+        verse_ref = None
+        first_p = div.find('.//p')
+        if first_p is not None and first_p.text:
+            # Look for verse patterns
+            verse_match = re.match(r'^((?:Matt\.|Matthew|John)\s+[IVXivx]+\.\s*\d[^.]*\.)', first_p.text)
+            if verse_match:
+                verse_ref = verse_match.group(1).strip()
+        
+        segments.append((homily_num_str, paragraphs, verse_ref))
+    
+    return segments
+
+def extract_chrysostom_homilies(book, texts_dir=Path('../texts')):
     """Extract Chrysostom homilies for Matthew or John"""
-    base_dir = Path(f'../texts/commentaries/chrysostom/{book}')
+    base_dir = texts_dir / 'commentaries' / 'chrysostom' / book
     xml_file = base_dir / f'chrysostom_{book}_homilies.xml'
     
     if not xml_file.exists():
@@ -127,18 +179,12 @@ def extract_chrysostom_homilies(book):
     with open(footnotes_file, 'r', encoding='utf-8') as f:
         all_footnotes = json.load(f)
     
-    # Parse XML
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
+    segments = cached_parse(xml_file, 'chrysostom_homily_segments', HOMILY_SEGMENTS_VERSION,
+                            parse_chrysostom_homily_segments)
     
     homilies = {}
     
-    # Find all homilies (ThML uses div2 with type="Homily")
-    for div in root.findall('.//div2[@type="Homily"]'):
-        homily_num_str = div.get('n')
-        if not homily_num_str:
-            continue
-        
+    for homily_num_str, paragraphs, verse_ref in segments:
         # Convert Roman numerals to Arabic
         roman_to_arabic = {'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
         # Simple conversion for common Roman numerals (extend as needed)
@@ -157,38 +203,74 @@ def extract_chrysostom_homilies(book):
             'book': book.capitalize(),
             'type': 'homily',
             'title': f"Homily {homily_num}",
-            'content': [],
+            'content': [{'type': 'paragraph', 'text': text} for text in paragraphs],
             'footnotes': all_footnotes.get(homily_num, [])
         }
         
-        # Extract content paragraphs
-        # ThML uses div3 for paragraphs/sections
-        for elem in div.findall('.//*'):
-            if elem.tag in ['p', 'div3']:
-                text = extract_text_from_element(elem)
-                if text and len(text) > 20:  # Skip very short fragments
-                    homily_data['content'].append({
-                        'type': 'paragraph',
-                        'text': text
-                    })
-        
-        # Store verse reference if available
-        verse_ref = None
-        first_p = div.find('.//p')
-        if first_p is not None and first_p.text:
-            # Look for verse patterns
-            verse_match = re.match(r'^((?:Matt\.|Matthew|John)\s+[IVXivx]+\.\s*\d+[^.]*\.)', first_p.text)
-            if verse_match:
-                verse_ref = verse_match.group(1).strip()
-                homily_data['verse_reference'] = verse_ref
+        if verse_ref:
+            homily_data['verse_reference'] = verse_ref
         
         homilies[homily_num] = homily_data
     
     return homilies
 
-def extract_cyril_sermons():
+def parse_cyril_sermon_file(html_file):
+    """Parse one Cyril HTML file into (roman numeral, verse reference, paragraphs) sermons"""
+    with open(html_file, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    
+    sermons = []
+    
+    # Extract individual sermons from the file
+    # Pattern to find sermon headers like "SERMON I." or "SERMON CXLVI."
+    sermon_pattern = r'<h3[^>]*><strong>.*?SERMON\s+([IVXLCDM]+)\..*?</strong></h3>'
+    sermon_matches = list(re.finditer(sermon_pattern, html_content, re.IGNORECASE))
+    
+    for i, match in enumerate(sermon_matches):
+        roman_num = match.group(1)
+        
+        # Get sermon content (from this header to next header or end)
+        start_pos = match.end()
+        if i < len(sermon_matches) - 1:
+            end_pos = sermon_matches[i + 1].start()
+        else:
+            # Last sermon in file - go to end or footnotes section
+            end_match = re.search(r'<h3[^>]*>.*?Notes.*?</h3>', html_content[start_pos:], re.IGNORECASE)
+            if end_match:
+                end_pos = start_pos + end_match.start()
+            else:
+                end_pos = len(html_content)
+        
+        sermon_content = html_content[start_pos:end_pos]
+        
+        # Extract verse reference from the beginning
+        verse_ref = None
+        verse_match = re.search(r'<blockquote>\s*<p>(Luke\s+[ivxIVX]+\.\s*\d[^<]*)</p>\s*</blockquote>', sermon_content, re.IGNORECASE)
+        if verse_match:
+            verse_ref = verse_match.group(1).strip()
+        
+        # Parse the HTML content
+        parser = HTMLTextExtractor()
+        parser.feed(sermon_content)
+        text = parser.get_text()
+        
+        # Clean up and split into paragraphs
+        text = re.sub(r'\n\s*\n+', '\n\n', text)
+        
+        paragraphs = []
+        for para in text.split('\n\n'):
+            para = para.strip()
+            # Skip headers, verse references, and short fragments
+            if para and len(para) > 30 and not re.match(r'^(Luke|SERMON|Notes)', para, re.IGNORECASE):
+                paragraphs.append(para)
+        
+        sermons.append((roman_num, verse_ref, paragraphs))
+    
+    return sermons
+
+def extract_cyril_sermons(texts_dir=Path('../texts')):
     """Extract Cyril sermons on Luke from the multi-sermon HTML files"""
-    base_dir = Path('../texts/commentaries/cyril/luke')
+    base_dir = texts_dir / 'commentaries' / 'cyril' / 'luke'
     
     # Load existing footnotes
     footnotes_file = base_dir / 'footnotes.json'
@@ -219,33 +301,11 @@ def extract_cyril_sermons():
         html_file = base_dir / html_filename
         if not html_file.exists():
             continue
-            
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # Extract individual sermons from the file
-        # Pattern to find sermon headers like "SERMON I." or "SERMON CXLVI."
-        sermon_pattern = r'<h3[^>]*><strong>.*?SERMON\s+([IVXLCDM]+)\..*?</strong></h3>'
-        sermon_matches = list(re.finditer(sermon_pattern, html_content, re.IGNORECASE))
         
-        for i, match in enumerate(sermon_matches):
-            roman_num = match.group(1)
+        for roman_num, verse_ref, paragraphs in cached_parse(html_file, 'cyril_sermons', CYRIL_SERMONS_VERSION,
+                                                             parse_cyril_sermon_file):
             sermon_num = str(roman_to_int(roman_num))
             
-            # Get sermon content (from this header to next header or end)
-            start_pos = match.end()
-            if i < len(sermon_matches) - 1:
-                end_pos = sermon_matches[i + 1].start()
-            else:
-                # Last sermon in file - go to end or footnotes section
-                end_match = re.search(r'<h3[^>]*>.*?Notes.*?</h3>', html_content[start_pos:], re.IGNORECASE)
-                if end_match:
-                    end_pos = start_pos + end_match.start()
-                else:
-                    end_pos = len(html_content)
-            
-            sermon_content = html_content[start_pos:end_pos]
-        
             sermon_data = {
                 'number': int(sermon_num),
                 'author': 'Cyril of Alexandria',
@@ -253,32 +313,12 @@ def extract_cyril_sermons():
                 'type': 'sermon',
                 'title': f"Sermon {roman_num}",
                 'roman_numeral': roman_num,
-                'content': [],
+                'content': [{'type': 'paragraph', 'text': para} for para in paragraphs],
                 'footnotes': all_footnotes.get(sermon_num, [])
             }
             
-            # Extract verse reference from the beginning
-            verse_match = re.search(r'<blockquote>\s*<p>(Luke\s+[ivxIVX]+\.\s*\d+[^<]*)</p>\s*</blockquote>', sermon_content, re.IGNORECASE)
-            if verse_match:
-                sermon_data['verse_reference'] = verse_match.group(1).strip()
-            
-            # Parse the HTML content
-            parser = HTMLTextExtractor()
-            parser.feed(sermon_content)
-            text = parser.get_text()
-            
-            # Clean up and split into paragraphs
-            text = re.sub(r'\n\s*\n+', '\n\n', text)
-            paragraphs = text.split('\n\n')
-            
-            for para in paragraphs:
-                para = para.strip()
-                # Skip headers, verse references, and short fragments
-                if para and len(para) > 30 and not re.match(r'^(Luke|SERMON|Notes)', para, re.IGNORECASE):
-                    sermon_data['content'].append({
-                        'type': 'paragraph',
-                        'text': para
-                    })
+            if verse_ref:
+                sermon_data['verse_reference'] = verse_ref
             
             sermons[sermon_num] = sermon_data
     
@@ -292,22 +332,23 @@ def create_unified_json():
     # Process Chrysostom Matthew
     print("Extracting Chrysostom Matthew homilies...")
     matthew_homilies = extract_chrysostom_homilies('matthew')
-    with open(output_dir / 'chrysostom_matthew.json', 'w', encoding='utf-8') as f:
-        json.dump(matthew_homilies, f, indent=2, ensure_ascii=False)
+    write_json(output_dir / 'chrysostom_matthew.json', matthew_homilies, ensure_ascii=False)
     print(f"  Extracted {len(matthew_homilies)} Matthew homilies")
     
     # Process Chrysostom John
     print("Extracting Chrysostom John homilies...")
     john_homilies = extract_chrysostom_homilies('john')
-    with open(output_dir / 'chrysostom_john.json', 'w', encoding='utf-8') as f:
-        json.dump(john_homilies, f, indent=2, ensure_ascii=False)
-    print(f"  Extracted {len(john_homilies)} John homilies")
+    if john_homilies:
+        write_json(output_dir / 'chrysostom_john.json', john_homilies, ensure_ascii=False)
+        print(f"  Extracted {len(john_homilies)} John homilies")
+    else:
+        # The John XML is not in the tree; keep the committed file rather than emptying it
+        print("  Kept the existing chrysostom_john.json")
     
     # Process Cyril Luke
     print("Extracting Cyril Luke sermons...")
     luke_sermons = extract_cyril_sermons()
-    with open(output_dir / 'cyril_luke.json', 'w', encoding='utf-8') as f:
-        json.dump(luke_sermons, f, indent=2, ensure_ascii=False)
+    write_json(output_dir / 'cyril_luke.json', luke_sermons, ensure_ascii=False)
     print(f"  Extracted {len(luke_sermons)} Luke sermons")
     
     # Create a manifest file
@@ -341,8 +382,7 @@ def create_unified_json():
         ]
     }
     
-    with open(output_dir / 'manifest.json', 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2)
+    write_json(output_dir / 'manifest.json', manifest)
     
     print("\nUnified JSON extraction complete!")
     print(f"Files created in: {output_dir}")
@@ -5,9 +5,21 @@ Look for the pattern "Homily [Roman]." followed by verse reference.
 """
 
 import re
-import json
 from pathlib import Path
 
+from coverage_ends import fill_open_ends
+from json_output import write_json
+from lazy_match import lazy_matches
+
+# "Homily V." headings and the "Matt. I. 22, 23" reference after them, paired
+# by lazy_matches() rather than a DOTALL .*? that rescans the whole file for
+# every heading without a reference. Tags stop at "<" as well as ">", and the
+# reference keeps its leading spaces (stripped by the caller) rather than
+# splitting them between \s* and [^<]+ in every possible way.
+HOMILY_HEADING = re.compile(r'Homily\s+([IVX]+)\.</span></p>\s*\n\s*<p[^<>]*>')
+HOMILY_SPAN = re.compile(r'<span[^<>]*>Homily\s+([IVX]+)\.</span>')
+MATT_REF = re.compile(r'<span[^<>]*>Matt\.([^<]+)</span>')
+
 def roman_to_int(roman):
     """Convert Roman numeral to integer."""
     values = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
@@ -54,7 +66,7 @@ def extract_homilies_comprehensive(xml_path):
     homilies = {}
     
     # Pattern 1: Look for div2 elements with structured data
-    div2_pattern = r'<div2[^>]*type="Homily"[^>]*title="([^"]+)"[^>]*n="([IVX]+)"'
+    div2_pattern = r'<div2[^<>]*type="Homily"[^<>]*title="([^"]+)"[^<>]*n="([IVX]+)"'
     
     for match in re.finditer(div2_pattern, content):
         title = match.group(1)
@@ -81,11 +93,9 @@ def extract_homilies_comprehensive(xml_path):
     
     # Pattern 2: Look for all "Homily [Roman]." patterns followed by verse references
     # This will catch Homily I and any others without div2 elements
-    homily_pattern = r'Homily\s+([IVX]+)\.</span></p>\s*\n\s*<p[^>]*>.*?<span[^>]*>Matt\.\s*([^<]+)</span>'
-    
-    for match in re.finditer(homily_pattern, content, re.DOTALL):
-        roman_num = match.group(1)
-        verse_ref = match.group(2).strip()
+    for heading, ref in lazy_matches(content, HOMILY_HEADING, MATT_REF):
+        roman_num = heading.group(1)
+        verse_ref = ref.group(1).strip()
         homily_num = roman_to_int(roman_num)
         
         # Only add if not already found
@@ -104,15 +114,13 @@ def extract_homilies_comprehensive(xml_path):
     
     # Also check for pattern where verse ref is in a different element
     # Pattern: "Homily V." ... "Matt. I. 22, 23"
-    alt_pattern = r'<span[^>]*>Homily\s+([IVX]+)\.</span>.*?<span[^>]*>Matt\.\s*([^<]+)</span>'
-    
-    for match in re.finditer(alt_pattern, content, re.DOTALL):
-        roman_num = match.group(1)
-        verse_ref = match.group(2).strip()
+    for heading, ref in lazy_matches(content, HOMILY_SPAN, MATT_REF):
+        roman_num = heading.group(1)
+        verse_ref = ref.group(1).strip()
         homily_num = roman_to_int(roman_num)
         
         # Skip if too far apart (more than 500 chars)
-        if len(match.group(0)) > 500:
+        if ref.end() - heading.start() > 500:
             continue
             
         # Only add if not already found
@@ -142,46 +150,7 @@ def extract_homilies_comprehensive(xml_path):
         }
     
     # Calculate end verses based on next homily
-    homily_nums = sorted(homilies.keys())
-    
-    # Known verse counts per chapter in Matthew
-    verse_counts = {
-        1: 25, 2: 23, 3: 17, 4: 25, 5: 48, 6: 34, 7: 29, 8: 34,
-        9: 38, 10: 42, 11: 30, 12: 50, 13: 58, 14: 36, 15: 39,
-        16: 28, 17: 27, 18: 35, 19: 30, 20: 34, 21: 46, 22: 46,
-        23: 39, 24: 51, 25: 46, 26: 75, 27: 66, 28: 20
-    }
-    
-    for i in range(len(homily_nums) - 1):
-        current = homily_nums[i]
-        next_num = homily_nums[i + 1]
-        
-        current_homily = homilies[current]
-        next_homily = homilies[next_num]
-        
-        # If we don't have an explicit end verse, calculate it
-        if current_homily["end_verse"] == current_homily["start_verse"]:
-            next_ch = next_homily["start_chapter"]
-            next_v = next_homily["start_verse"]
-            
-            if next_v == 1:
-                # Next homily starts new chapter
-                end_ch = next_ch - 1 if next_ch > 1 else 1
-                end_v = verse_counts.get(end_ch, 50)
-            else:
-                # Same chapter
-                end_ch = next_ch
-                end_v = next_v - 1
-            
-            current_homily["end_chapter"] = end_ch
-            current_homily["end_verse"] = end_v
-    
-    # Last homily goes to end of Matthew
-    if homily_nums:
-        last = homily_nums[-1]
-        if homilies[last]["end_verse"] == homilies[last]["start_verse"]:
-            homilies[last]["end_chapter"] = 28
-            homilies[last]["end_verse"] = 20
+    fill_open_ends(homilies, 'matthew')
     
     return homilies
 
@@ -196,9 +165,8 @@ def main():
     print("Extracting ALL homilies from XML...")
     homilies = extract_homilies_comprehensive(xml_path)
     
-    # Save full homily data
-    with open(output_path, 'w') as f:
-        json.dump(homilies, f, indent=2)
+    # Save full homily data; string keys in homily order, as json.load returns them
+    write_json(output_path, {str(num): homilies[num] for num in sorted(homilies)})
     
     print(f"Saved homily coverage to {output_path}")
     print(f"Found {len(homilies)} homilies")
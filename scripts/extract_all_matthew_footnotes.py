@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import xml.etree.ElementTree as ET
-import json
 import re
 from html import unescape
 
+from json_output import write_json
+
 def clean_text(text):
     """Clean and normalize text content"""
     if not text:
@@ -190,8 +191,7 @@ def main():
             print(f"  Homily {homily_num}: {len(footnotes)} footnotes")
         
         # Save to JSON
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        write_json(output_file, output_data, ensure_ascii=False)
         
         print(f"\nTotal footnotes extracted: {total_footnotes}")
         print(f"Output saved to: {output_file}")
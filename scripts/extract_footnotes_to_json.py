@@ -4,10 +4,13 @@ Extract footnotes from Chrysostom's Matthew homilies ThML file to JSON.
 """
 
 import re
-import json
 from collections import defaultdict
 import html
 
+from json_output import write_json
+from lazy_match import first_lazy_match, lazy_matches
+from parse_cache import cached_parse
+
 def roman_to_int(roman):
     """Convert Roman numeral to integer."""
     values = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
@@ -22,56 +25,93 @@ def roman_to_int(roman):
         prev = value
     return total
 
-def extract_footnotes_from_xml(xml_path):
-    """Extract all footnotes from the ThML file."""
+# Bump when the shape of the cached note lists changes
+NOTE_LISTS_VERSION = 1
+
+# Opening and closing halves of the lazy <tag>(.*?)</tag> matches, paired by
+# lazy_matches(). Tags stop at "<" as well as ">", so an unclosed tag cannot
+# run on into the rest of the file.
+HOMILY_OPEN = re.compile(r'<div2[^<>]*n="([IVX]+)"[^<>]*>')
+HOMILY_CLOSE = re.compile(r'</div2>')
+NOTE_OPEN = re.compile(r'<note\s+n="(\d+)"[^<>]*>')
+NOTE_CLOSE = re.compile(r'</note>')
+# Homily I without a div2: from its heading to the next homily's
+HOMILY1_OPEN = re.compile(r'Homily I\.</span></p>')
+HOMILY1_CLOSE = re.compile(r'Homily II\.|<div2[^<>]*n="II"')
+PARAGRAPH_OPEN = re.compile(r'<p[^<>]*>')
+PARAGRAPH_CLOSE = re.compile(r'</p>')
+
+def find_notes(markup):
+    """Return [(note number, raw note markup)] in order."""
+    return [(opener.group(1), markup[opener.end():closer.start()])
+            for opener, closer in lazy_matches(markup, NOTE_OPEN, NOTE_CLOSE)]
+
+def parse_note_lists(xml_path):
+    """Scan the ThML file into (homily numeral, [(note number, raw note markup)]) lists."""
     with open(xml_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    footnotes_by_homily = defaultdict(list)
+    note_lists = []
     
     # Find all homily div2 sections
-    homily_pattern = r'<div2[^>]*n="([IVX]+)"[^>]*>(.*?)</div2>'
-    homily_matches = re.finditer(homily_pattern, content, re.DOTALL)
+    for opener, closer in lazy_matches(content, HOMILY_OPEN, HOMILY_CLOSE):
+        homily_roman = opener.group(1)
+        notes = find_notes(content[opener.end():closer.start()])
+        note_lists.append((homily_roman, notes))
     
-    for homily_match in homily_matches:
-        homily_roman = homily_match.group(1)
-        homily_num = roman_to_int(homily_roman)
-        homily_content = homily_match.group(2)
+    # Also check for Homily I if it's in a different format
+    # Sometimes Homily I doesn't have a div2 wrapper
+    if not any(roman_to_int(roman) == 1 and notes for roman, notes in note_lists):
+        # Look for content after "Homily I." and before "Homily II."
+        homily1_match = first_lazy_match(content, HOMILY1_OPEN, HOMILY1_CLOSE)
         
-        # Find all notes within this homily
-        note_pattern = r'<note\s+n="(\d+)"[^>]*>(.*?)</note>'
-        note_matches = re.finditer(note_pattern, homily_content, re.DOTALL)
+        if homily1_match:
+            opener, closer = homily1_match
+            notes = find_notes(content[opener.end():closer.start()])
+            note_lists.append(("I", notes))
+    
+    return note_lists
+
+def clean_note(note_content):
+    """Reduce a raw <note> body to display text."""
+    # Extract text content from the note
+    # Remove the <p class="endnote"> wrapper
+    text_match = first_lazy_match(note_content, PARAGRAPH_OPEN, PARAGRAPH_CLOSE)
+    
+    if text_match:
+        opener, closer = text_match
+        text = note_content[opener.end():closer.start()]
+    else:
+        text = note_content
+    
+    # Clean up the text
+    # Remove HTML tags but preserve Greek text
+    text = re.sub(r'<span[^>]*lang="EL"[^>]*>([^<]+)</span>', r'[Greek: \1]', text)
+    text = re.sub(r'<[^<>]+>', '', text)
+    text = html.unescape(text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    # Remove square brackets at beginning and end if present
+    if text.startswith('[') and text.endswith(']'):
+        text = text[1:-1]
+    
+    return text
+
+def extract_footnotes_from_xml(xml_path):
+    """Extract all footnotes from the ThML file."""
+    note_lists = cached_parse(xml_path, 'thml_note_lists', NOTE_LISTS_VERSION, parse_note_lists)
+    
+    footnotes_by_homily = defaultdict(list)
+    
+    for homily_roman, notes in note_lists:
+        homily_num = roman_to_int(homily_roman)
         
         homily_footnotes = []
-        for i, note_match in enumerate(note_matches, 1):
-            original_num = note_match.group(1)
-            note_content = note_match.group(2)
-            
-            # Extract text content from the note
-            # Remove the <p class="endnote"> wrapper
-            text_pattern = r'<p[^>]*>(.*?)</p>'
-            text_match = re.search(text_pattern, note_content, re.DOTALL)
-            
-            if text_match:
-                text = text_match.group(1)
-            else:
-                text = note_content
-            
-            # Clean up the text
-            # Remove HTML tags but preserve Greek text
-            text = re.sub(r'<span[^>]*lang="EL"[^>]*>([^<]+)</span>', r'[Greek: \1]', text)
-            text = re.sub(r'<[^>]+>', '', text)
-            text = html.unescape(text)
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            # Remove square brackets at beginning and end if present
-            if text.startswith('[') and text.endswith(']'):
-                text = text[1:-1]
-            
+        for i, (original_num, note_content) in enumerate(notes, 1):
             footnote = {
                 "original_number": int(original_num),
                 "display_number": i,  # Sequential number within homily
-                "content": text
+                "content": clean_note(note_content)
             }
             
             homily_footnotes.append(footnote)
@@ -82,55 +122,6 @@ def extract_footnotes_from_xml(xml_path):
                 "footnotes": homily_footnotes
             }
     
-    # Also check for Homily I if it's in a different format
-    # Sometimes Homily I doesn't have a div2 wrapper
-    if 1 not in footnotes_by_homily:
-        # Look for content after "Homily I." and before "Homily II."
-        homily1_pattern = r'Homily I\.</span></p>(.*?)(?=Homily II\.|<div2[^>]*n="II")'
-        homily1_match = re.search(homily1_pattern, content, re.DOTALL)
-        
-        if homily1_match:
-            homily1_content = homily1_match.group(1)
-            note_pattern = r'<note\s+n="(\d+)"[^>]*>(.*?)</note>'
-            note_matches = re.finditer(note_pattern, homily1_content, re.DOTALL)
-            
-            homily1_footnotes = []
-            for i, note_match in enumerate(note_matches, 1):
-                original_num = note_match.group(1)
-                note_content = note_match.group(2)
-                
-                # Extract text content
-                text_pattern = r'<p[^>]*>(.*?)</p>'
-                text_match = re.search(text_pattern, note_content, re.DOTALL)
-                
-                if text_match:
-                    text = text_match.group(1)
-                else:
-                    text = note_content
-                
-                # Clean up
-                text = re.sub(r'<span[^>]*lang="EL"[^>]*>([^<]+)</span>', r'[Greek: \1]', text)
-                text = re.sub(r'<[^>]+>', '', text)
-                text = html.unescape(text)
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                if text.startswith('[') and text.endswith(']'):
-                    text = text[1:-1]
-                
-                footnote = {
-                    "original_number": int(original_num),
-                    "display_number": i,
-                    "content": text
-                }
-                
-                homily1_footnotes.append(footnote)
-            
-            if homily1_footnotes:
-                footnotes_by_homily[1] = {
-                    "roman_numeral": "I",
-                    "footnotes": homily1_footnotes
-                }
-    
     return dict(footnotes_by_homily)
 
 def main():
@@ -144,8 +135,7 @@ def main():
     sorted_footnotes = dict(sorted(footnotes.items()))
     
     # Save to JSON
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(sorted_footnotes, f, indent=2, ensure_ascii=False)
+    write_json(output_path, sorted_footnotes, ensure_ascii=False)
     
     # Print summary
     print(f"\nExtracted footnotes from {len(sorted_footnotes)} homilies:")
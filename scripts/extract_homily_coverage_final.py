@@ -4,10 +4,14 @@ Extract homily coverage from Chrysostom's XML using the structured passage attri
 """
 
 import re
-import json
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
+from coverage_ends import fill_open_ends
+from json_output import write_json
+from lazy_match import lazy_matches
+from parse_cache import cached_parse
+
 def roman_to_int(roman):
     """Convert Roman numeral to integer."""
     values = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
@@ -46,22 +50,40 @@ def parse_passage(passage_str):
     
     return 1, 1, 1
 
-def extract_from_xml_attributes(xml_path):
-    """Extract homily coverage using XML structure and attributes."""
+# Bump when the shape of the cached scan changes
+HOMILY_REFS_VERSION = 1
+
+# A "Homily V." heading and the first scripRef after it, paired by lazy_matches()
+HOMILY_HEADING = re.compile(r'Homily\s+([IVX]+)\.')
+SCRIPREF = re.compile(r'<scripRef[^<>]*passage="([^"]+)"')
+
+def scan_homily_refs(xml_path):
+    """Scan the XML for (title, numeral) homily headers and (numeral, passage) scripRef tuples."""
     
     # Read file as text first to find div2 elements
     with open(xml_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    homilies = {}
-    
     # Find all div2 elements with type="Homily"
     # Pattern: <div2 type="Homily" title="Matthew I. 1." n="III"
-    div2_pattern = r'<div2[^>]*type="Homily"[^>]*title="([^"]+)"[^>]*n="([IVX]+)"'
+    div2_pattern = r'<div2[^<>]*type="Homily"[^<>]*title="([^"]+)"[^<>]*n="([IVX]+)"'
+    titles = re.findall(div2_pattern, content)
+    
+    # Also look for scripRef elements which might have verse ranges
+    # Pattern: <scripRef passage="Matt. 1:1-16"
+    scrip_refs = [(heading.group(1), ref.group(1))
+                  for heading, ref in lazy_matches(content, HOMILY_HEADING, SCRIPREF)]
+    
+    return {'titles': titles, 'scrip_refs': scrip_refs}
+
+def extract_from_xml_attributes(xml_path):
+    """Extract homily coverage using XML structure and attributes."""
+    refs = cached_parse(xml_path, 'homily_scrip_refs', HOMILY_REFS_VERSION, scan_homily_refs)
     
-    for match in re.finditer(div2_pattern, content):
-        title = match.group(1)  # e.g., "Matthew I. 1."
-        roman_num = match.group(2)  # e.g., "III"
+    homilies = {}
+    
+    for title, roman_num in refs['titles']:
+        # title e.g. "Matthew I. 1.", roman_num e.g. "III"
         
         homily_num = roman_to_int(roman_num)
         
@@ -78,14 +100,7 @@ def extract_from_xml_attributes(xml_path):
             "title": title
         }
     
-    # Also look for scripRef elements which might have verse ranges
-    # Pattern: <scripRef passage="Matt. 1:1-16"
-    scripref_pattern = r'Homily\s+([IVX]+)\..*?<scripRef[^>]*passage="([^"]+)"'
-    
-    for match in re.finditer(scripref_pattern, content, re.DOTALL):
-        roman_num = match.group(1)
-        passage = match.group(2)
-        
+    for roman_num, passage in refs['scrip_refs']:
         homily_num = roman_to_int(roman_num)
         
         # Update if we have a range
@@ -94,45 +109,7 @@ def extract_from_xml_attributes(xml_path):
             homilies[homily_num]["end_verse"] = end_verse
     
     # Fill in end chapters/verses based on next homily start
-    homily_nums = sorted(homilies.keys())
-    
-    # Known verse counts per chapter in Matthew
-    verse_counts = {
-        1: 25, 2: 23, 3: 17, 4: 25, 5: 48, 6: 34, 7: 29, 8: 34,
-        9: 38, 10: 42, 11: 30, 12: 50, 13: 58, 14: 36, 15: 39,
-        16: 28, 17: 27, 18: 35, 19: 30, 20: 34, 21: 46, 22: 46,
-        23: 39, 24: 51, 25: 46, 26: 75, 27: 66, 28: 20
-    }
-    
-    for i in range(len(homily_nums) - 1):
-        current = homily_nums[i]
-        next_num = homily_nums[i + 1]
-        
-        current_homily = homilies[current]
-        next_homily = homilies[next_num]
-        
-        # If we don't have an explicit end verse, calculate it
-        if current_homily["end_verse"] == current_homily["start_verse"]:
-            next_ch = next_homily["start_chapter"]
-            next_v = next_homily["start_verse"]
-            
-            if next_v == 1:
-                # Next homily starts new chapter
-                end_ch = next_ch - 1 if next_ch > 1 else 1
-                end_v = verse_counts.get(end_ch, 50)
-            else:
-                # Same chapter
-                end_ch = next_ch
-                end_v = next_v - 1
-            
-            current_homily["end_chapter"] = end_ch
-            current_homily["end_verse"] = end_v
-    
-    # Last homily goes to end of Matthew
-    if homily_nums:
-        last = homily_nums[-1]
-        homilies[last]["end_chapter"] = 28
-        homilies[last]["end_verse"] = 20
+    fill_open_ends(homilies, 'matthew')
     
     return homilies
 
@@ -148,8 +125,7 @@ def main():
     homilies = extract_from_xml_attributes(xml_path)
     
     # Save full homily data
-    with open(output_path, 'w') as f:
-        json.dump(homilies, f, indent=2)
+    write_json(output_path, homilies)
     
     # Create verse-to-homily mapping
     verse_to_homily = {}
@@ -163,8 +139,7 @@ def main():
         }
     
     verse_map_path = Path("../texts/commentaries/chrysostom/matthew/matthew_verse_to_homily_clean.json")
-    with open(verse_map_path, 'w') as f:
-        json.dump(verse_to_homily, f, indent=2)
+    write_json(verse_map_path, verse_to_homily)
     
     print(f"Saved homily coverage to {output_path}")
     print(f"Saved verse mapping to {verse_map_path}")
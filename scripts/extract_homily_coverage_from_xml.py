@@ -5,10 +5,12 @@ Creates a JSON mapping of each homily to its biblical passage coverage.
 """
 
 import xml.etree.ElementTree as ET
-import json
 import re
 from pathlib import Path
 
+from coverage_ends import fill_open_ends
+from json_output import write_json
+
 def parse_verse_reference(ref_text):
     """
     Parse a verse reference like "Matt. I. 1" or "Matthew 5:17-20"
@@ -131,30 +133,7 @@ def extract_homily_data(xml_path):
                 current_homily = homily_num
     
     # Try to find end references by looking at the next homily's start
-    homily_nums = sorted(homilies.keys())
-    for i in range(len(homily_nums) - 1):
-        current = homily_nums[i]
-        next_num = homily_nums[i + 1]
-        
-        # The end of current homily is typically the verse before the start of next homily
-        next_start_ch = homilies[next_num]["start_chapter"]
-        next_start_v = homilies[next_num]["start_verse"]
-        
-        # Set end to verse before next homily starts
-        if next_start_v > 1:
-            homilies[current]["end_chapter"] = next_start_ch
-            homilies[current]["end_verse"] = next_start_v - 1
-        else:
-            # If next starts at verse 1, end at last verse of previous chapter
-            # We'll approximate with verse 50 for now
-            homilies[current]["end_chapter"] = next_start_ch - 1 if next_start_ch > 1 else 1
-            homilies[current]["end_verse"] = 50
-    
-    # Last homily - default to chapter 28 (end of Matthew)
-    if homily_nums:
-        last = homily_nums[-1]
-        homilies[last]["end_chapter"] = 28
-        homilies[last]["end_verse"] = 20
+    fill_open_ends(homilies, 'matthew')
     
     return homilies
 
@@ -173,8 +152,7 @@ def main():
     sorted_homilies = dict(sorted(homilies.items()))
     
     # Save to JSON
-    with open(output_path, 'w') as f:
-        json.dump(sorted_homilies, f, indent=2)
+    write_json(output_path, sorted_homilies)
     
     print(f"Saved homily coverage to {output_path}")
     print(f"Found {len(homilies)} homilies")
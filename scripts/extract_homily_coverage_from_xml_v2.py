@@ -5,9 +5,11 @@ Creates a JSON mapping of each homily to its biblical passage coverage.
 """
 
 import re
-import json
 from pathlib import Path
 
+from coverage_ends import fill_open_ends
+from json_output import write_json
+
 def roman_to_int(roman):
     """Convert Roman numeral to integer."""
     roman_map = {
@@ -104,40 +106,7 @@ def extract_homilies_from_xml(xml_path):
         }
     
     # Now try to infer end points based on next homily's start
-    homily_nums = sorted(homilies.keys())
-    
-    # Known verse counts per chapter in Matthew
-    verse_counts = {
-        1: 25, 2: 23, 3: 17, 4: 25, 5: 48, 6: 34, 7: 29, 8: 34,
-        9: 38, 10: 42, 11: 30, 12: 50, 13: 58, 14: 36, 15: 39,
-        16: 28, 17: 27, 18: 35, 19: 30, 20: 34, 21: 46, 22: 46,
-        23: 39, 24: 51, 25: 46, 26: 75, 27: 66, 28: 20
-    }
-    
-    for i in range(len(homily_nums) - 1):
-        current = homily_nums[i]
-        next_num = homily_nums[i + 1]
-        
-        next_ch = homilies[next_num]["start_chapter"]
-        next_v = homilies[next_num]["start_verse"]
-        
-        # If next homily starts at verse 1, end current at last verse of previous chapter
-        if next_v == 1:
-            end_ch = next_ch - 1 if next_ch > 1 else 1
-            end_v = verse_counts.get(end_ch, 50)
-        else:
-            # End at verse before next homily
-            end_ch = next_ch
-            end_v = next_v - 1
-        
-        homilies[current]["end_chapter"] = end_ch
-        homilies[current]["end_verse"] = end_v
-    
-    # Handle last homily - goes to end of Matthew
-    if homily_nums:
-        last = homily_nums[-1]
-        homilies[last]["end_chapter"] = 28
-        homilies[last]["end_verse"] = 20
+    fill_open_ends(homilies, 'matthew')
     
     return homilies
 
@@ -166,12 +135,10 @@ def main():
         }
     
     # Save both formats
-    with open(output_path, 'w') as f:
-        json.dump(homilies, f, indent=2)
+    write_json(output_path, homilies)
     
     verse_map_path = Path("../texts/commentaries/chrysostom/matthew/verse_to_homily_clean.json")
-    with open(verse_map_path, 'w') as f:
-        json.dump(verse_to_homily, f, indent=2)
+    write_json(verse_map_path, verse_to_homily)
     
     print(f"Saved homily coverage to {output_path}")
     print(f"Saved verse mapping to {verse_map_path}")
@@ -4,10 +4,11 @@ Extract footnotes from Chrysostom's John homilies XML and create JSON
 """
 
 import xml.etree.ElementTree as ET
-import json
 import re
 import html
 
+from json_output import write_json
+
 def int_to_roman(num):
     """Convert integer to Roman numeral"""
     val = [
@@ -100,8 +101,7 @@ def extract_footnotes():
     
     # Save to JSON
     output_file = "../texts/commentaries/chrysostom/john/footnotes.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(footnotes_by_homily, f, indent=2, ensure_ascii=False)
+    write_json(output_file, footnotes_by_homily, ensure_ascii=False)
     
     print(f"Footnotes saved to {output_file}")
     
@@ -4,10 +4,11 @@ Extract John homilies and create verse-to-homily mapping
 """
 
 import xml.etree.ElementTree as ET
-import json
 import re
 import os
 
+from json_output import write_json
+
 def roman_to_arabic(roman):
     """Convert Roman numerals to Arabic numbers"""
     roman_dict = {
@@ -178,12 +179,10 @@ def extract_john_homilies():
     os.makedirs(output_dir, exist_ok=True)
     
     # Save verse to homilies mapping
-    with open(os.path.join(output_dir, "john_verse_to_homilies.json"), "w") as f:
-        json.dump(verse_to_homilies, f, indent=2, sort_keys=True)
+    write_json(os.path.join(output_dir, "john_verse_to_homilies.json"), verse_to_homilies, sort_keys=True)
     
     # Save homily coverage
-    with open(os.path.join(output_dir, "homily_coverage.json"), "w") as f:
-        json.dump(homily_coverage, f, indent=2)
+    write_json(os.path.join(output_dir, "homily_coverage.json"), homily_coverage)
     
     print(f"\nMappings saved to {output_dir}")
     
@@ -2,6 +2,8 @@
 import re
 from pathlib import Path
 
+from json_output import atomic_output
+
 def fix_all_books():
     """Fix all NT books with complete text."""
     
@@ -95,7 +97,7 @@ def fix_all_books():
             ch_dir.mkdir(parents=True, exist_ok=True)
             
             ch_file = ch_dir / f"{book_id}_{chapter:02d}.txt"
-            with open(ch_file, 'w') as f:
+            with atomic_output(ch_file) as f:
                 for v_num in sorted(verses.keys()):
                     f.write(f"{chapter}:{v_num} {verses[v_num]}\n")
             
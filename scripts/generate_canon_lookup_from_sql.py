@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Generate Eusebian Canon lookup table from SQLite database"""
 
-import json
 import sqlite3
 from pathlib import Path
 
+from json_output import write_json
+
 def to_roman(num):
     """Convert number to Roman numeral"""
     val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
@@ -18,14 +19,8 @@ def to_roman(num):
         i += 1
     return roman_num
 
-def main():
-    print("Building Eusebian Canon lookup table from SQLite database...")
-    
-    db_path = Path('texts/reference/eusebian_canons/eusebian-canons.db')
-    if not db_path.exists():
-        print(f"Database not found at {db_path}")
-        return
-    
+def build_canon_lookup(db_path):
+    """Build the canon key -> {gospel: verse reference} lookup from the database"""
     # Connect to database
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -93,10 +88,21 @@ def main():
     
     conn.close()
     
+    return canon_lookup
+
+def main():
+    print("Building Eusebian Canon lookup table from SQLite database...")
+    
+    db_path = Path('texts/reference/eusebian_canons/eusebian-canons.db')
+    if not db_path.exists():
+        print(f"Database not found at {db_path}")
+        return
+    
+    canon_lookup = build_canon_lookup(db_path)
+    
     # Save to JSON
     output_file = Path('texts/reference/eusebian_canons/canon_lookup.json')
-    with open(output_file, 'w') as f:
-        json.dump(canon_lookup, f, indent=2, sort_keys=True)
+    write_json(output_file, canon_lookup, sort_keys=True)
     
     print(f"Saved {len(canon_lookup)} canon entries to {output_file}")
     
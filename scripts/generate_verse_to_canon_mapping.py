@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Generate verse-to-canon mapping from SQLite database"""
 
-import json
 import sqlite3
 from pathlib import Path
 
+from json_output import write_json
+
 def to_roman(num):
     """Convert number to Roman numeral"""
     val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
@@ -18,14 +19,8 @@ def to_roman(num):
         i += 1
     return roman_num
 
-def main():
-    print("Building verse-to-canon mapping from SQLite database...")
-    
-    db_path = Path('texts/reference/eusebian_canons/eusebian-canons.db')
-    if not db_path.exists():
-        print(f"Database not found at {db_path}")
-        return
-    
+def build_verse_to_canon(db_path):
+    """Build the gospel -> {chapter:verse: canon key} mapping from the database"""
     # Connect to database
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -115,10 +110,21 @@ def main():
     
     conn.close()
     
+    return verse_mapping
+
+def main():
+    print("Building verse-to-canon mapping from SQLite database...")
+    
+    db_path = Path('texts/reference/eusebian_canons/eusebian-canons.db')
+    if not db_path.exists():
+        print(f"Database not found at {db_path}")
+        return
+    
+    verse_mapping = build_verse_to_canon(db_path)
+    
     # Save to JSON
     output_file = Path('texts/reference/eusebian_canons/verse_to_canon.json')
-    with open(output_file, 'w') as f:
-        json.dump(verse_mapping, f, indent=2, sort_keys=True)
+    write_json(output_file, verse_mapping, sort_keys=True)
     
     print(f"Saved verse mappings to {output_file}")
     
@@ -7,6 +7,8 @@ Allows multiple homilies per verse.
 import json
 from pathlib import Path
 
+from json_output import write_json
+
 def main():
     # Load the homily coverage data
     coverage_path = Path("../texts/commentaries/chrysostom/matthew/homily_coverage_complete.json")
@@ -39,8 +41,7 @@ def main():
     
     # Save the mapping
     output_path = Path("../texts/commentaries/chrysostom/matthew/matthew_verse_to_homilies.json")
-    with open(output_path, 'w') as f:
-        json.dump(verse_to_homilies, f, indent=2, sort_keys=True)
+    write_json(output_path, verse_to_homilies, sort_keys=True)
     
     print(f"Saved verse-to-homilies mapping to {output_path}")
     
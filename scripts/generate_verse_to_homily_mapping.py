@@ -5,6 +5,8 @@ import json
 import os
 from pathlib import Path
 
+from json_output import write_json
+
 def parse_verse_reference(verse_ref):
     """Parse a verse reference like 'Matthew 1:1' into chapter and verse"""
     if not verse_ref or verse_ref == "Matthew (Introduction)":
@@ -100,8 +102,7 @@ def main():
     output_file = Path('texts/reference/chrysostom_homilies/matthew_verse_to_homily.json')
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(verse_to_homily, f, indent=2, sort_keys=True)
+    write_json(output_file, verse_to_homily, sort_keys=True)
     
     print(f"\nSaved {len(verse_to_homily)} verse mappings to {output_file}")
     
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Shared output layer for every JSON artifact the pipeline writes.
+
+Outputs are streamed to a temporary file next to the target, fsynced and then
+renamed over it, so a crash or a concurrent server reload never observes a
+truncated file. Encoding is incremental (json.JSONEncoder.iterencode), so the
+encoded document is never held in memory alongside the data.
+
+A generator of records can stand in for a list, either as the document or
+as a value of the top-level object, and is written as a JSON array while it
+is consumed:
+
+    write_json(path, {'format': ..., 'quotations': iter_quotations()})
+
+The file is still one JSON document, so readers are unchanged.
+
+Set HYPOMNEMA_COMPACT_JSON=1 to drop indentation and whitespace from every
+artifact (for production builds); the default keeps the indented layout the
+files are committed in.
+
+Set HYPOMNEMA_CANONICAL_JSON=1 for canonical output: identical data always
+produces identical bytes, whatever order the generator built it in. Keys are
+converted to strings, NFC-normalized and sorted in natural order ("2" before
+"10", "1:9" before "1:10"), string values are NFC-normalized, non-ASCII text
+is written as UTF-8, -0.0 becomes 0.0, NaN and infinities are rejected, and
+the file ends with a newline. Containers are canonicalized as they are
+written, so no canonical copy of the whole document is made. Pair it with
+artifact_manifest.py to deploy only the artifacts whose content changed.
+"""
+
+import filecmp
+import json
+import math
+import os
+import re
+import tempfile
+import unicodedata
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+COMPACT = os.environ.get('HYPOMNEMA_COMPACT_JSON') == '1'
+CANONICAL = os.environ.get('HYPOMNEMA_CANONICAL_JSON') == '1'
+
+NATURAL_SPLIT = re.compile(r'(\d+)')
+
+# Encoder chunks are small; batch them into larger writes
+WRITE_BUFFER_SIZE = 1 << 16
+
+def _match_permissions(fd, path):
+    """Give a mkstemp file (always 0600) the mode the target has or would get."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.fchmod(fd, mode)
+
+@contextmanager
+def atomic_output(path, mode='w', encoding='utf-8'):
+    """Open a temp file beside path and rename it over path on success.
+
+    The temp file is removed if the block raises, leaving the old file intact.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        _match_permissions(fd, path)
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding, newline='', buffering=WRITE_BUFFER_SIZE)
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def natural_key(key):
+    """Sort key that orders embedded numbers numerically ("2" < "10", "1:9" < "1:10")."""
+    parts = NATURAL_SPLIT.split(key)
+    # Odd positions are always the digit runs, so tuples compare type-safely
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts)), key
+
+def canonical_scalar(value):
+    """Return a string, number, boolean or null in canonical form."""
+    if isinstance(value, str):
+        return unicodedata.normalize('NFC', value)
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            raise ValueError(f"Cannot write {value!r} in canonical JSON")
+        return 0.0 if value == 0 else value
+    return value
+
+def json_key(key):
+    """Convert a dict key to the string json would write."""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, bool) or key is None:
+        return json.dumps(key)
+    if isinstance(key, float):
+        return float.__repr__(key)
+    return str(key)
+
+def canonical_key(key):
+    """Convert a dict key to the string json would write, NFC-normalized."""
+    return unicodedata.normalize('NFC', json_key(canonical_scalar(key)))
+
+def canonical_items(value):
+    """Return the (key, item) pairs of a dict with canonical keys, in natural key order."""
+    items = {}
+    for key, item in value.items():
+        text = canonical_key(key)
+        if text in items:
+            raise ValueError(f"Keys collide after canonicalization: {text!r}")
+        items[text] = item
+    return sorted(items.items(), key=lambda pair: natural_key(pair[0]))
+
+def dump_options(indent=2, compact=None, canonical=None, **kwargs):
+    """Return json.JSONEncoder options, honouring compact and canonical modes."""
+    if compact is None:
+        compact = COMPACT
+    if canonical is None:
+        canonical = CANONICAL
+    if canonical:
+        # Key order comes from canonical_items(); output is always UTF-8
+        kwargs.update(sort_keys=False, ensure_ascii=False, allow_nan=False)
+    if compact:
+        kwargs.update(indent=None, separators=(',', ':'))
+    else:
+        kwargs.setdefault('indent', indent)
+    return kwargs
+
+def has_records(data):
+    """True if data is an iterator or an object with iterator values (see encode_chunks())."""
+    return isinstance(data, Iterator) or (isinstance(data, dict) and
+                                          any(isinstance(value, Iterator) for value in data.values()))
+
+def is_flat(value):
+    """True if value is a dict, list or tuple with no containers or iterators in it."""
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return False
+    return not any(isinstance(item, (dict, list, tuple, Iterator)) for item in value)
+
+def _iter_nested(value, encoder, indent, level):
+    """Yield the encoder's encoding of value, indented to sit at the given nesting level."""
+    for chunk in encoder.iterencode(value):
+        # Strings are escaped, so every newline in the output is layout
+        yield chunk.replace('\n', '\n' + indent * level) if indent and level else chunk
+
+def _iter_walk(value, encoder, indent, canonical, level=0):
+    """Yield the encoding of value one member at a time.
+
+    Iterators are written as arrays as they are consumed. In canonical mode
+    every container holding other containers is walked, so only one container
+    of scalars at a time is copied in canonical form rather than the whole
+    document; otherwise only the top level and iterators are walked and
+    everything else goes to the encoder.
+    """
+    if not canonical and level > 0 and not isinstance(value, Iterator):
+        yield from _iter_nested(value, encoder, indent, level)
+        return
+    if canonical and is_flat(value):
+        # A container of scalars is copied and handed to the encoder whole
+        if isinstance(value, dict):
+            flat = {key: canonical_scalar(item) for key, item in canonical_items(value)}
+        else:
+            flat = [canonical_scalar(item) for item in value]
+        yield from _iter_nested(flat, encoder, indent, level)
+        return
+    if isinstance(value, dict):
+        if canonical:
+            items = canonical_items(value)
+        else:
+            items = [(json_key(key), item) for key, item in value.items()]
+            if encoder.sort_keys:
+                items.sort(key=lambda pair: pair[0])
+        members = ((encoder.encode(key) + encoder.key_separator, item) for key, item in items)
+        opening, closing = '{', '}'
+    elif isinstance(value, (list, tuple, Iterator)):
+        members = (('', item) for item in value)
+        opening, closing = '[', ']'
+    else:
+        yield encoder.encode(canonical_scalar(value) if canonical else value)
+        return
+
+    inner = '' if indent is None else '\n' + indent * (level + 1)
+    empty = True
+    for prefix, item in members:
+        yield (opening if empty else encoder.item_separator) + inner + prefix
+        empty = False
+        yield from _iter_walk(item, encoder, indent, canonical, level + 1)
+    if empty:
+        yield opening + closing
+    else:
+        yield ('' if indent is None else '\n' + indent * level) + closing
+
+def encode_chunks(data, indent=2, compact=None, canonical=None, **kwargs):
+    """Yield the JSON encoding of data in chunks.
+
+    data may be an iterator, or an object some of whose values are iterators
+    (of records, say); each is written as a JSON array while it is consumed,
+    so the records never have to be held in memory at once.
+    """
+    if canonical is None:
+        canonical = CANONICAL
+    encoder = json.JSONEncoder(**dump_options(indent, compact, canonical, **kwargs))
+    if canonical or has_records(data):
+        layout = ' ' * encoder.indent if isinstance(encoder.indent, int) else encoder.indent
+        yield from _iter_walk(data, encoder, layout, canonical)
+    else:
+        yield from encoder.iterencode(data)
+    if canonical:
+        yield '\n'
+
+def write_json(path, data, indent=2, compact=None, canonical=None, skip_unchanged=False, **kwargs):
+    """Stream data to path as JSON atomically.
+
+    Extra keyword arguments (ensure_ascii, sort_keys, ...) go to the encoder.
+    With skip_unchanged, an identical existing file is left untouched so its
+    mtime does not change. Returns True if the file was written.
+    """
+    chunks = encode_chunks(data, indent, compact, canonical, **kwargs)
+    path = Path(path)
+
+    if not skip_unchanged or not path.exists():
+        with atomic_output(path) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return True
+
+    # Encode to a temp file first and only swap it in if it differs
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        _match_permissions(fd, path)
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        if filecmp.cmp(tmp_path, path, shallow=False):
+            os.unlink(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return True
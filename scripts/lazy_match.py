@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Linear-time matching of lazy "opener.*?closer" patterns.
+
+re.finditer(opener + '.*?' + closer, text, re.DOTALL) is linear while every
+opener has a closer after it. When one does not (a truncated file, an
+unclosed <div2> or <note>), the regex engine scans from that opener to the
+end of the text, fails, and starts again at the next character, so a
+missing closer costs time quadratic in the number of openers after it.
+
+lazy_matches() finds the same matches in one forward pass. It searches for
+the next opener, then for the first closer after it, and resumes after the
+closer. When no closer follows an opener, none follows any later opener
+either, so the scan stops there. The result is the same as the lazy pattern
+whenever the opener can match only one way at a given position, as a tag
+pattern ending at its first ">" does:
+
+    for opener, closer in lazy_matches(text, DIV2_OPEN, DIV2_CLOSE):
+        body = text[opener.end():closer.start()]
+
+The opener and closer are compiled patterns; a closer written as a lookahead
+in the lazy pattern (".*?(?=Homily II\\.)") is just the closer, whose match
+is not consumed past its start by the caller. Patterns passed here are
+checked by check_regex_safety.py like any other.
+"""
+
+def lazy_matches(text, opener, closer, pos=0):
+    """Yield (opener match, closer match) pairs, as finditer() of opener.*?closer with DOTALL would."""
+    while True:
+        start = opener.search(text, pos)
+        if start is None:
+            return
+        end = closer.search(text, start.end())
+        if end is None:
+            return
+        yield start, end
+        pos = max(end.end(), start.start() + 1)
+
+def first_lazy_match(text, opener, closer, pos=0):
+    """The first (opener match, closer match) pair, as search() of opener.*?closer would, or None."""
+    return next(lazy_matches(text, opener, closer, pos), None)
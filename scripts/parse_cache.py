@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for parsed intermediate representations of the raw sources.
+
+Parsing the ThML XML and Cyril HTML dominates the run time of the extractors,
+while the sources themselves almost never change. Extractors wrap their parse
+step in cached_parse() so that iterating on downstream transforms (coverage
+inference, unified JSON layout, ...) reuses the previous parse.
+
+Entries are keyed by the SHA-256 of the source bytes, the kind of
+representation and the parser version, and stored as pickles under
+.cache/parse/ in the repository root. Bump a parser's version whenever its
+output shape changes. The cache is bounded in size; the least recently used
+entries are evicted first.
+
+Environment variables:
+    HYPOMNEMA_PARSE_CACHE_DIR    Override the cache directory
+    HYPOMNEMA_PARSE_CACHE_MAX_MB Maximum cache size in megabytes (default 256)
+    HYPOMNEMA_NO_PARSE_CACHE     Set to 1 to always reparse
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get('HYPOMNEMA_PARSE_CACHE_DIR', REPO_ROOT / '.cache' / 'parse'))
+MAX_CACHE_BYTES = int(os.environ.get('HYPOMNEMA_PARSE_CACHE_MAX_MB', '256')) * 1024 * 1024
+CACHE_SUFFIX = '.pickle'
+
+def source_hash(source_path):
+    """Return the SHA-256 hex digest of a source file's contents."""
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_path(source_path, kind, version):
+    """Return the cache file for a source, representation kind and parser version."""
+    key = hashlib.sha256(f"{source_hash(source_path)}:{kind}:{version}".encode('utf-8')).hexdigest()
+    return CACHE_DIR / f"{kind}-{key[:32]}{CACHE_SUFFIX}"
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    if not CACHE_DIR.exists():
+        return
+    entries = []
+    for path in CACHE_DIR.glob(f'*{CACHE_SUFFIX}'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def load(path):
+    """Load a cache entry, or return None if it is missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        # Truncated or stale entry; it will be overwritten
+        return None
+    # Mark as recently used for eviction
+    os.utime(path)
+    return value
+
+def store(path, value):
+    """Write a cache entry atomically and enforce the size bound."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    evict()
+
+def cached_parse(source_path, kind, version, parse):
+    """Return parse(source_path), reusing a cached result for identical sources.
+
+    The parse result must be plain data (dicts, lists, tuples, strings and
+    numbers) so that it stays loadable across changes to the calling script.
+    """
+    if os.environ.get('HYPOMNEMA_NO_PARSE_CACHE') == '1':
+        return parse(source_path)
+
+    path = cache_path(source_path, kind, version)
+    value = load(path)
+    if value is not None:
+        return value
+
+    value = parse(source_path)
+    store(path, value)
+    return value
+
+def clear():
+    """Remove every cache entry."""
+    if not CACHE_DIR.exists():
+        return 0
+    removed = 0
+    for path in CACHE_DIR.glob(f'*{CACHE_SUFFIX}'):
+        path.unlink()
+        removed += 1
+    return removed
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'clear':
+        print(f"Removed {clear()} cache entries from {CACHE_DIR}")
+        return
+
+    entries = sorted(CACHE_DIR.glob(f'*{CACHE_SUFFIX}')) if CACHE_DIR.exists() else []
+    total = sum(path.stat().st_size for path in entries)
+    print(f"Parse cache: {CACHE_DIR}")
+    print(f"  {len(entries)} entries, {total / (1024 * 1024):.1f} MB of {MAX_CACHE_BYTES / (1024 * 1024):.0f} MB")
+    for path in entries:
+        print(f"  {path.name}  {path.stat().st_size:>10,} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Render every homily and sermon to a publish-ready HTML fragment.
+
+The server used to scrub the raw ThML XML and Cyril HTML on every homily
+request (page headers, <pb> page breaks, scripCom tags, title boilerplate,
+leading verse references) before resolving footnote anchors. This stage does
+that cleanup once and writes each result to
+
+    texts/commentaries/<author>/<book>/rendered/<number>.json
+
+as {"verse_ref": ..., "html": ...}, which the server serves with a single
+file read. The cleanup reproduces extractHomilyFromXML and
+extractCyrilSermonFromHTML in hypomnema-server/main.go step for step, using
+the same regular expressions with Go semantics (ASCII \\w, \\s and \\b). The
+Go functions remain as the fallback for missing fragments. The parity test
+in hypomnema-server/main_test.go compares every fragment with them, so run
+from hypomnema-server/ after changing either side:
+
+    go test .
+
+Usage:
+    python scripts/render_homilies.py                  # render everything
+    python scripts/render_homilies.py chrysostom matthew
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+from json_output import write_json
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COMMENTARIES_DIR = REPO_ROOT / 'texts' / 'commentaries'
+CYRIL_DIR = COMMENTARIES_DIR / 'cyril' / 'luke'
+
+CHRYSOSTOM_HOMILY_COUNTS = {'matthew': 90, 'john': 88}
+
+# Sermon ranges per Cyril file, as in extractCyrilSermonFromHTML (26 is missing)
+CYRIL_SERMON_FILES = [
+    (1, 11, 'cyril_on_luke_01_sermons_01_11.htm'),
+    (12, 25, 'cyril_on_luke_02_sermons_12_25.htm'),
+    (27, 38, 'cyril_on_luke_03_sermons_27_38.htm'),
+    (39, 46, 'cyril_on_luke_04_sermons_39_46.htm'),
+    (47, 56, 'cyril_on_luke_05_sermons_47_56.htm'),
+    (57, 65, 'cyril_on_luke_06_sermons_57_65.htm'),
+    (66, 80, 'cyril_on_luke_07_sermons_66_80.htm'),
+    (81, 88, 'cyril_on_luke_08_sermons_81_88.htm'),
+    (89, 98, 'cyril_on_luke_09_sermons_89_98.htm'),
+    (99, 109, 'cyril_on_luke_10_sermons_99_109.htm'),
+    (110, 123, 'cyril_on_luke_11_sermons_110_123.htm'),
+    (124, 134, 'cyril_on_luke_12_sermons_124_134.htm'),
+    (135, 145, 'cyril_on_luke_13_sermons_135_145.htm'),
+    (146, 156, 'cyril_on_luke_14_sermons_146_156.htm'),
+]
+
+# Go's \p{Z}: Unicode separators (Zs, Zl, Zp)
+GO_UNICODE_SPACE = '\u0020\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+
+def go_regexp(pattern):
+    """Compile a pattern from main.go with Go's ASCII-only character classes."""
+    return re.compile(pattern.replace(r'\p{Z}', GO_UNICODE_SPACE), re.ASCII)
+
+def int_to_roman(num):
+    """Convert an integer to a Roman numeral (same as intToRoman in main.go)."""
+    values = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
+    symbols = ['M', 'CM', 'D', 'CD', 'C', 'XC', 'L', 'XL', 'X', 'IX', 'V', 'IV', 'I']
+    result = ''
+    for value, symbol in zip(values, symbols):
+        while num >= value:
+            num -= value
+            result += symbol
+    return result
+
+def trim_space(text):
+    return text.strip()
+
+def escape_attribute(text):
+    return text.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
+
+def footnotes_section(footnotes):
+    """Return the endnotes block appended after a homily, or '' if there are none."""
+    if not footnotes:
+        return ''
+    section = "\n\n<div class='footnotes-section'><hr><h4>Notes</h4><ol class='footnotes'>"
+    for number, content in footnotes:
+        # Store content as data attribute for tooltip access
+        escaped = content.replace('"', '&quot;')
+        section += f'<li id="fn-{number}" data-content="{escaped}">{content}</li>'
+    return section + '</ol></div>'
+
+# --- Chrysostom ---------------------------------------------------------------
+
+JOHN_HOMILY_DIV = go_regexp(r'(?s)<div2[^>]*type="Homily"[^>]*>.*?</div2>')
+TITLE_ATTR = go_regexp(r'title="([^"]+)"')
+NOTE = go_regexp(r'(?s)<note\s+n="([^"]+)"[^>]*>.*?</note>')
+SCRIP_REF = go_regexp(r'<scripRef[^>]*>([^<]*)</scripRef>')
+FOOTNOTE_AFTER_PUNCTUATION = go_regexp(r'(<sup class="footnote-ref"[^>]*>.*?</sup>)([.,;:!?]+)')
+SPACE_BEFORE_FOOTNOTE = go_regexp(r'([.,;:!?])\s+(<sup class="footnote-ref")')
+
+BOOK_HEADERS = {
+    'matthew': [
+        go_regexp(r'(?si)Homilies\s+of\s+St\.\s*John\s+Chrysostom[^.]*?gospel\s+according\s+to\s+st\.\s*matthew\.'),
+        go_regexp(r'(?s)Homilies of St\. John Chrysostom.*?matthew\.'),
+        go_regexp(r'(?s)on the\s*gospel according to st\. matthew\.'),
+    ],
+    'john': [
+        go_regexp(r'(?si)Homilies\s+of\s+St\.\s*John\s+Chrysostom[^.]*?gospel\s+according\s+to\s+st\.\s*john\.'),
+        go_regexp(r'(?s)Homilies of St\. John Chrysostom.*?john\.'),
+        go_regexp(r'(?s)on the\s*gospel according to st\. john\.'),
+        # "gospel according to" and "st. john." may appear on separate lines
+        go_regexp(r'(?si)gospel\s+according\s+to\s*(?:<[^>]+>)*\s*st\.\s*john\.'),
+        go_regexp(r'(?si)gospel\s+according\s+to\s*\Z'),
+        go_regexp(r'(?si)^\s*st\.\s*john\.'),
+        go_regexp(r'(?si)(?:<[^>]+>)*\s*Preface\.\s*(?:<[^>]+>)*'),
+    ],
+}
+ARCHBISHOP = go_regexp(r'(?s)archbishop of constantinople,')
+DASHES = go_regexp(r'(?s)[-—]+\s*')
+QUOTED_VERSE = go_regexp(r'(?si)<p[^>]*>\s*"[^"]+"\s*</p>')
+MATTHEW_ARABIC_REF = go_regexp(r'(?s)^[\s\p{Z}]*(?:Matt\.|Matthew)\s+\d+[:.]\s*\d+(?:\s*,\s*\d+)?\.?')
+VERSE_FRAGMENT = go_regexp(r'(?s)^[\s\p{Z}]*,\s*\d+\.?')
+SCRIP_COM = go_regexp(r'<scripCom[^>]*/>')
+SPLIT_WORD = go_regexp(r'(?s)(\w+)\s*\n*\s*<pb[^>]*>\s*\n*\s*(\w+)')
+PAGE_BREAK = go_regexp(r'(?s)<pb[^>]*>')
+P_OPEN = go_regexp(r'<p[^>]*>')
+SPAN_OPEN = go_regexp(r'<span[^>]*>')
+DIV_OPEN = go_regexp(r'<div[^>]*>')
+DIV_CLOSE = go_regexp(r'</div[^>]*>')
+SUP_OPEN = go_regexp(r'<sup(\s+[^>]+)?>')
+A_OPEN = go_regexp(r'<a\s+([^>]+)>')
+ANY_TAG = go_regexp(r'<[^>]+>')
+SUP_PLACEHOLDER = go_regexp(r'\{\{SUP_OPEN([^}]*)\}\}')
+A_PLACEHOLDER = go_regexp(r'\{\{A_OPEN:([^}]+)\}\}')
+MATTHEW_ROMAN_REF = go_regexp(r'(?s)^[\s\p{Z}]*(?:Matt\.|Matthew)\s+[IVX]+\.\s*\d+(?:\s*,\s*\d+)?\.?\s*')
+JOHN_ROMAN_REF = go_regexp(r'(?si)^[\s\p{Z}]*[A-Za-z]+\s+[ivxIVX]+\.\s*\d+(?:\s*[,-]\s*\d+)?\.?\s*')
+JOHN_ARABIC_REF = go_regexp(r'(?si)^[\s\p{Z}]*[A-Za-z]+\s+\d+[:\.] ?\d+(?:\s*[,-]\s*\d+)?\.?\s*')
+WHITESPACE = go_regexp(r'\s+')
+SPACE_BETWEEN_TAGS = go_regexp(r'>\s+<')
+MISSING_SPACE = go_regexp(r'([.,:;!?])([A-Za-z])')
+FIRST_P_ROMAN_REF = go_regexp(r'^<p>[\s\p{Z}]*(?:Matt\.|Matthew)\s+[IVX]+\.\s*\d+(?:\s*,\s*\d+)?\.?[\s\p{Z}]*')
+FIRST_P_ARABIC_REF = go_regexp(r'^<p>[\s\p{Z}]*(?:Matt\.|Matthew)\s+\d+[:.]\s*\d+(?:\s*,\s*\d+)?\.?[\s\p{Z}]*')
+FIRST_P_FRAGMENT = go_regexp(r'^<p>[\s\p{Z}]*,\s*\d+\.?[\s\p{Z}]*')
+
+HEADER_LINES = [
+    'Homilies of St. John Chrysostom',
+    'archbishop of constantinople',
+    'on the',
+    'gospel according to st. matthew',
+]
+
+def chrysostom_homily_sources(xml_content, book):
+    """Return {homily number: raw homily markup} for one book's XML."""
+    if book == 'john':
+        # Most John homilies have no n= attribute; count them, skipping Hebrews
+        homilies = [m for m in JOHN_HOMILY_DIV.findall(xml_content) if 'title="Hebrews' not in m]
+        return {num: match for num, match in enumerate(homilies, 1)}
+
+    sources = {}
+    for num in range(1, CHRYSOSTOM_HOMILY_COUNTS[book] + 1):
+        match = go_regexp(rf'(?s)<div2[^>]*n="{int_to_roman(num)}"[^>]*>.*?</div2>').search(xml_content)
+        if match:
+            sources[num] = match.group(0)
+    return sources
+
+def render_chrysostom_homily(match, book, homily_num, homily_footnotes):
+    """Clean one homily's markup. Returns (html, verse_ref)."""
+    roman = int_to_roman(homily_num)
+    preface = book == 'john' and homily_num == 1
+
+    verse_match = TITLE_ATTR.search(match)
+    verse_ref = verse_match.group(1) if verse_match else ''
+    text = match
+
+    footnotes = [(str(fn['display_number']), fn['content']) for fn in homily_footnotes]
+    footnote_map = {fn['original_number']: fn['display_number'] for fn in homily_footnotes}
+
+    def replace_note(note_match):
+        note = note_match.group(0)
+        new_num = footnote_map.get(note_match.group(1))
+        if new_num is None:
+            # Still remove the note tag to avoid displaying raw content
+            return ''
+        # Separate the marker from a following letter
+        needs_space = ''
+        after_note = text.find(note)
+        if after_note != -1 and after_note + len(note) < len(text):
+            next_char = text[after_note + len(note)]
+            if 'a' <= next_char <= 'z' or 'A' <= next_char <= 'Z':
+                needs_space = ' '
+        tooltip = next((content for number, content in footnotes if number == str(new_num)), '')
+        # Placeholders keep the dash removal below away from the attribute name
+        return f'<sup class="XXXFOOTNOTEREFXXX" DATATOOLTIPATR="{escape_attribute(tooltip)}">{new_num}</sup>{needs_space}'
+
+    text = NOTE.sub(replace_note, text)
+    text = SCRIP_REF.sub('', text)
+
+    # No-ops until the placeholders are replaced at the end; kept for parity
+    text = FOOTNOTE_AFTER_PUNCTUATION.sub(r'\2\1', text)
+    text = SPACE_BEFORE_FOOTNOTE.sub(r'\1\2', text)
+
+    for header in BOOK_HEADERS.get(book, []):
+        text = header.sub('', text)
+    text = ARCHBISHOP.sub('', text)
+    text = DASHES.sub('', text)
+
+    text = go_regexp(rf'(?si)<p[^>]*>\s*<span[^>]*>\s*Homily\s+{roman}\.\s*</span>\s*</p>').sub('', text)
+    if not preface:
+        text = go_regexp(rf'\bHomily {roman}\.').sub('', text)
+    text = QUOTED_VERSE.sub('', text)
+    if not preface:
+        text = go_regexp(rf'\bHomily\s+{roman}\.').sub('', text)
+
+    text = MATTHEW_ARABIC_REF.sub('', text)
+    text = VERSE_FRAGMENT.sub('', text)
+    text = SCRIP_COM.sub('', text)
+
+    # Join words split by a page break, then drop the remaining breaks
+    text = SPLIT_WORD.sub(r'\1\2', text)
+    text = PAGE_BREAK.sub(' ', text)
+
+    text = P_OPEN.sub('<p>', text)
+    text = text.replace('</p>', '</p>\n')
+    text = SPAN_OPEN.sub('', text)
+    text = text.replace('</span>', '')
+    text = DIV_OPEN.sub('', text)
+    text = DIV_CLOSE.sub('', text)
+
+    # Strip every other tag, keeping p, sup and a
+    text = text.replace('<p>', '{{P_OPEN}}').replace('</p>', '{{P_CLOSE}}')
+    text = SUP_OPEN.sub(r'{{SUP_OPEN\1}}', text)
+    text = text.replace('</sup>', '{{SUP_CLOSE}}')
+    text = A_OPEN.sub(r'{{A_OPEN:\1}}', text)
+    text = text.replace('</a>', '{{A_CLOSE}}')
+    text = ANY_TAG.sub('', text)
+    text = text.replace('{{P_OPEN}}', '<p>').replace('{{P_CLOSE}}', '</p>')
+    text = SUP_PLACEHOLDER.sub(r'<sup\1>', text)
+    text = text.replace('{{SUP_CLOSE}}', '</sup>')
+    text = A_PLACEHOLDER.sub(r'<a \1>', text)
+    text = text.replace('{{A_CLOSE}}', '</a>')
+
+    if book == 'matthew':
+        text = MATTHEW_ROMAN_REF.sub('', text)
+    elif book == 'john' and not preface:
+        text = JOHN_ROMAN_REF.sub('', text)
+        text = JOHN_ARABIC_REF.sub('', text)
+
+    text = WHITESPACE.sub(' ', text)
+    text = SPACE_BETWEEN_TAGS.sub('><', text)
+    text = MISSING_SPACE.sub(r'\1 \2', text)
+    text = trim_space(text)
+
+    paragraphs = []
+    for p in text.split('</p>'):
+        p = trim_space(p).removeprefix('<p>')
+        if p:
+            paragraphs.append('<p>' + p + '</p>')
+    text = trim_space('\n'.join(paragraphs))
+
+    # Drop header lines left at the start
+    lines = text.split('\n')
+    start = 0
+    for i, line in enumerate(lines):
+        clean_line = trim_space(line.removesuffix('.')).removesuffix(',')
+        is_header = any(header.lower() in clean_line.lower() for header in HEADER_LINES)
+        if not is_header and clean_line and not clean_line.startswith(('—', '-')):
+            start = i
+            break
+    if start > 0:
+        text = '\n'.join(lines[start:])
+
+    text = trim_space(text)
+    if text.startswith('<p>'):
+        text = FIRST_P_ROMAN_REF.sub('<p>', text)
+        text = FIRST_P_ARABIC_REF.sub('<p>', text)
+        text = FIRST_P_FRAGMENT.sub('<p>', text)
+
+    text += footnotes_section(footnotes)
+    text = text.replace('XXXFOOTNOTEREFXXX', 'footnote-ref').replace('DATATOOLTIPATR', 'data-tooltip')
+
+    if preface:
+        # The preface has no verse reference; skip its header paragraphs
+        kept = []
+        found_content = False
+        for p in text.split('</p>'):
+            p = trim_space(p)
+            if not p:
+                continue
+            content = trim_space(p.removeprefix('<p>'))
+            if not found_content:
+                lower = content.lower()
+                if ('homily i.' in lower or 'preface.' in lower or 'gospel according to' in lower
+                        or 'st. john.' in lower or 'archbishop of constantinople' in lower or not content):
+                    continue
+                found_content = True
+            if not p.endswith('</p>'):
+                p += '</p>'
+            kept.append(p)
+        text = trim_space('\n'.join(kept))
+    elif book == 'john':
+        lines = text.split('\n')
+        start = 0
+        for i, line in enumerate(lines):
+            trimmed = trim_space(line.lower())
+            if (trimmed in ('gospel according to', 'st. john.', 'preface.')
+                    or ('gospel according to' in trimmed and 'john' in trimmed and i < 5)):
+                start = i + 1
+            elif trimmed and i >= start:
+                break
+        if 0 < start < len(lines):
+            text = '\n'.join(lines[start:])
+
+    return text, verse_ref
+
+def render_chrysostom(book):
+    """Yield (homily number, html, verse_ref) for every homily in a book."""
+    book_dir = COMMENTARIES_DIR / 'chrysostom' / book
+    xml_path = book_dir / f'chrysostom_{book}_homilies.xml'
+    if not xml_path.exists():
+        print(f"  {xml_path.relative_to(REPO_ROOT)} not found, skipping")
+        return
+
+    # Keep line endings as they are, as Go's os.ReadFile does
+    with open(xml_path, 'r', encoding='utf-8', newline='') as f:
+        xml_content = f.read()
+    try:
+        with open(book_dir / 'all_footnotes.json', 'r', encoding='utf-8') as f:
+            all_footnotes = json.load(f)
+    except FileNotFoundError:
+        all_footnotes = {}
+
+    for num, match in chrysostom_homily_sources(xml_content, book).items():
+        html, verse_ref = render_chrysostom_homily(match, book, num, all_footnotes.get(str(num), []))
+        yield num, html, verse_ref
+
+# --- Cyril --------------------------------------------------------------------
+
+CYRIL_H3 = go_regexp(r'<h3>.*SERMON.*</h3>')
+CYRIL_FOOTNOTE_REF = go_regexp(r'(?i)<A\s+HREF="#([^"]+)"><SUP>[^<]*</SUP></A>')
+CYRIL_CLEANUP = [
+    (go_regexp(r'<script[^>]*>.*?</script>'), ''),
+    (go_regexp(r'<style[^>]*>.*?</style>'), ''),
+    # Editorial source notes
+    (go_regexp(r'\[From Mai and Cramer\]'), ''),
+    (go_regexp(r'\[From [^\]]+\]'), ''),
+    (go_regexp(r'(?is)<h3[^>]*>.*?(SERMON\s+[IVXLCDM]+|From S\. Cyril|From the Syriac).*?</h3>'), ''),
+    (go_regexp(r'(?is)<p align="center">\s*\[?From the Syriac.*?</p>'), ''),
+    (go_regexp(r'(?is)<p align="center">\s*From the Syriac.*?</p>'), ''),
+    (go_regexp(r'(?is)<p align="center">\s*\[From [^]]+\]</p>'), ''),
+    # Chapter notations like "cc. 2:21-24."
+    (go_regexp(r'(?is)<p>\s*cc?\.\s*\d+:\d+[-\d]*\.\s*</p>'), ''),
+    (go_regexp(r'(?is)<blockquote>.*?(SERMON\s+[IVXLCDM]+|From Aubert|From Mai|From the Syriac).*?</blockquote>'), ''),
+    (go_regexp(r"(?is)<p[^>]*>.*?From S\. Cyril's Commentary[^<]*</p>"), ''),
+    (go_regexp(r'(?is)<p[^>]*>.*?Sermon of S\. Cyril[^<]*</p>'), ''),
+    (go_regexp(r'(?i)SERMON\s+[IVXLC]+\.?\s*'), ''),
+    # Page markers
+    (go_regexp(r'<A NAME="p\d+"><SPAN CLASS=pb>\|\d+</SPAN></A>'), ''),
+]
+CYRIL_LEADING_H3 = go_regexp(r'(?s)^.*?</h3>\s*')
+CYRIL_LEADING_EMPTY_P = go_regexp(r'(?s)^<p[^>]*>\s*</p>\s*')
+CYRIL_FOOTNOTE_DEFINITION = go_regexp(r'<A NAME="\d+"></A>\d+\.\s*<sup>\w+</sup>[^<]*(?:<[^A][^>]*>[^<]*</[^>]+>[^<]*)*')
+
+def cyril_sermon_file(sermon_num):
+    """Return (filename, anchor id) for a sermon, or None if no file covers it."""
+    for first, last, filename in CYRIL_SERMON_FILES:
+        if first <= sermon_num <= last:
+            sermon_id = f"C{sermon_num}" if sermon_num <= 11 else f"SERMON {int_to_roman(sermon_num).upper()}"
+            return filename, sermon_id
+    return None
+
+def load_cyril_footnotes():
+    """Group footnotes.json by sermon, ordered by per-sermon display number."""
+    try:
+        with open(CYRIL_DIR / 'footnotes.json', 'r', encoding='utf-8') as f:
+            footnotes = json.load(f)
+    except FileNotFoundError:
+        return {}
+
+    by_sermon = {}
+    for fn in footnotes.values():
+        if not fn.get('sermon'):
+            continue
+        by_sermon.setdefault(fn['sermon'], []).append(fn)
+    for notes in by_sermon.values():
+        notes.sort(key=lambda fn: fn['display_number'])
+    return by_sermon
+
+def cyril_verse_ref(coverage):
+    """Format a coverage entry as "Luke c:v", "Luke c:v-v" or "Luke c:v-c:v"."""
+    if coverage is None:
+        return ''
+    start_ch, start_v = coverage['start_chapter'], coverage['start_verse']
+    end_ch, end_v = coverage['end_chapter'], coverage['end_verse']
+    if start_ch == end_ch:
+        if start_v == end_v:
+            return f"Luke {start_ch}:{start_v}"
+        return f"Luke {start_ch}:{start_v}-{end_v}"
+    return f"Luke {start_ch}:{start_v}-{end_ch}:{end_v}"
+
+def find_cyril_sermon(html, sermon_num, sermon_id):
+    """Slice one sermon out of its file's HTML, or return None if it is missing."""
+    if sermon_num <= 11:
+        start = html.find(f'NAME="{sermon_id}"')
+        if start == -1:
+            return None
+        tag_start = html.rfind('<', 0, start)
+        if tag_start != -1:
+            start = tag_start
+
+        end_pattern = f'NAME="C{sermon_num + 1}"' if sermon_num < 11 else '<hr>'
+        end = html.find(end_pattern, start)
+        if end == -1:
+            end = html.find('<a href="cyril_on_luke_', start)
+        return html[start:] if end == -1 else html[start:end]
+
+    start = html.find(f'<a name="{sermon_id}"')
+    if start == -1:
+        match = go_regexp(rf'<h3>.*{sermon_id}.*</h3>').search(html)
+        if not match:
+            return None
+        start = match.start()
+
+    match = CYRIL_H3.search(html, start + 1)
+    if match:
+        return html[start:match.start()]
+    end = html.find('<a href="cyril_on_luke_', start)
+    return html[start:] if end == -1 else html[start:end]
+
+def render_cyril_sermon(sermon_text, sermon_num, sermon_footnotes):
+    """Clean one sermon's HTML and resolve its footnote references. Returns the HTML."""
+    footnotes = [fn['text'] for fn in sermon_footnotes]
+    footnote_map = {str(fn['number']): fn['text'] for fn in sermon_footnotes}
+    collected = []
+    footnote_num = 0
+
+    def replace_reference(match):
+        nonlocal footnote_num
+        footnote_num += 1
+        footnote_id = match.group(1)
+
+        # HTML anchors restart per file; fall back to the position in the sermon
+        tooltip = footnote_map.get(footnote_id, '')
+        if not tooltip and footnote_id not in footnote_map and footnotes:
+            if footnote_id.isascii() and footnote_id.isdigit() and 0 < int(footnote_id) <= len(footnotes):
+                tooltip = footnotes[int(footnote_id) - 1]
+        if not tooltip:
+            tooltip = f"Footnote {footnote_id} (Sermon {sermon_num})"
+        tooltip = escape_attribute(tooltip)
+
+        if not tooltip.startswith('Footnote '):
+            display = tooltip.replace('&quot;', '"').replace('&lt;', '<').replace('&gt;', '>')
+            collected.append((str(footnote_num), f"{footnote_num}. {display}"))
+        return f'<sup class="XXXFOOTNOTEREFXXX" DATATOOLTIPATR="{tooltip}">{footnote_num}</sup>'
+
+    text = CYRIL_FOOTNOTE_REF.sub(replace_reference, sermon_text)
+    for pattern, replacement in CYRIL_CLEANUP:
+        text = pattern.sub(replacement, text)
+
+    text = trim_space(text)
+    # Fragments left at the start after the h3 removal
+    text = CYRIL_LEADING_H3.sub('', text)
+    text = CYRIL_LEADING_EMPTY_P.sub('', text)
+    text = trim_space(text)
+
+    # Footnote definitions are already in the tooltips
+    text = CYRIL_FOOTNOTE_DEFINITION.sub('', text)
+
+    text = text.replace('<i>', '<em>').replace('</i>', '</em>')
+    text = text.replace('<b>', '<strong>').replace('</b>', '</strong>')
+    text = text.replace('XXXFOOTNOTEREFXXX', 'footnote-ref').replace('DATATOOLTIPATR', 'data-tooltip')
+
+    # Footnote markers go after punctuation (Chicago style)
+    text = FOOTNOTE_AFTER_PUNCTUATION.sub(r'\2\1', text)
+    text = SPACE_BEFORE_FOOTNOTE.sub(r'\1\2', text)
+
+    return trim_space(text) + footnotes_section(collected)
+
+def render_cyril():
+    """Yield (sermon number, html, verse_ref) for every Cyril sermon on Luke."""
+    try:
+        with open(CYRIL_DIR / 'homily_coverage.json', 'r', encoding='utf-8') as f:
+            coverage = {int(k): v for k, v in json.load(f).items()}
+    except FileNotFoundError:
+        coverage = {}
+    footnotes = load_cyril_footnotes()
+    files = {}
+
+    for first, last, filename in CYRIL_SERMON_FILES:
+        for sermon_num in range(first, last + 1):
+            _, sermon_id = cyril_sermon_file(sermon_num)
+            if filename not in files:
+                with open(CYRIL_DIR / filename, 'r', encoding='utf-8', newline='') as f:
+                    files[filename] = f.read()
+            sermon_text = find_cyril_sermon(files[filename], sermon_num, sermon_id)
+            if sermon_text is None:
+                continue
+            html = render_cyril_sermon(sermon_text, sermon_num, footnotes.get(sermon_num, []))
+            yield sermon_num, html, cyril_verse_ref(coverage.get(sermon_num))
+
+# ------------------------------------------------------------------------------
+
+COMMENTARIES = {
+    ('chrysostom', 'matthew'): lambda: render_chrysostom('matthew'),
+    ('chrysostom', 'john'): lambda: render_chrysostom('john'),
+    ('cyril', 'luke'): render_cyril,
+}
+
+def rendered_dir(author, book):
+    return COMMENTARIES_DIR / author / book / 'rendered'
+
+def render_commentary(author, book, skip_unchanged=False):
+    """Write every fragment of one commentary and remove stale ones. Returns the paths written."""
+    output_dir = rendered_dir(author, book)
+    written = []
+    rendered = set()
+    for num, html, verse_ref in COMMENTARIES[(author, book)]():
+        path = output_dir / f'{num}.json'
+        rendered.add(path.name)
+        if write_json(path, {'verse_ref': verse_ref, 'html': html}, ensure_ascii=False,
+                      skip_unchanged=skip_unchanged):
+            written.append(path)
+
+    if rendered and output_dir.exists():
+        for path in output_dir.glob('*.json'):
+            if path.name not in rendered:
+                path.unlink()
+    return written
+
+def main():
+    selected = [tuple(sys.argv[1:3])] if len(sys.argv) >= 3 else list(COMMENTARIES)
+    for author, book in selected:
+        if (author, book) not in COMMENTARIES:
+            print(f"Unknown commentary: {author} {book}")
+            sys.exit(1)
+        print(f"Rendering {author} on {book}...")
+        written = render_commentary(author, book)
+        print(f"  Wrote {len(written)} fragments to {rendered_dir(author, book).relative_to(REPO_ROOT)}")
+
+if __name__ == "__main__":
+    main()
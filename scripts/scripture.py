@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Shared readers for the New Testament texts (KJV chapters and Greek TR books).
+
+Both corpora use one "chapter:verse text" line per verse. A few KJV chapters
+deviate from that: 1 John 4-5 number verses without the chapter ("1 text")
+and James 1 has verses wrapped onto continuation lines. The readers here
+accept all three forms so every index sees complete verses.
+"""
+
+import re
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+KJV_DIR = REPO_ROOT / 'texts' / 'scripture' / 'new_testament' / 'english' / 'kjv'
+TR_DIR = REPO_ROOT / 'texts' / 'scripture' / 'new_testament' / 'greek' / 'textus_receptus'
+
+# Canonical New Testament order and chapter counts (same as the server's books list)
+NT_BOOKS = {
+    'matthew': 28, 'mark': 16, 'luke': 24, 'john': 21,
+    'acts': 28, 'romans': 16, '1corinthians': 16, '2corinthians': 13,
+    'galatians': 6, 'ephesians': 6, 'philippians': 4, 'colossians': 4,
+    '1thessalonians': 5, '2thessalonians': 3, '1timothy': 6, '2timothy': 4,
+    'titus': 3, 'philemon': 1, 'hebrews': 13, 'james': 5,
+    '1peter': 5, '2peter': 3, '1john': 5, '2john': 1,
+    '3john': 1, 'jude': 1, 'revelation': 22
+}
+
+VERSE_LINE = re.compile(r'^(?:(\d+):)?(\d+) (.*)$')
+
+def verse_ref(book, chapter, verse):
+    """Return the reference string used as a document key, e.g. "john 1:1"."""
+    return f"{book} {chapter}:{verse}"
+
+def parse_verse_ref(ref):
+    """Split "john 1:1" into ('john', 1, 1)."""
+    book, _, location = ref.partition(' ')
+    chapter, _, verse = location.partition(':')
+    return book, int(chapter), int(verse)
+
+def parse_verse_lines(lines, chapter=None):
+    """Yield (chapter, verse, text) from verse lines.
+
+    Lines without a chapter number take the given chapter; lines that do not
+    start with a verse number continue the previous verse.
+    """
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        match = VERSE_LINE.match(line)
+        if match:
+            if current:
+                yield current
+            ch = int(match.group(1)) if match.group(1) else chapter
+            current = (ch, int(match.group(2)), match.group(3).strip())
+        elif current:
+            current = (current[0], current[1], f"{current[2]} {line.strip()}")
+    if current:
+        yield current
+
+def kjv_chapter_path(book, chapter):
+    return KJV_DIR / book / f"{chapter:02d}" / f"{book}_{chapter:02d}.txt"
+
+def tr_book_path(book):
+    return TR_DIR / book / f"{book}.txt"
+
+def iter_kjv_verses(books=None):
+    """Yield (book, chapter, verse, text) for the KJV in canonical order."""
+    for book in books or NT_BOOKS:
+        for chapter in range(1, NT_BOOKS[book] + 1):
+            path = kjv_chapter_path(book, chapter)
+            if not path.exists():
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for ch, verse, text in parse_verse_lines(f, chapter):
+                    yield book, ch, verse, text
+
+def iter_tr_verses(books=None):
+    """Yield (book, chapter, verse, text) for the Greek Textus Receptus in canonical order."""
+    for book in books or NT_BOOKS:
+        path = tr_book_path(book)
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for chapter, verse, text in parse_verse_lines(f):
+                yield book, chapter, verse, text
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Positional inverted index format shared by the scripture search indexes.
+
+Every index is one JSON file:
+
+    {
+      "format": "hypomnema-postings",
+      "version": 1,
+      "corpus": "textus_receptus",
+      "normalization": "greek",
+      "fold": {"ά": "α", ...},
+      "docs": ["matthew 1:1", "matthew 1:2", ...],
+      "postings": {"λογοσ": [3102, 2, 4, 7, 3107, 1, 0, ...], ...},
+      "lengths": [12, 9, ...]
+    }
+
+docs lists the verse references in canonical order; a verse's ordinal is its
+position in that list. Each posting list is flat: a doc ordinal, the number
+of positions in it, then the token positions within the verse, repeated for
+every doc in ascending order. Terms are normalized with the function named
+by "normalization", so queries must be normalized the same way. "fold" maps
+individual characters to their normalized form, for readers (like the Go
+server) that cannot run the normalizer itself. "lengths" is optional and
+gives each doc's token count, for indexes that rank hits (BM25). "lemmas" is
+optional too: in an index keyed by lemma it maps normalized words to their
+lemma, and queries are looked up through it (see build_kjv_index.py).
+
+Tokens are maximal runs of letters and combining marks; positions count
+tokens from 0 within each verse.
+
+Usage:
+    python scripts/search_index.py INDEX QUERY...   # phrase search
+"""
+
+import json
+import sys
+import unicodedata
+
+from json_output import write_json
+
+FORMAT_NAME = 'hypomnema-postings'
+FORMAT_VERSION = 1
+
+def is_token_char(char):
+    category = unicodedata.category(char)
+    return category[0] == 'L' or category == 'Mn'
+
+def tokenize(text):
+    """Return the (start, end) character spans of the tokens in text."""
+    spans = []
+    start = None
+    for i, char in enumerate(text):
+        if is_token_char(char):
+            if start is None:
+                start = i
+        elif start is not None:
+            spans.append((start, i))
+            start = None
+    if start is not None:
+        spans.append((start, len(text)))
+    return spans
+
+def normalize_greek(token):
+    """Fold a Greek token for accent-, breathing- and case-insensitive matching.
+
+    Decomposes (NFD), drops diacritics and the elision mark, lowercases and
+    folds final sigma: Λόγον, λόγον and λογον all become λογον.
+    """
+    decomposed = unicodedata.normalize('NFD', token.lower())
+    letters = ''.join(c for c in decomposed if unicodedata.category(c) in ('Ll', 'Lu', 'Lt', 'Lo'))
+    return letters.replace('ς', 'σ')
+
+def normalize_english(token):
+    """Fold a token for case- and accent-insensitive matching.
+
+    Lowercases and drops combining marks, so Naïve and naive both become naive.
+    Final sigma is folded too, so the Greek words quoted in the commentaries
+    fold exactly as normalize_greek() folds them.
+    """
+    decomposed = unicodedata.normalize('NFD', token.lower())
+    letters = ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+    return letters.replace('ς', 'σ')
+
+NORMALIZERS = {
+    'greek': normalize_greek,
+    'english': normalize_english,
+}
+
+# Characters the Greek fold table covers: Greek and Coptic, Greek Extended
+GREEK_BLOCKS = [(0x0370, 0x03FF), (0x1F00, 0x1FFF)]
+
+def is_greek(token):
+    """True if token contains a letter from the Greek blocks."""
+    return any(first <= ord(char) <= last for char in token for first, last in GREEK_BLOCKS)
+
+def fold_table(normalize, blocks):
+    """Map every letter in the given blocks whose normalized form differs from itself."""
+    fold = {}
+    for first, last in blocks:
+        for code in range(first, last + 1):
+            char = chr(code)
+            if not is_token_char(char):
+                continue
+            folded = normalize(char)
+            if folded != char:
+                fold[char] = folded
+    return fold
+
+def build_postings(documents, normalize):
+    """Build {term: flat posting list} from an iterable of document texts."""
+    postings = {}
+    for ordinal, text in enumerate(documents):
+        positions = {}
+        for position, (start, end) in enumerate(tokenize(text)):
+            term = normalize(text[start:end])
+            if term:
+                positions.setdefault(term, []).append(position)
+        for term, term_positions in positions.items():
+            postings.setdefault(term, []).extend([ordinal, len(term_positions), *term_positions])
+    return postings
+
+def make_index(corpus, normalization, docs, postings, fold=None, lengths=None):
+    """Assemble an index in the shared format, terms sorted for stable output."""
+    index = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'corpus': corpus,
+        'normalization': normalization,
+        'fold': fold or {},
+        'docs': docs,
+        'postings': {term: postings[term] for term in sorted(postings)},
+    }
+    if lengths is not None:
+        index['lengths'] = lengths
+    return index
+
+def write_index(path, index, skip_unchanged=False):
+    """Write an index without indentation. Returns True if the file was written."""
+    return write_json(path, index, indent=None, separators=(',', ':'), ensure_ascii=False,
+                      skip_unchanged=skip_unchanged)
+
+def load_index(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('format') != FORMAT_NAME or index.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} index")
+    return index
+
+def decode_postings(flat):
+    """Return {doc ordinal: [positions]} for a flat posting list."""
+    docs = {}
+    i = 0
+    while i < len(flat):
+        doc, count = flat[i], flat[i + 1]
+        docs[doc] = flat[i + 2:i + 2 + count]
+        i += 2 + count
+    return docs
+
+def query_terms(index, query):
+    """Tokenize and normalize a query with the index's normalizer (and lemma table, if any)."""
+    normalize = NORMALIZERS[index['normalization']]
+    lemmas = index.get('lemmas', {})
+    terms = [normalize(query[start:end]) for start, end in tokenize(query)]
+    return [lemmas.get(term, term) for term in terms if term]
+
+def phrase_search(index, terms):
+    """Return [(doc ordinal, [start positions])] where the terms occur consecutively."""
+    if not terms:
+        return []
+    lists = []
+    for term in terms:
+        flat = index['postings'].get(term)
+        if not flat:
+            return []
+        lists.append(decode_postings(flat))
+
+    # Intersect from the rarest term outwards
+    candidates = set(min(lists, key=len))
+    for docs in lists:
+        candidates &= docs.keys()
+
+    results = []
+    for doc in sorted(candidates):
+        following = [set(docs[doc]) for docs in lists[1:]]
+        starts = [p for p in lists[0][doc]
+                  if all(p + offset in positions for offset, positions in enumerate(following, 1))]
+        if starts:
+            results.append((doc, starts))
+    return results
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python scripts/search_index.py INDEX QUERY...")
+        sys.exit(1)
+
+    index = load_index(sys.argv[1])
+    terms = query_terms(index, ' '.join(sys.argv[2:]))
+    results = phrase_search(index, terms)
+    print(f"{len(results)} verses match {' '.join(terms)}")
+    for doc, starts in results[:50]:
+        print(f"  {index['docs'][doc]}  (token {', '.join(map(str, starts))})")
+
+if __name__ == "__main__":
+    main()
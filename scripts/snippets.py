@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Case-folded verse text with a byte-offset map, and search snippets cut from it.
+
+Searching means comparing a folded query against folded text, but highlights
+and snippets have to be cut from the original. Folding is done per character
+(lowercase, diacritics dropped, final sigma as sigma) and can change the UTF-8
+length of a character: Ἀ (3 bytes) folds to α (2 bytes), and combining marks
+fold to nothing. fold_text() therefore also returns a breakpoint list
+
+    [f0, o0, f1, o1, ...]
+
+meaning that from folded byte fi onwards, folded byte f lies at original byte
+oi + (f - fi). Before the first breakpoint the offsets are equal, so text that
+folds byte for byte (all of the KJV) has an empty list. Mapping an offset is
+a binary search over the breakpoints (to_original()).
+
+Snippets are windows of about SNIPPET_WIDTH bytes of the original text around
+the first match, cut at spaces where possible and never inside a UTF-8
+character. Marks are added after cutting and the text is HTML-escaped, so a
+snippet never ends inside a tag or an entity.
+
+All offsets here are UTF-8 byte offsets, as in the Go server, which does the
+same arithmetic on the stored maps.
+
+Usage:
+    python scripts/snippets.py "QUERY" "TEXT"
+"""
+
+import html
+import sys
+
+from search_index import GREEK_BLOCKS, fold_table, normalize_english
+
+# Characters with a fold table entry: Latin letters (Basic Latin to Latin
+# Extended-B), combining diacritics and Greek
+FOLD_BLOCKS = [(0x0041, 0x024F), (0x0300, 0x036F)] + GREEK_BLOCKS
+
+SNIPPET_WIDTH = 200
+
+def text_fold_table():
+    """Map each character in FOLD_BLOCKS to its folded form, where that differs."""
+    return fold_table(normalize_english, FOLD_BLOCKS)
+
+def fold_char(char, fold):
+    """Fold one character: its table entry, else its lowercase if that is one character."""
+    if char in fold:
+        return fold[char]
+    lower = char.lower()
+    return lower if len(lower) == 1 else char
+
+def add_breakpoint(breaks, folded, original):
+    """Record that folded byte folded lies at original byte original, if that changes the offset."""
+    delta = breaks[-1] - breaks[-2] if breaks else 0
+    if original - folded == delta:
+        return
+    # Several dropped characters in a row leave one breakpoint
+    if breaks and breaks[-2] == folded:
+        breaks[-1] = original
+    else:
+        breaks.extend((folded, original))
+
+def fold_text(text, fold):
+    """Return (folded text, breakpoints); see the module docstring."""
+    pieces = []
+    breaks = []
+    original = folded = 0
+    for char in text:
+        add_breakpoint(breaks, folded, original)
+        piece = fold_char(char, fold)
+        pieces.append(piece)
+        original += len(char.encode('utf-8'))
+        folded += len(piece.encode('utf-8'))
+    add_breakpoint(breaks, folded, original)
+    return ''.join(pieces), breaks
+
+def to_original(breaks, offset):
+    """Map a byte offset in the folded text to the original text."""
+    # Find the last breakpoint at or before offset
+    lo, hi = 0, len(breaks) // 2
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if breaks[2 * mid] <= offset:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return offset
+    return breaks[2 * lo - 1] + offset - breaks[2 * lo - 2]
+
+def find_spans(folded, breaks, query):
+    """Return the original (start, end) byte spans of the non-overlapping matches of an
+    already folded query in folded text."""
+    needle = query.encode('utf-8')
+    haystack = folded.encode('utf-8')
+    spans = []
+    if not needle:
+        return spans
+    i = haystack.find(needle)
+    while i >= 0:
+        spans.append((to_original(breaks, i), to_original(breaks, i + len(needle))))
+        i = haystack.find(needle, i + len(needle))
+    return spans
+
+def is_continuation(data, i):
+    """True if byte i of UTF-8 data is inside a character rather than at its start."""
+    return i < len(data) and data[i] & 0xC0 == 0x80
+
+def snippet_window(data, spans, width=SNIPPET_WIDTH):
+    """Return the (start, end) byte window of data to show for the given match spans.
+
+    The window starts a quarter width before the first match and is about
+    width bytes long. Both ends move to a space if there is one nearby
+    (within the window and not across the first match), and otherwise to
+    the nearest character boundary.
+    """
+    if len(data) <= width:
+        return 0, len(data)
+    first_start, first_end = spans[0] if spans else (0, 0)
+
+    start = max(first_start - width // 4, 0)
+    if start > 0:
+        space = data.find(b' ', start, first_start)
+        if space >= 0:
+            start = space + 1
+        while is_continuation(data, start):
+            start += 1
+
+    end = min(start + width, len(data))
+    if end < len(data):
+        space = data.rfind(b' ', first_end, end)
+        if space >= 0:
+            end = space
+        while is_continuation(data, end):
+            end -= 1
+    return start, max(end, first_end)
+
+def render_snippet(text, spans, width=SNIPPET_WIDTH):
+    """Return the HTML snippet of text for the given original byte spans, with the
+    matches inside the window wrapped in <mark>."""
+    data = text.encode('utf-8')
+    start, end = snippet_window(data, spans, width)
+
+    parts = ['...'] if start > 0 else []
+    last = start
+    for span_start, span_end in spans:
+        # A match can start or end inside a character that folded to several
+        while is_continuation(data, span_start):
+            span_start -= 1
+        while is_continuation(data, span_end):
+            span_end += 1
+        span_start, span_end = max(span_start, last), min(span_end, end)
+        if span_start >= span_end:
+            continue
+        parts.append(html.escape(data[last:span_start].decode('utf-8')))
+        parts.append('<mark>' + html.escape(data[span_start:span_end].decode('utf-8')) + '</mark>')
+        last = span_end
+    parts.append(html.escape(data[last:end].decode('utf-8')))
+    if end < len(data):
+        parts.append('...')
+    return ''.join(parts)
+
+def highlight(text, query, fold=None, width=SNIPPET_WIDTH):
+    """Fold text and query, find the query and return the snippet (None if no match)."""
+    fold = text_fold_table() if fold is None else fold
+    folded, breaks = fold_text(text, fold)
+    spans = find_spans(folded, breaks, fold_text(query, fold)[0])
+    return render_snippet(text, spans, width) if spans else None
+
+def main():
+    if len(sys.argv) != 3:
+        print('Usage: python scripts/snippets.py "QUERY" "TEXT"')
+        sys.exit(1)
+    snippet = highlight(sys.argv[2], sys.argv[1])
+    print(snippet if snippet is not None else "No match")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for snippets.py: folded-to-original offsets, case folding that changes
+the UTF-8 length of a character, and snippet windows over multibyte text.
+
+Usage:
+    python -m unittest discover scripts
+"""
+
+import unicodedata
+import unittest
+
+from snippets import (fold_char, fold_text, find_spans, highlight, is_continuation, render_snippet,
+                      snippet_window, text_fold_table, to_original)
+
+FOLD = text_fold_table()
+
+JOHN_1_1_TR = "Ἐν ἀρχῇ ἦν ὁ λόγος, καὶ ὁ λόγος ἦν πρὸς τὸν θεόν, καὶ θεὸς ἦν ὁ λόγος."
+JOHN_1_1_KJV = "In the beginning was the Word, and the Word was with God, and the Word was God."
+
+def char_offsets(text):
+    """Yield (folded byte, original byte, char) for every character of text, as fold_text() walks it."""
+    folded = original = 0
+    for char in text:
+        yield folded, original, char
+        folded += len(fold_char(char, FOLD).encode('utf-8'))
+        original += len(char.encode('utf-8'))
+
+class FoldOffsetTests(unittest.TestCase):
+    def assert_round_trip(self, text):
+        folded, breaks = fold_text(text, FOLD)
+        for folded_at, original_at, char in char_offsets(text):
+            # A character that folds to nothing shares its folded offset with the next one
+            if fold_char(char, FOLD):
+                self.assertEqual(to_original(breaks, folded_at), original_at, (text, char))
+        self.assertEqual(to_original(breaks, len(folded.encode('utf-8'))), len(text.encode('utf-8')))
+
+    def test_kjv_folds_byte_for_byte(self):
+        folded, breaks = fold_text(JOHN_1_1_KJV, FOLD)
+        self.assertEqual(folded, JOHN_1_1_KJV.lower())
+        self.assertEqual(breaks, [])
+        self.assertEqual(to_original(breaks, 17), 17)
+
+    def test_round_trip_polytonic_greek(self):
+        self.assert_round_trip(JOHN_1_1_TR)
+
+    def test_round_trip_decomposed_greek(self):
+        # Combining accents and breathings fold to nothing, several in a row
+        self.assert_round_trip(unicodedata.normalize('NFD', JOHN_1_1_TR))
+
+    def test_round_trip_mixed_lengths(self):
+        self.assert_round_trip("ẞtraße Ⱥ ǅ Å ΐ ᾯ é̀ end")
+
+    def test_breakpoints_merge_dropped_characters(self):
+        _, breaks = fold_text("á̀b", FOLD)
+        # Both marks are dropped at folded byte 1; "b" is at original byte 5
+        self.assertEqual(breaks, [1, 5])
+
+class CaseFoldTests(unittest.TestCase):
+    def test_capital_sharp_s_shrinks(self):
+        folded, breaks = fold_text("ẞ", FOLD)
+        self.assertEqual(folded, "ß")
+        self.assertEqual(breaks, [2, 3])
+
+    def test_sharp_s_is_not_expanded(self):
+        # Lowercasing, not casefolding: ß stays one character and does not match "ss"
+        self.assertEqual(fold_text("Straße", FOLD)[0], "straße")
+        self.assertIsNone(highlight("Strasse", "straße"))
+
+    def test_expanding_fold(self):
+        folded, breaks = fold_text("Ⱥx", FOLD)
+        self.assertEqual(folded, "ⱥx")
+        self.assertEqual(len("Ⱥ".encode('utf-8')), 2)
+        self.assertEqual(len("ⱥ".encode('utf-8')), 3)
+        self.assertEqual(to_original(breaks, 3), 2)
+
+    def test_sigma_forms_fold_together(self):
+        for sigma in "Σσς":
+            self.assertEqual(fold_char(sigma, FOLD), "σ")
+        self.assertEqual(highlight("ὁ λόγος", "ΛΟΓΟΣ"), "ὁ <mark>λόγος</mark>")
+        self.assertEqual(highlight("ὁ λόγος", "λογοσ"), "ὁ <mark>λόγος</mark>")
+
+    def test_combining_diacritics_dropped(self):
+        text = unicodedata.normalize('NFD', "πρὸς τὸν θεόν")
+        self.assertEqual(fold_text(text, FOLD)[0], "προσ τον θεον")
+        self.assertEqual(highlight(text, "θεον"), unicodedata.normalize('NFD', "πρὸς τὸν <mark>θεόν</mark>"))
+
+    def test_spans_cover_the_original_characters(self):
+        folded, breaks = fold_text(JOHN_1_1_TR, FOLD)
+        data = JOHN_1_1_TR.encode('utf-8')
+        spans = find_spans(folded, breaks, fold_text("λόγος", FOLD)[0])
+        self.assertEqual(len(spans), 3)
+        for start, end in spans:
+            self.assertEqual(data[start:end].decode('utf-8'), "λόγος")
+
+class SnippetWindowTests(unittest.TestCase):
+    def assert_on_boundaries(self, data, start, end):
+        self.assertFalse(is_continuation(data, start), start)
+        self.assertFalse(is_continuation(data, end), end)
+        data[start:end].decode('utf-8')
+
+    def test_short_text_is_whole(self):
+        data = JOHN_1_1_TR.encode('utf-8')
+        self.assertEqual(snippet_window(data, [(0, 2)], width=len(data)), (0, len(data)))
+
+    def test_window_never_cuts_a_character(self):
+        # No spaces, so both ends fall back to character boundaries; mixes 2- and 3-byte characters
+        text = "ἀρχῇλόγοςθεὸς" * 40
+        data = text.encode('utf-8')
+        starts = [i for i in range(len(data)) if not is_continuation(data, i)]
+        for width in (50, 51, 52, 53, 200):
+            for first in starts[::7]:
+                span = (first, first + len("ἀ".encode('utf-8')))
+                start, end = snippet_window(data, [span], width)
+                self.assert_on_boundaries(data, start, end)
+                self.assertLessEqual(start, span[0])
+                self.assertGreaterEqual(end, span[1])
+
+    def test_window_moves_to_spaces(self):
+        text = " ".join(["λόγος"] * 60)
+        data = text.encode('utf-8')
+        start, end = snippet_window(data, [(300, 310)], 100)
+        self.assertEqual(data[start - 1:start], b' ')
+        self.assertEqual(data[end:end + 1], b' ')
+
+    def test_marks_widen_to_whole_characters(self):
+        # A span starting in the middle of Ἀ and ending in the middle of ρ
+        text = "Ἀρχή"
+        self.assertEqual(render_snippet(text, [(1, 4)]), "<mark>Ἀρ</mark>χή")
+
+    def test_snippet_is_valid_and_escaped(self):
+        text = "<θεὸς> & " + "ἀρχῇ" * 100
+        # The window ends at the last space rather than inside the run of Greek
+        self.assertEqual(render_snippet(text, [(1, 10)], width=40), "&lt;<mark>θεὸς</mark>&gt; &amp;...")
+
+    def test_match_clipped_at_window_end(self):
+        text = "ἀρχῇ" * 100
+        data = text.encode('utf-8')
+        # The second match lies past the window, the first is shown whole
+        snippet = render_snippet(text, [(0, 10), (len(data) - 10, len(data))], width=30)
+        self.assertEqual(snippet.count("<mark>"), 1)
+        self.assertTrue(snippet.startswith("<mark>ἀρχῇ</mark>"))
+
+if __name__ == "__main__":
+    unittest.main()
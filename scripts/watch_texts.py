@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Watch texts/ and regenerate only the artifacts affected by each change.
+
+The server's dev loop (Air) only reloads Go code, so edits to the source texts
+otherwise mean remembering which extraction scripts to re-run. This watcher
+polls texts/, debounces bursts of filesystem events, maps every changed file to
+the jobs that depend on it and runs those jobs on a process pool.
+
+Every output goes through json_output, which writes a temporary file in the
+target directory, fsyncs it and renames it over the old file, so the server
+never reads half-written JSON.
+Outputs whose content did not change are left untouched. A rewritten output
+that is itself a source (for example all_footnotes.json, which feeds the
+unified JSON) triggers its dependent jobs in turn.
+
+Usage:
+    python scripts/watch_texts.py                 # watch until interrupted
+    python scripts/watch_texts.py --once PATH...  # run the jobs for PATHs and exit
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+TEXTS_DIR = REPO_ROOT / 'texts'
+CYRIL_DIR = TEXTS_DIR / 'commentaries' / 'cyril' / 'luke'
+CANONS_DIR = TEXTS_DIR / 'reference' / 'eusebian_canons'
+UNIFIED_DIR = TEXTS_DIR / 'commentaries' / 'unified_json'
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(CYRIL_DIR))
+
+from json_output import atomic_output, write_json
+
+IGNORED_PARTS = {'__pycache__', '.cache'}
+IGNORED_SUFFIXES = ('.tmp', '.pyc', '.swp', '~')
+
+def relative(path):
+    return str(Path(path).relative_to(REPO_ROOT))
+
+# --- Jobs -------------------------------------------------------------------
+# Each job receives the changed source paths that triggered it and returns
+# the outputs it rewrote.
+
+def chrysostom_book(paths):
+    """Return the Chrysostom book a set of changed paths belongs to."""
+    return Path(sorted(paths)[0]).parent.name
+
+def matthew_footnotes(paths):
+    from extract_footnotes_to_json import extract_footnotes_from_xml
+
+    xml_path = sorted(paths)[0]
+    footnotes = dict(sorted(extract_footnotes_from_xml(xml_path).items()))
+    output = Path(xml_path).parent / 'footnotes.json'
+    return [output] if write_json(output, footnotes, ensure_ascii=False, skip_unchanged=True) else []
+
+def chrysostom_all_footnotes(paths):
+    book = chrysostom_book(paths)
+    if book == 'matthew':
+        from extract_all_matthew_footnotes import extract_all_footnotes
+    else:
+        from extract_all_john_footnotes import extract_all_footnotes
+
+    homilies_footnotes = extract_all_footnotes(sorted(paths)[0])
+    output_data = {str(num): homilies_footnotes[num] for num in sorted(homilies_footnotes)}
+    output = Path(sorted(paths)[0]).parent / 'all_footnotes.json'
+    return [output] if write_json(output, output_data, ensure_ascii=False, skip_unchanged=True) else []
+
+def chrysostom_unified(paths):
+    from extract_all_commentaries_to_json import extract_chrysostom_homilies
+
+    book = chrysostom_book(paths)
+    homilies = extract_chrysostom_homilies(book, texts_dir=TEXTS_DIR)
+    output = UNIFIED_DIR / f'chrysostom_{book}.json'
+    return [output] if write_json(output, homilies, ensure_ascii=False, skip_unchanged=True) else []
+
+def cyril_luke(paths):
+    """Re-extract footnotes for the changed sermon files only, then rebuild the unified JSON."""
+    from extract_all_commentaries_to_json import extract_cyril_sermons
+    from extract_cyril_footnotes import extract_footnotes_from_content
+
+    changed = {Path(p).name for p in paths}
+    footnotes_path = CYRIL_DIR / 'footnotes.json'
+    try:
+        with open(footnotes_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+    except FileNotFoundError:
+        existing = {}
+
+    # Keep the file order of a full extraction so the output stays stable
+    footnotes = {}
+    for html_file in sorted(CYRIL_DIR.glob('cyril_on_luke_*.htm')):
+        if 'intro' in html_file.name:
+            continue
+        if html_file.name in changed:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for footnote in extract_footnotes_from_content(content, html_file.name):
+                footnotes[f"{html_file.stem}_note_{footnote['number']}"] = footnote
+        else:
+            for key, footnote in existing.items():
+                if footnote.get('file') == html_file.name:
+                    footnotes[key] = footnote
+
+    written = []
+    if write_json(footnotes_path, footnotes, ensure_ascii=False, skip_unchanged=True):
+        written.append(footnotes_path)
+
+    # Unchanged sermon files come straight from the parse cache
+    output = UNIFIED_DIR / 'cyril_luke.json'
+    if write_json(output, extract_cyril_sermons(texts_dir=TEXTS_DIR), ensure_ascii=False, skip_unchanged=True):
+        written.append(output)
+    return written
+
+def chrysostom_rendered(paths):
+    from render_homilies import render_commentary
+
+    return render_commentary('chrysostom', chrysostom_book(paths), skip_unchanged=True)
+
+def cyril_rendered(paths):
+    from render_homilies import render_commentary
+
+    return render_commentary('cyril', 'luke', skip_unchanged=True)
+
+def greek_index(paths):
+    from build_greek_index import OUTPUT_PATH, build_greek_index
+
+    _, written = build_greek_index(skip_unchanged=True)
+    return [OUTPUT_PATH] if written else []
+
+def kjv_index(paths):
+    from build_kjv_index import build_kjv_indexes
+
+    _, _, written = build_kjv_indexes(skip_unchanged=True)
+    return written
+
+def commentary_index(paths):
+    from build_commentary_index import OUTPUT_PATH, build_commentary_index
+
+    _, _, written = build_commentary_index(skip_unchanged=True)
+    return [OUTPUT_PATH] if written else []
+
+def footnote_index(paths):
+    from build_footnote_index import build_footnote_indexes
+
+    _, written = build_footnote_indexes(skip_unchanged=True)
+    return written
+
+def parallel_corpus(paths):
+    from build_parallel_corpus import OUTPUT_PATH, build_parallel_corpus
+
+    corpus = build_parallel_corpus()
+    if write_json(OUTPUT_PATH, corpus, indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def verse_text(paths):
+    from build_verse_text import write_verse_texts
+
+    return write_verse_texts(skip_unchanged=True)
+
+def versification(paths):
+    from build_versification import OUTPUT_PATH, build_versification
+
+    if write_json(OUTPUT_PATH, build_versification(), indent=None, separators=(',', ':'),
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def typeahead(paths):
+    from build_typeahead import OUTPUT_PATH, build_typeahead
+
+    if write_json(OUTPUT_PATH, build_typeahead(), indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def fuzzy_index(paths):
+    from build_fuzzy_index import OUTPUT_PATH, build_fuzzy_index
+
+    if write_json(OUTPUT_PATH, build_fuzzy_index(), indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def fresh_versification():
+    """Drop the worker's cached versification table, which may predate a rebuild."""
+    from build_versification import versification
+
+    versification.cache_clear()
+
+def coverage(paths):
+    from build_coverage import write_coverage
+
+    fresh_versification()
+    _, written = write_coverage(skip_unchanged=True)
+    return written
+
+def coverage_matrix(paths):
+    from build_coverage_matrix import OUTPUT_PATH, build_coverage_matrix
+
+    fresh_versification()
+    if write_json(OUTPUT_PATH, build_coverage_matrix(), indent=None, separators=(',', ':'),
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def greek_concordance(paths):
+    from build_greek_concordance import OUTPUT_PATH, build_concordance
+
+    concordance, _ = build_concordance()
+    if write_json(OUTPUT_PATH, concordance, indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def related_homilies(paths):
+    from build_related_homilies import OUTPUT_PATH, build_related
+
+    if write_json(OUTPUT_PATH, build_related(), indent=None, separators=(',', ':'), ensure_ascii=False,
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def quotations(paths):
+    from detect_quotations import FORMAT_NAME, FORMAT_VERSION, OUTPUT_PATH, iter_quotations
+
+    fresh_versification()
+    table = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'quotations': iter_quotations()}
+    if write_json(OUTPUT_PATH, table, indent=None, separators=(',', ':'), skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+def suffix_array(paths):
+    """Rebuild the suffix arrays of the corpora whose verse text changed, if they were built."""
+    from build_suffix_array import build_suffix_index, header_path, write_suffix_index
+
+    fresh_versification()
+    written = []
+    for corpus in sorted({Path(p).name.split('_')[0] for p in paths}):
+        # The arrays are not committed; only keep up to date the ones built locally
+        if not header_path(corpus).exists():
+            continue
+        header, arrays = build_suffix_index(corpus)
+        written.extend(write_suffix_index(corpus, header, arrays, skip_unchanged=True))
+    return written
+
+def canon_db(paths):
+    """Rebuild eusebian-canons.db from import.sql and data/ into a temp file, then swap it in."""
+    sqlite3_cli = shutil.which('sqlite3')
+    if not sqlite3_cli:
+        raise RuntimeError("sqlite3 command-line tool not found; install it to rebuild eusebian-canons.db")
+
+    db_path = CANONS_DIR / 'eusebian-canons.db'
+    with atomic_output(db_path, 'wb') as f:
+        # sqlite3 builds the database in the (still empty) temp file
+        subprocess.run([sqlite3_cli, f.name, '.read import.sql'], cwd=CANONS_DIR, check=True,
+                       capture_output=True, text=True)
+    return [db_path]
+
+def canon_json(paths):
+    from generate_canon_lookup_from_sql import build_canon_lookup
+    from generate_verse_to_canon_mapping import build_verse_to_canon
+
+    db_path = CANONS_DIR / 'eusebian-canons.db'
+    written = []
+    output = CANONS_DIR / 'canon_lookup.json'
+    if write_json(output, build_canon_lookup(db_path), sort_keys=True, skip_unchanged=True):
+        written.append(output)
+    output = CANONS_DIR / 'verse_to_canon.json'
+    if write_json(output, build_verse_to_canon(db_path), sort_keys=True, skip_unchanged=True):
+        written.append(output)
+    return written
+
+def canon_commentary(paths):
+    from build_canon_commentary import OUTPUT_PATH, build_canon_commentary
+
+    if write_json(OUTPUT_PATH, build_canon_commentary(), indent=None, separators=(',', ':'),
+                  skip_unchanged=True):
+        return [OUTPUT_PATH]
+    return []
+
+# Source pattern (relative to texts/) -> jobs. Jobs for the same source run in
+# parallel, so no two jobs in one list may write the same output.
+# homily_coverage.json is hand-corrected after extraction, so it is not rebuilt here.
+# The suffix arrays are only rebuilt for corpora already built locally.
+RULES = [
+    (r'commentaries/chrysostom/matthew/chrysostom_matthew_homilies\.xml',
+     [matthew_footnotes, chrysostom_all_footnotes, chrysostom_rendered]),
+    (r'commentaries/chrysostom/john/chrysostom_john_homilies\.xml',
+     [chrysostom_all_footnotes, chrysostom_rendered]),
+    (r'commentaries/chrysostom/(matthew|john)/all_footnotes\.json',
+     [chrysostom_unified, chrysostom_rendered, footnote_index]),
+    (r'commentaries/cyril/luke/cyril_on_luke_\d+_sermons_\d+_\d+\.htm',
+     [cyril_luke, cyril_rendered]),
+    (r'commentaries/cyril/luke/(footnotes|homily_coverage)\.json',
+     [cyril_rendered]),
+    (r'commentaries/cyril/luke/footnotes\.json',
+     [footnote_index]),
+    (r'commentaries/(chrysostom|cyril)/[a-z]+/homily_coverage\.json',
+     [canon_commentary, coverage]),
+    (r'commentaries/unified_json/(chrysostom|cyril)_[a-z]+\.json',
+     [commentary_index, related_homilies, quotations]),
+    (r'commentaries/cyril/luke/rendered/\d+\.json',
+     [commentary_index, related_homilies, quotations]),
+    (r'scripture/new_testament/greek/textus_receptus/[^/]+/[^/]+\.txt',
+     [greek_index, parallel_corpus, verse_text, versification, greek_concordance]),
+    (r'scripture/new_testament/english/kjv/[^/]+/\d+/[^/]+\.txt',
+     [kjv_index, parallel_corpus, verse_text, versification, typeahead, fuzzy_index, quotations]),
+    (r'reference/versification\.json',
+     [typeahead, coverage, coverage_matrix, quotations]),
+    (r'reference/coverage/(chrysostom|cyril)_[a-z]+\.json',
+     [coverage_matrix]),
+    (r'reference/search/(kjv|tr)_verse_text\.json',
+     [suffix_array]),
+    (r'reference/search/commentary_index\.json',
+     [fuzzy_index]),
+    (r'reference/kjv_paragraphs/kjv_paragraph_divisions\.json',
+     [parallel_corpus]),
+    (r'reference/eusebian_canons/(import\.sql|data/[^/]+\.txt)',
+     [canon_db]),
+    (r'reference/eusebian_canons/eusebian-canons\.db',
+     [canon_json]),
+    (r'reference/eusebian_canons/(canon_lookup|verse_to_canon)\.json',
+     [canon_commentary]),
+]
+RULES = [(re.compile(pattern + '$'), jobs) for pattern, jobs in RULES]
+
+def plan_jobs(changed_paths):
+    """Group changed paths into {(job, group key): set of paths}.
+
+    Per-book Chrysostom jobs are keyed by book so Matthew and John run
+    separately; all other jobs receive every matching path at once.
+    """
+    planned = {}
+    for path in changed_paths:
+        try:
+            rel = Path(path).relative_to(TEXTS_DIR).as_posix()
+        except ValueError:
+            continue
+        for pattern, jobs in RULES:
+            if not pattern.match(rel):
+                continue
+            for job in jobs:
+                group = Path(path).parent.name if job.__name__.startswith('chrysostom_') else None
+                planned.setdefault((job, group), set()).add(str(path))
+    return planned
+
+def run_jobs(planned, executor):
+    """Run planned jobs on the pool and return the outputs they rewrote."""
+    futures = {executor.submit(job, sorted(paths)): job.__name__ for (job, _), paths in planned.items()}
+    rewritten = set()
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            written = future.result()
+        # Scripts exit when an optional dependency (NumPy, SciPy) is missing
+        except (Exception, SystemExit) as e:
+            print(f"  [{name}] failed: {e!r}")
+            continue
+        for output in written:
+            print(f"  [{name}] wrote {relative(output)}")
+            rewritten.add(str(output))
+        if not written:
+            print(f"  [{name}] up to date")
+    return rewritten
+
+def rebuild(changed_paths, executor):
+    """Run every job affected by changed_paths, following rewritten outputs to their dependents.
+
+    Returns the absolute paths of every output written.
+    """
+    written = set()
+    planned = plan_jobs(changed_paths)
+    while planned:
+        rewritten = run_jobs(planned, executor)
+        written |= {os.path.abspath(path) for path in rewritten}
+        planned = plan_jobs(rewritten)
+    return written
+
+def snapshot():
+    """Return {path: (mtime_ns, size)} for every watched file under texts/."""
+    state = {}
+    for root, dirs, files in os.walk(TEXTS_DIR):
+        dirs[:] = [d for d in dirs if d not in IGNORED_PARTS and not d.startswith('.')]
+        for name in files:
+            if name.startswith('.') or name.endswith(IGNORED_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def diff_snapshots(before, after):
+    return {path for path in set(before) | set(after) if before.get(path) != after.get(path)}
+
+def watch(interval, debounce, workers):
+    print(f"Watching {relative(TEXTS_DIR)}/ (poll {interval}s, debounce {debounce}s, {workers} workers)")
+    state = snapshot()
+    pending = set()
+    last_change = None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            changed = diff_snapshots(state, current)
+            state = current
+
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+                continue
+
+            # Wait for the burst of events to settle before rebuilding
+            if pending and time.monotonic() - last_change >= debounce:
+                existing = sorted(p for p in pending if os.path.exists(p))
+                pending = set()
+                if not plan_jobs(existing):
+                    continue
+                print(f"\n{len(existing)} changed file(s): " + ', '.join(relative(p) for p in existing))
+                written = rebuild(existing, executor)
+                # Our own writes were already followed by rebuild(), but a
+                # source edited while it ran still has to be picked up
+                current = snapshot()
+                changed = {p for p in diff_snapshots(state, current) if os.path.abspath(p) not in written}
+                state = current
+                if changed:
+                    pending |= changed
+                    last_change = time.monotonic()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between polls')
+    parser.add_argument('--debounce', type=float, default=1.0, help='quiet period before rebuilding')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='worker processes')
+    parser.add_argument('--once', nargs='+', metavar='PATH', help='run the jobs for PATHs and exit')
+    args = parser.parse_args()
+
+    if args.once:
+        paths = [str(Path(p).resolve()) for p in args.once]
+        if not plan_jobs(paths):
+            print("No jobs depend on the given paths")
+            return
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            rebuild(paths, executor)
+        return
+
+    try:
+        watch(args.interval, args.debounce, args.workers)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import os
-import json
 import re
 from collections import defaultdict
 
+from extract_cyril_footnotes import extract_footnotes_from_content
+
+import repo_scripts  # noqa: F401
+from json_output import write_json
+
 def to_roman(num):
     val = [
         1000, 900, 500, 400,
@@ -32,9 +36,12 @@ def extract_sermon_info_from_file(filepath):
     
     sermons = []
     
-    # Find all sermon entries in the table of contents
-    sermon_pattern = r'<a href="#C\d+">Sermon[s]?\s+(\d+(?:\s*&amp;\s*\d+)?):?\s*Luke\s+([\d:\s]+(?:-[\d:\s]+)?)[^<]*</a>'
-    matches = re.findall(sermon_pattern, content)
+    # Find all sermon entries in the table of contents. The link text is
+    # matched on its own; against the whole file, the entry pattern's digit
+    # and space runs backtrack quadratically over a long run without </a>.
+    link_texts = re.findall(r'<a href="#C\d+">([^<]*)</a>', content)
+    entry_pattern = r'Sermon[s]?\s+(\d+(?:\s*&amp;\s*\d+)?):?\s*Luke\s+([\d:\s]+(?:-[\d:\s]+)?)'
+    matches = [entry.groups() for entry in (re.match(entry_pattern, text) for text in link_texts) if entry]
     
     for match in matches:
         sermon_nums, verse_ref = match
@@ -136,7 +143,7 @@ def create_complete_mapping():
     return homily_coverage, dict(verse_to_homilies)
 
 def extract_footnotes_from_files():
-    """Extract footnotes from all HTML files."""
+    """Extract footnotes from all HTML files, numbered per sermon."""
     luke_dir = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke'
     all_footnotes = {}
     
@@ -151,16 +158,9 @@ def extract_footnotes_from_files():
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Extract footnotes
-        footnote_pattern = r'<A HREF="#(\d+)"><SUP>\1</SUP></A>'
-        footnote_refs = re.findall(footnote_pattern, content)
-        
-        # Extract footnote content
-        for ref in footnote_refs:
-            footnote_content_pattern = rf'<A NAME="{ref}"><SUP>{ref}</SUP></A>\s*([^<]+)'
-            match = re.search(footnote_content_pattern, content)
-            if match:
-                all_footnotes[f"footnote_{ref}"] = match.group(1).strip()
+        # Footnote numbers restart in every file, so key by file as well as number
+        for footnote in extract_footnotes_from_content(content, filename):
+            all_footnotes[f"{filename.replace('.htm', '')}_note_{footnote['number']}"] = footnote
     
     return all_footnotes
 
@@ -172,19 +172,16 @@ if __name__ == "__main__":
     
     # Save homily coverage
     coverage_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/homily_coverage.json'
-    with open(coverage_path, 'w', encoding='utf-8') as f:
-        json.dump(homily_coverage, f, indent=2, ensure_ascii=False)
+    write_json(coverage_path, homily_coverage, ensure_ascii=False)
     print(f"Saved homily coverage for {len(homily_coverage)} sermons")
     
     # Save verse to homilies mapping
     verse_map_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/luke_verse_to_homilies.json'
-    with open(verse_map_path, 'w', encoding='utf-8') as f:
-        json.dump(verse_to_homilies, f, indent=2, ensure_ascii=False)
+    write_json(verse_map_path, verse_to_homilies, ensure_ascii=False)
     print(f"Saved verse mapping for {len(verse_to_homilies)} verses")
     
     # Extract footnotes
     footnotes = extract_footnotes_from_files()
     footnotes_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/footnotes.json'
-    with open(footnotes_path, 'w', encoding='utf-8') as f:
-        json.dump(footnotes, f, indent=2, ensure_ascii=False)
+    write_json(footnotes_path, footnotes, ensure_ascii=False)
     print(f"Saved {len(footnotes)} footnotes")
\ No newline at end of file
@@ -1,71 +1,150 @@
 import os
-import json
 import re
+from bisect import bisect_right
 
-def extract_footnotes_from_cyril_luke():
+import repo_scripts  # noqa: F401
+from json_output import write_json
+
+LUKE_DIR = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke'
+
+# Footnote reference in the body: <A HREF="#1"><SUP>1</SUP></A>
+FOOTNOTE_REF_PATTERN = re.compile(r'<A HREF="#(\d+)"><SUP>\1</SUP></A>')
+
+# Footnote definition at the bottom of the file: <A NAME="1"></A>1.&nbsp; content...
+FOOTNOTE_DEF_PATTERN = re.compile(r'<A NAME="(\d+)"></A>\1\.(?:\s|&nbsp;)*')
+
+# Sermon anchors: <A NAME="C2"></A> in the first file, <a name="SERMON XII."> in the rest
+SERMON_ANCHOR_PATTERN = re.compile(r'<A NAME="(?:C(\d+)|SERMONS?\s+([IVXLC]+)\.?)"', re.IGNORECASE)
+
+# First sermon number from filenames like cyril_on_luke_02_sermons_12_25.htm
+FILE_SERMON_PATTERN = re.compile(r'_sermons_(\d+)_\d+')
+
+def roman_to_int(roman):
+    """Convert Roman numeral to integer."""
+    values = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
+    total = 0
+    prev = 0
+    for char in reversed(roman.upper()):
+        value = values.get(char, 0)
+        if value < prev:
+            total -= value
+        else:
+            total += value
+        prev = value
+    return total
+
+def index_footnote_definitions(content):
+    """Map each footnote anchor to the (start, end) span of its text in one pass.
+
+    A definition runs from its anchor to the closing </p>, and never past the
+    next definition's anchor.
+    """
+    matches = list(FOOTNOTE_DEF_PATTERN.finditer(content))
+    spans = {}
+    for i, match in enumerate(matches):
+        start = match.end()
+        limit = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        end = content.find('</p>', start, limit)
+        if end == -1:
+            end = limit
+        # Keep the first definition if an anchor is repeated
+        spans.setdefault(match.group(1), (start, end))
+    return spans
+
+def index_sermon_anchors(content, filename):
+    """Return parallel lists of sermon anchor offsets and sermon numbers.
+
+    References that appear before the first anchor (the file preface) are
+    attributed to the first sermon named in the filename.
+    """
+    positions = [0]
+    file_match = FILE_SERMON_PATTERN.search(filename)
+    numbers = [int(file_match.group(1)) if file_match else None]
+
+    for match in SERMON_ANCHOR_PATTERN.finditer(content):
+        if match.group(1):
+            number = int(match.group(1))
+        else:
+            number = roman_to_int(match.group(2))
+        positions.append(match.start())
+        numbers.append(number)
+
+    return positions, numbers
+
+def clean_footnote_text(text):
+    """Collapse whitespace and strip markup from a footnote definition."""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'<[^<>]+>', '', text)  # Remove HTML tags
+    text = re.sub(r'&nbsp;', ' ', text)
+    text = re.sub(r'&quot;', '"', text)
+    text = re.sub(r'&amp;', '&', text)
+    return text.strip()
+
+def extract_footnotes_from_content(content, filename):
+    """Join footnote references to their definitions, numbered per sermon.
+
+    Footnote numbers restart in every file, so each note also records the
+    sermon it is referenced from and a display number that restarts with
+    every sermon.
+    """
+    definitions = index_footnote_definitions(content)
+    positions, numbers = index_sermon_anchors(content, filename)
+
+    footnotes = []
+    seen = set()
+    display_numbers = {}
+
+    for match in FOOTNOTE_REF_PATTERN.finditer(content):
+        ref_num = match.group(1)
+        if ref_num in seen or ref_num not in definitions:
+            continue
+        seen.add(ref_num)
+
+        sermon = numbers[bisect_right(positions, match.start()) - 1]
+        display_numbers[sermon] = display_numbers.get(sermon, 0) + 1
+
+        start, end = definitions[ref_num]
+        footnotes.append({
+            'file': filename,
+            'sermon': sermon,
+            'number': int(ref_num),
+            'display_number': display_numbers[sermon],
+            'text': clean_footnote_text(content[start:end])
+        })
+
+    return footnotes
+
+def extract_footnotes_from_cyril_luke(luke_dir=LUKE_DIR):
     """Extract all footnotes from Cyril's Luke commentary HTML files."""
-    luke_dir = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke'
     all_footnotes = {}
-    
+
     # Process each HTML file
     files = sorted([f for f in os.listdir(luke_dir) if f.startswith('cyril_on_luke_') and f.endswith('.htm')])
-    
+
     for filename in files:
         if 'intro' in filename:
             continue
-            
+
         filepath = os.path.join(luke_dir, filename)
         print(f"Processing {filename} for footnotes...")
-        
+
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
-        
-        # Find all footnote references and their content
-        # Pattern for footnote references: <A HREF="#1"><SUP>1</SUP></A>
-        # Pattern for footnote content: <A NAME="1"><SUP>1</SUP></A> content...
-        
-        # First, find all footnote numbers
-        footnote_refs = re.findall(r'<A HREF="#(\d+)"><SUP>\d+</SUP></A>', content)
-        
-        # Then extract the footnote content
-        for ref_num in set(footnote_refs):
-            # Look for the footnote definition at the bottom of the file
-            # Pattern: <A NAME="number"></A>number. followed by the content until the next <p>
-            pattern = rf'<A NAME="{ref_num}"></A>{ref_num}\.\s*([^<]+(?:<(?!p>|A NAME=)[^>]*>[^<]*</[^>]+>[^<]*)*)'
-            match = re.search(pattern, content, re.DOTALL)
-            
-            if not match:
-                # Try alternate pattern with &nbsp;
-                pattern = rf'<A NAME="{ref_num}"></A>{ref_num}\.\&nbsp;([^<]+(?:<(?!p>|A NAME=)[^>]*>[^<]*</[^>]+>[^<]*)*)'
-                match = re.search(pattern, content, re.DOTALL)
-            
-            if match:
-                footnote_text = match.group(1).strip()
-                # Clean up the text
-                footnote_text = re.sub(r'\s+', ' ', footnote_text)
-                footnote_text = re.sub(r'<[^>]+>', '', footnote_text)  # Remove HTML tags
-                footnote_text = re.sub(r'&nbsp;', ' ', footnote_text)
-                footnote_text = re.sub(r'&quot;', '"', footnote_text)
-                footnote_text = re.sub(r'&amp;', '&', footnote_text)
-                
-                # Store with a unique key based on file and number
-                footnote_key = f"{filename.replace('.htm', '')}_note_{ref_num}"
-                all_footnotes[footnote_key] = {
-                    'file': filename,
-                    'number': int(ref_num),
-                    'text': footnote_text.strip()
-                }
-    
+
+        for footnote in extract_footnotes_from_content(content, filename):
+            # Store with a unique key based on file and number
+            footnote_key = f"{filename.replace('.htm', '')}_note_{footnote['number']}"
+            all_footnotes[footnote_key] = footnote
+
     return all_footnotes
 
 if __name__ == "__main__":
     print("Extracting footnotes from Cyril's Luke commentary...")
-    
+
     footnotes = extract_footnotes_from_cyril_luke()
-    
+
     # Save footnotes
-    footnotes_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/footnotes.json'
-    with open(footnotes_path, 'w', encoding='utf-8') as f:
-        json.dump(footnotes, f, indent=2, ensure_ascii=False)
-    
-    print(f"Extracted and saved {len(footnotes)} footnotes")
\ No newline at end of file
+    footnotes_path = os.path.join(LUKE_DIR, 'footnotes.json')
+    write_json(footnotes_path, footnotes, ensure_ascii=False)
+
+    print(f"Extracted and saved {len(footnotes)} footnotes")
@@ -1,9 +1,11 @@
 import os
-import json
 import re
 from html.parser import HTMLParser
 from collections import defaultdict
 
+import repo_scripts  # noqa: F401
+from json_output import write_json
+
 class CyrilLukeParser(HTMLParser):
     def __init__(self):
         super().__init__()
@@ -102,7 +104,7 @@ def parse_all_cyril_files():
                     content = f.read()
                 
                 # Extract sermon info from the title
-                title_match = re.search(r'Sermons (\d+)-(\d+)\. \(Luke ([^)]+)\)', content)
+                title_match = re.search(r'Sermons (\d+)-(\d+)\. \(Luke ([^()]+)\)', content)
                 if not title_match:
                     # Try alternate format for single sermons
                     title_match = re.search(r'Sermon (\d+): Luke ([\d:]+(?:-[\d:]+)?)', content)
@@ -229,13 +231,11 @@ if __name__ == "__main__":
     
     # Save homily coverage
     coverage_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/homily_coverage.json'
-    with open(coverage_path, 'w', encoding='utf-8') as f:
-        json.dump(homily_coverage, f, indent=2)
+    write_json(coverage_path, homily_coverage)
     print(f"Saved homily coverage to {coverage_path}")
     
     # Create verse to homilies mapping
     verse_map = create_verse_to_homilies_mapping(homily_coverage)
     verse_map_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/luke_verse_to_homilies.json'
-    with open(verse_map_path, 'w', encoding='utf-8') as f:
-        json.dump(verse_map, f, indent=2)
+    write_json(verse_map_path, verse_map)
     print(f"Saved verse mapping to {verse_map_path}")
\ No newline at end of file
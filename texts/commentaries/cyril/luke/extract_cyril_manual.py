@@ -1,6 +1,8 @@
-import json
 import os
 
+import repo_scripts  # noqa: F401
+from json_output import write_json
+
 def to_roman(num):
     val = [
         1000, 900, 500, 400,
@@ -255,12 +257,10 @@ if __name__ == "__main__":
     
     # Save homily coverage
     coverage_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/homily_coverage.json'
-    with open(coverage_path, 'w', encoding='utf-8') as f:
-        json.dump(homily_coverage, f, indent=2, ensure_ascii=False)
+    write_json(coverage_path, homily_coverage, ensure_ascii=False)
     print(f"Saved homily coverage for {len(homily_coverage)} sermons")
     
     # Save verse to homilies mapping
     verse_map_path = '/Users/gregzancewicz/Documents/Other/Projects/hypomnema/texts/commentaries/cyril/luke/luke_verse_to_homilies.json'
-    with open(verse_map_path, 'w', encoding='utf-8') as f:
-        json.dump(verse_to_homilies, f, indent=2, ensure_ascii=False)
+    write_json(verse_map_path, verse_to_homilies, ensure_ascii=False)
     print(f"Saved verse mapping for {len(verse_to_homilies)} verses")
\ No newline at end of file
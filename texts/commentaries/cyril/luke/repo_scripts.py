@@ -0,0 +1,14 @@
+"""Put the repository's scripts/ directory on sys.path for the extractors here.
+
+Import this module before importing the shared helpers in scripts/:
+
+    import repo_scripts
+    from json_output import write_json
+"""
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[4] / 'scripts'
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))